@@ -0,0 +1,13 @@
+"""
+Reproducible benchmarks for the graphrag, chatbot and stock_trading hot paths.
+
+Run from the project root:
+    python -m benchmarks.run --scales 1 10 --output bench.json
+    python -m benchmarks.run --scales 1 10 --compare bench.json
+    python -m benchmarks.startup --ref HEAD~1
+    python -m benchmarks.backtest --tickers 2000 --years 10 --verify
+    python -m benchmarks.trading_env --envs 1024 4096 --workers 4
+    python -m benchmarks.replay --symbols 5000 --verify
+    python -m benchmarks.reconciliation --skus 100 1000 10000 --verify
+    python -m benchmarks.admission --clients 64 --llm-latency 0.2
+"""
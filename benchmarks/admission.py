@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Load test for admission control on the chatbot endpoint.
+
+Many client threads post to ``/chatbot/chat/`` at once while the OpenAI
+client is replaced by a stub with a fixed latency. The run is repeated with
+admission control off and on, reporting outcomes, latency percentiles of
+successful requests and the peak number of concurrent LLM calls.
+
+    python -m benchmarks.admission --clients 64 --requests 4 --llm-latency 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'personal_website.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+
+from benchmarks.stubs import default_responder, stub_factory  # noqa: E402
+from benchmarks.timing import git_commit  # noqa: E402
+
+
+class ConcurrencyProbe:
+    """Responder that sleeps ``latency`` seconds and tracks how many LLM calls are in flight"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __call__(self, messages, **kwargs):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        try:
+            time.sleep(self.latency)
+            return default_responder(messages, **kwargs)
+        finally:
+            with self.lock:
+                self.current -= 1
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(clients, requests, latency, admission, shared_ip):
+    probe = ConcurrencyProbe(latency)
+    config = dict(settings.ADMISSION_CONTROL, enabled=admission)
+    outcomes = Counter()
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(index):
+        client = Client(HTTP_HOST='localhost', REMOTE_ADDR='10.0.0.1' if shared_ip else f'10.0.{index // 250}.{index % 250}')
+        for i in range(requests):
+            body = json.dumps({'message': f'Question {index}-{i}'})
+            start = time.perf_counter()
+            response = client.post('/chatbot/chat/', body, content_type='application/json')
+            elapsed = time.perf_counter() - start
+            with lock:
+                outcomes[response.status_code] += 1
+                if response.status_code == 200:
+                    latencies.append(elapsed)
+
+    # The semantic cache would answer most of these similar questions without an LLM call
+    with mock.patch('openai.OpenAI', stub_factory(0.0, probe)), \
+            override_settings(OPENAI_API_KEY='benchmark', ADMISSION_CONTROL=config,
+                              CHAT_SEMANTIC_CACHE={'enabled': False}):
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+    return {
+        'admission': admission,
+        'shared_ip': shared_ip,
+        'wall_seconds': wall,
+        'status_counts': {str(k): v for k, v in sorted(outcomes.items())},
+        'peak_llm_concurrency': probe.peak,
+        'p50_ok_seconds': percentile(latencies, 0.5),
+        'p95_ok_seconds': percentile(latencies, 0.95),
+        'mean_ok_seconds': statistics.fmean(latencies) if latencies else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=4, help='requests per client')
+    parser.add_argument('--llm-latency', type=float, default=0.2)
+    parser.add_argument('--shared-ip', action='store_true', help='send every request from one client IP')
+    parser.add_argument('--output', type=Path, help='write JSON results to this file')
+    args = parser.parse_args(argv)
+    # Every shed request would otherwise be logged
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    results = [run(args.clients, args.requests, args.llm_latency, admission, args.shared_ip)
+               for admission in (False, True)]
+    for result in results:
+        p95 = result['p95_ok_seconds']
+        print(f"admission={'on ' if result['admission'] else 'off'} "
+              f"statuses={result['status_counts']} peak LLM calls={result['peak_llm_concurrency']} "
+              f"p95 ok={p95 * 1000 if p95 is not None else float('nan'):.0f} ms wall={result['wall_seconds']:.1f}s")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            'meta': {'commit': git_commit(), 'clients': args.clients, 'requests': args.requests,
+                     'llm_latency': args.llm_latency},
+            'results': results,
+        }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the vectorized backtest engine.
+
+Builds synthetic OHLCV data for many tickers, round-trips it through the
+memory-mapped ``.npy`` cache, and times signal generation plus a full
+backtest. ``--verify`` checks the engine against a per-bar reference loop
+on a small sample first.
+
+    python -m benchmarks.backtest --tickers 2000 --years 10 --output backtest.json
+"""
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.timing import git_commit, time_callable  # noqa: E402
+from stock_trading import backtest  # noqa: E402
+
+
+def reference_returns(close, open_, positions, cost_bps):
+    """Straightforward per-bar loop used to validate the vectorized engine"""
+    n_tickers, n_bars = close.shape
+    returns = np.zeros((n_tickers, n_bars))
+    for t in range(n_tickers):
+        prev_held = 0.0
+        for b in range(n_bars):
+            held = positions[t, b - 1] if b > 0 else 0.0
+            prev_close = close[t, b - 1] if b > 0 else close[t, 0]
+            gross = prev_held * (open_[t, b] / prev_close - 1) + held * (close[t, b] / open_[t, b] - 1)
+            returns[t, b] = gross - abs(held - prev_held) * cost_bps / 1e4
+            prev_held = held
+    return returns
+
+
+def reference_trades(close, open_, positions, cost_bps):
+    """
+    Per-bar loop that books each trade's own P&L: the session move and entry
+    cost on the first bar, whole bars while held, and the overnight gap plus
+    exit cost on the bar it is closed. Returns (ticker, entry_bar, return) tuples.
+    """
+    n_tickers, n_bars = close.shape
+    trades = []
+    for t in range(n_tickers):
+        prev_held, growth, entry = 0.0, 1.0, None
+        for b in range(n_bars):
+            held = positions[t, b - 1] if b > 0 else 0.0
+            prev_close = close[t, b - 1] if b > 0 else close[t, 0]
+            overnight = prev_held * (open_[t, b] / prev_close - 1)
+            intraday = held * (close[t, b] / open_[t, b] - 1)
+            cost = abs(held - prev_held) * cost_bps / 1e4
+            if held == prev_held:
+                if held != 0:
+                    growth *= 1 + overnight + intraday - cost
+            else:
+                exposure = abs(prev_held) + abs(held)
+                if prev_held != 0:
+                    growth *= 1 + overnight - cost * abs(prev_held) / exposure
+                    trades.append((t, entry, growth - 1))
+                if held != 0:
+                    growth, entry = 1 + intraday - cost * abs(held) / exposure, b
+            prev_held = held
+        if prev_held != 0:
+            trades.append((t, entry, growth - 1))
+    return trades
+
+
+def verify(seed):
+    prices = backtest.synthetic_ohlcv(8, 400, seed=seed)
+    positions = backtest.moving_average_crossover(prices['close'], 10, 30, allow_short=True)
+    result = backtest.run_backtest(prices['close'], positions, prices['open'], cost_bps=5)
+    expected = reference_returns(prices['close'], prices['open'], positions, 5)
+    error = float(np.abs(expected - result['ticker_returns']).max())
+    if error > 1e-12:
+        raise AssertionError(f"vectorized returns differ from reference loop by {error}")
+
+    trades = result['trades']
+    expected_trades = reference_trades(prices['close'], prices['open'], positions, 5)
+    if [(t, b) for t, b, _ in expected_trades] != list(zip(trades['ticker'].tolist(), trades['entry_bar'].tolist())):
+        raise AssertionError("vectorized trade list differs from reference loop")
+    expected_trade_returns = np.array([r for _, _, r in expected_trades])
+    trade_error = float(np.abs(expected_trade_returns - trades['return']).max()) if len(trades) else 0.0
+    if trade_error > 1e-12:
+        raise AssertionError(f"vectorized trade returns differ from reference loop by {trade_error}")
+    expected_win_rate = float((expected_trade_returns > 0).mean()) if len(trades) else 0.0
+    if result['stats']['win_rate'] != expected_win_rate:
+        raise AssertionError(f"win rate {result['stats']['win_rate']} differs from reference loop {expected_win_rate}")
+    return max(error, trade_error)
+
+
+def write_csv(prices, path):
+    import pandas as pd
+
+    n_tickers, n_bars = prices['close'].shape
+    dates = pd.bdate_range('2000-01-03', periods=n_bars)
+    frame = pd.DataFrame({
+        'Date': np.tile(dates.strftime('%Y-%m-%d'), n_tickers),
+        'Ticker': np.repeat(prices['tickers'], n_bars),
+        **{field.capitalize(): prices[field].ravel() for field in backtest.OHLCV_FIELDS},
+    })
+    frame.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--csv', action='store_true', help='also time the CSV -> .npy cache build and mmap load')
+    parser.add_argument('--verify', action='store_true', help='check against a per-bar loop before timing')
+    parser.add_argument('--output', type=Path, help='write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.verify:
+        results['verify_max_abs_error'] = verify(args.seed)
+        print(f"verified against reference loop (max error {results['verify_max_abs_error']:.1e})")
+
+    n_bars = backtest.TRADING_DAYS_PER_YEAR * args.years
+    prices = backtest.synthetic_ohlcv(args.tickers, n_bars, seed=args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.csv:
+            csv_path = Path(tmp) / 'prices.csv'
+            write_csv(prices, csv_path)
+            results['csv_to_npy_cache'] = time_callable(lambda: backtest._build_npy_cache(csv_path, Path(tmp) / 'npy'), 1, 0)
+            results['mmap_load'] = time_callable(lambda: backtest.load_ohlcv(csv_path, Path(tmp) / 'npy'), args.rounds)
+            prices = backtest.load_ohlcv(csv_path, Path(tmp) / 'npy')
+
+        positions = backtest.moving_average_crossover(prices['close'])
+        results['signals'] = time_callable(lambda: backtest.moving_average_crossover(prices['close']), args.rounds)
+        results['backtest'] = time_callable(
+            lambda: backtest.run_backtest(prices['close'], positions, prices['open']), args.rounds
+        )
+        stats = backtest.run_backtest(prices['close'], positions, prices['open'])['stats']
+
+    cells = args.tickers * n_bars
+    for name, result in results.items():
+        if isinstance(result, dict):
+            print(f"{name:<18} median {result['median'] * 1000:9.1f} ms")
+    print(f"{args.tickers} tickers x {n_bars} bars: "
+          f"{cells / results['backtest']['median'] / 1e6:.1f}M ticker-bars/s, {stats['total_trades']} trades")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            'meta': {'commit': git_commit(), 'tickers': args.tickers, 'bars': n_bars, 'seed': args.seed},
+            'results': results,
+            'stats': stats,
+        }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Scaled synthetic datasets shaped like ``graphrag/data``
+"""
+import numpy as np
+import pandas as pd
+
+REGIONS = ["North", "South", "East", "West", "Central"]
+HISTORY_DAYS = 90
+
+
+def build_demand_frame(scale, seed=0):
+    """
+    Demand history for ``scale * 5`` SKU/Region series over
+    ``HISTORY_DAYS * scale`` days. SKU123/North is always present.
+    """
+    rng = np.random.default_rng(seed)
+    days = HISTORY_DAYS * scale
+    dates = pd.date_range("2024-01-01", periods=days, freq="D")
+    skus = ["SKU123"] + [f"SKU{200 + i}" for i in range(scale - 1)]
+
+    frames = []
+    t = np.arange(days)
+    for sku in skus:
+        for region in REGIONS:
+            level = rng.uniform(300, 700)
+            demand = level + 25 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 15, days).cumsum() * 0.2
+            frames.append(pd.DataFrame({
+                "Date": dates,
+                "SKU": sku,
+                "Region": region,
+                "Demand": np.maximum(demand, 0).round().astype(int),
+                "Price": rng.uniform(9, 11, days).round(2),
+                "Promo_Flag": (rng.random(days) < 0.05).astype(int),
+                "Holiday_Flag": (rng.random(days) < 0.02).astype(int),
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_events_frame(demand_df, scale, seed=0):
+    """Events covering random windows, including ALL/National wildcards"""
+    rng = np.random.default_rng(seed + 1)
+    dates = demand_df["Date"].drop_duplicates().sort_values().reset_index(drop=True)
+    skus = list(demand_df["SKU"].unique()) + ["ALL"]
+    regions = REGIONS + ["National"]
+    n_events = 5 * scale * scale
+
+    starts = rng.integers(0, len(dates) - 3, n_events)
+    lengths = rng.integers(0, 3, n_events)
+    return pd.DataFrame({
+        "Event_ID": [f"E{i:05d}" for i in range(n_events)],
+        "SKU": rng.choice(skus, n_events),
+        "Region": rng.choice(regions, n_events),
+        "Start_Date": dates[starts].dt.strftime("%Y-%m-%d").values,
+        "End_Date": dates[starts + lengths].dt.strftime("%Y-%m-%d").values,
+        "Event_Type": rng.choice(["Promotion", "Holiday", "Weather"], n_events),
+        "Description": [f"Synthetic event {i}" for i in range(n_events)],
+    })
+
+
+def write_dataset(directory, scale, seed=0):
+    """Write both CSVs into ``directory`` using the production file names"""
+    demand_df = build_demand_frame(scale, seed)
+    events_df = build_events_frame(demand_df, scale, seed)
+    demand_df.to_csv(directory / "synthetic_demand_timeseries.csv", index=False)
+    events_df.to_csv(directory / "Synthetic_Event_Data.csv", index=False)
+    return directory
+
+
+def build_graph(service, scale, seed=0):
+    """Knowledge graph with ``scale`` extra supply chains hung off the base graph"""
+    rng = np.random.default_rng(seed)
+    G = service.create_graph_rag()
+    for region in REGIONS:
+        G.add_node(region, type="Region")
+    for i in range(scale - 1):
+        sku = f"SKU{200 + i}"
+        G.add_node(f"Supplier{i}", type="Supplier")
+        G.add_node(sku, type="SKU")
+        G.add_node(f"Warehouse{i}", type="Warehouse")
+        G.add_edge(f"Supplier{i}", sku, relation="SUPPLIES")
+        G.add_edge(sku, f"Warehouse{i}", relation="STORES")
+        G.add_edge(f"Warehouse{i}", REGIONS[int(rng.integers(len(REGIONS)))], relation="SHIPS_TO")
+    return G
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for sparse hierarchical forecast reconciliation.
+
+Builds SKU x Region hierarchies of increasing size with random base
+forecasts and times hierarchy construction plus each reconciliation
+method. ``--verify`` checks the zero-constrained sparse solve against the
+dense MinT formula ``S (S' W^-1 S)^-1 S' W^-1 yhat`` on a small hierarchy.
+
+    python -m benchmarks.reconciliation --skus 100 1000 10000 --regions 5 --verify
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.timing import git_commit, time_callable  # noqa: E402
+from graphrag.reconciliation import Hierarchy, reconcile  # noqa: E402
+
+
+def bottom_keys(n_skus, n_regions):
+    return [f"SKU{i:05d}|R{r}" for i in range(n_skus) for r in range(n_regions)]
+
+
+def base_forecasts(hierarchy, steps, rng):
+    """Noisy, incoherent forecasts around a coherent truth"""
+    truth = hierarchy.aggregate(rng.uniform(50, 500, (hierarchy.n_bottom, steps)))
+    noise = rng.normal(0, 0.05, truth.shape) * truth
+    return truth + noise, (0.05 * truth.mean(axis=1)) ** 2
+
+
+def verify(seed):
+    rng = np.random.default_rng(seed)
+    hierarchy = Hierarchy(bottom_keys(12, 4))
+    base, variances = base_forecasts(hierarchy, 7, rng)
+    S = hierarchy.S.toarray()
+    error = 0.0
+    for method, weights in [('ols', np.ones(len(S))), ('wls_struct', S.sum(axis=1)), ('mint_diag', variances)]:
+        w_inv = np.diag(1 / weights)
+        expected = S @ np.linalg.solve(S.T @ w_inv @ S, S.T @ w_inv @ base)
+        error = max(error, float(np.abs(reconcile(hierarchy, base, method, variances) - expected).max()))
+    if error > 1e-8:
+        raise AssertionError(f"sparse reconciliation differs from the dense formula by {error}")
+    return error
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--skus', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--regions', type=int, default=5)
+    parser.add_argument('--steps', type=int, default=7)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verify', action='store_true', help='check against the dense formula before timing')
+    parser.add_argument('--output', type=Path, help='write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.verify:
+        results['verify_max_abs_error'] = verify(args.seed)
+        print(f"verified against dense MinT formula (max error {results['verify_max_abs_error']:.1e})")
+
+    rng = np.random.default_rng(args.seed)
+    for n_skus in args.skus:
+        keys = bottom_keys(n_skus, args.regions)
+        hierarchy = Hierarchy(keys)
+        base, variances = base_forecasts(hierarchy, args.steps, rng)
+        timings = {'build': time_callable(lambda: Hierarchy(keys), args.rounds)}
+        for method in ('bottom_up', 'ols', 'wls_struct', 'mint_diag'):
+            timings[method] = time_callable(lambda: reconcile(hierarchy, base, method, variances), args.rounds)
+        reconciled = reconcile(hierarchy, base, 'mint_diag', variances)
+        results[f"skus={n_skus}"] = {
+            'bottom_series': hierarchy.n_bottom,
+            'total_series': len(hierarchy.keys),
+            'coherence_error': hierarchy.coherence_error(reconciled),
+            'timings': timings,
+        }
+        print(f"{hierarchy.n_bottom:>7} bottom / {len(hierarchy.keys):>7} total series: " + ", ".join(
+            f"{name} {timing['median'] * 1000:.1f} ms" for name, timing in timings.items()
+        ))
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            'meta': {'commit': git_commit(), 'regions': args.regions, 'steps': args.steps, 'seed': args.seed},
+            'results': results,
+        }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the incremental indicator engine.
+
+Replays synthetic ticks for many symbols through ``IndicatorEngine`` and,
+for comparison, through a naive engine that recomputes each rolling window
+from scratch on every tick. ``--verify`` checks the incremental values
+against the naive ones.
+
+    python -m benchmarks.replay --symbols 5000 --rounds 200 --verify
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.timing import git_commit  # noqa: E402
+from stock_trading.replay import IndicatorEngine, synthetic_ticks  # noqa: E402
+
+
+class NaiveEngine:
+    """Keeps full windows and recomputes SMA / volatility / Sharpe on every tick"""
+
+    def __init__(self, window=20, sharpe_window=60):
+        self.window = window
+        self.sharpe_window = sharpe_window
+        self.prices = defaultdict(lambda: deque(maxlen=max(window, sharpe_window) + 1))
+        self.values = {}
+
+    def update(self, symbol, price, ts=None):
+        prices = self.prices[symbol]
+        prices.append(price)
+        recent = list(prices)
+        returns = [math.log(b / a) for a, b in zip(recent[:-1], recent[1:])]
+        sma = sum(recent[-self.window:]) / self.window if len(recent) >= self.window else None
+        self.values[symbol] = {
+            'sma': sma,
+            'volatility': _std(returns[-self.window:]),
+            'sharpe_mean': sum(returns[-self.sharpe_window:]) / len(returns[-self.sharpe_window:]) if returns else None,
+        }
+
+
+def _std(values):
+    if len(values) < 2:
+        return None
+    mean = sum(values) / len(values)
+    return math.sqrt(sum((v - mean) ** 2 for v in values) / (len(values) - 1))
+
+
+def run_engine(engine, ticks):
+    start = time.perf_counter()
+    count = 0
+    for ts, symbol, price in ticks:
+        engine.update(symbol, price, ts)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def verify(symbols, rounds):
+    ticks = list(synthetic_ticks(symbols, rounds, seed=1, start_ts=0))
+    fast, naive = IndicatorEngine(), NaiveEngine()
+    for ts, symbol, price in ticks:
+        fast.update(symbol, price, ts)
+        naive.update(symbol, price, ts)
+    worst = 0.0
+    for symbol, expected in naive.values.items():
+        state = fast.symbols[symbol]
+        got = fast.snapshot(symbol)
+        pairs = [(got['sma'], expected['sma']), (got['volatility'], expected['volatility']),
+                 (state.sharpe.mean, expected['sharpe_mean'])]
+        for actual, wanted in pairs:
+            if wanted is not None:
+                worst = max(worst, abs(actual - wanted) / max(abs(wanted), 1e-12))
+    if worst > 1e-6:
+        raise AssertionError(f"incremental indicators differ from recomputation (relative error {worst})")
+    return worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--rounds', type=int, default=200, help='ticks per symbol')
+    parser.add_argument('--verify', action='store_true')
+    parser.add_argument('--output', type=Path, help='write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.verify:
+        results['verify_max_rel_error'] = verify(50, 300)
+        print(f"verified against full recomputation (max relative error {results['verify_max_rel_error']:.1e})")
+
+    ticks = list(synthetic_ticks(args.symbols, args.rounds, seed=0, start_ts=0))
+    results['incremental_ticks_per_second'] = run_engine(IndicatorEngine(), ticks)
+    results['naive_ticks_per_second'] = run_engine(NaiveEngine(), ticks)
+
+    print(f"{args.symbols} symbols x {args.rounds} ticks")
+    print(f"incremental   {results['incremental_ticks_per_second'] / 1e3:9.1f}k ticks/s")
+    print(f"naive         {results['naive_ticks_per_second'] / 1e3:9.1f}k ticks/s (SMA/vol/Sharpe only)")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            'meta': {'commit': git_commit(), 'symbols': args.symbols, 'rounds': args.rounds},
+            'results': results,
+        }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner for the graphrag and chatbot hot paths.
+
+Every benchmark runs against synthetic datasets at each requested scale
+with the OpenAI client replaced by ``benchmarks.stubs.StubOpenAI``.
+Results are written as JSON so runs from different commits can be compared:
+
+    python -m benchmarks.run --scales 1 4 --output before.json
+    python -m benchmarks.run --scales 1 4 --compare before.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'personal_website.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+
+from benchmarks import datasets  # noqa: E402
+from benchmarks.stubs import stub_factory  # noqa: E402
+from benchmarks.timing import git_commit, time_callable  # noqa: E402
+from chatbot import sessions as chat_sessions  # noqa: E402
+
+# name -> (setup function, rounds); setup(ctx) returns the callable to time
+BENCHMARKS = {}
+
+# The apps import OpenAI lazily from the package, so patching it there covers all of them
+OPENAI_PATCH_TARGETS = [
+    'openai.OpenAI',
+]
+
+
+def benchmark(name, rounds=5):
+    """Register a benchmark setup function under ``name``"""
+    def register(setup):
+        BENCHMARKS[name] = (setup, rounds)
+        return setup
+    return register
+
+
+class Context:
+    """Lazily built per-scale fixtures shared by all benchmarks"""
+
+    def __init__(self, scale, data_dir, client_factory):
+        from graphrag.services import ForecastingService
+
+        self.scale = scale
+        self.data_dir = data_dir
+        self.client_factory = client_factory
+        self.service = ForecastingService()
+        self.df, self.events_df = self.service.load_data()
+        self.sku_df = self.service.prepare_sku_data(self.df)
+        self.recent_data = self.service.get_recent_data(self.sku_df)
+        self.ml_forecast, _ = self.service.run_ml_forecast(self.sku_df)
+        self.llm_forecast = self.service.run_llm_forecast(self.recent_data)
+        self.graph = datasets.build_graph(self.service, scale)
+        self.http = Client(HTTP_HOST='localhost')
+
+
+@benchmark('load_data')
+def bench_load_data(ctx):
+    return ctx.service.load_data
+
+
+@benchmark('prepare_sku_data', rounds=20)
+def bench_prepare_sku_data(ctx):
+    return lambda: ctx.service.prepare_sku_data(ctx.df)
+
+
+@benchmark('run_ml_forecast')
+def bench_run_ml_forecast(ctx):
+    return lambda: ctx.service.run_ml_forecast(ctx.sku_df)
+
+
+@benchmark('run_ml_forecast_with_intervals')
+def bench_run_ml_forecast_with_intervals(ctx):
+    return lambda: ctx.service.run_ml_forecast_with_intervals(ctx.sku_df)
+
+
+@benchmark('run_llm_forecast_batch')
+def bench_run_llm_forecast_batch(ctx):
+    windows = ctx.service.get_all_recent_data(ctx.df)
+    return lambda: ctx.service.run_llm_forecast_batch(windows)
+
+
+@benchmark('timeseries_query', rounds=20)
+def bench_timeseries_query(ctx):
+    from graphrag.timeseries import get_demand_series
+    demand = get_demand_series(ctx.service)
+    return lambda: [demand.query(key, width=800) for key in ("SKU123|North", "ALL|National")]
+
+
+@benchmark('get_events_for_date', rounds=20)
+def bench_get_events_for_date(ctx):
+    dates = list(ctx.ml_forecast)
+    return lambda: [ctx.service.get_events_for_date(d, ctx.events_df) for d in dates]
+
+
+@benchmark('create_visualization', rounds=3)
+def bench_create_visualization(ctx):
+    return lambda: ctx.service.create_visualization(ctx.sku_df, ctx.ml_forecast, ctx.llm_forecast)
+
+
+@benchmark('visualize_graph', rounds=3)
+def bench_visualize_graph(ctx):
+    return lambda: ctx.service.visualize_graph(ctx.graph)
+
+
+@benchmark('get_n_hop_subgraph', rounds=50)
+def bench_get_n_hop_subgraph(ctx):
+    return lambda: ctx.service.subgraph_to_text(ctx.service.get_n_hop_subgraph(ctx.graph, "SKU123", n=2))
+
+
+@benchmark('answer_graph_queries', rounds=10)
+def bench_answer_graph_queries(ctx):
+    nodes = ["SKU123"] + [n for n, data in ctx.graph.nodes(data=True) if data.get("type") == "Region"][:4]
+    queries = [{'node': node, 'question': f'Question {i} about {node}?'} for i in range(10) for node in nodes]
+    return lambda: ctx.service.answer_graph_queries(ctx.graph, queries)
+
+
+@benchmark('view_chat', rounds=20)
+def bench_view_chat(ctx):
+    history = [
+        {'role': 'user' if i % 2 == 0 else 'assistant', 'content': f'Message {i} about skills and projects'}
+        for i in range(10 * ctx.scale)
+    ]
+    body = json.dumps({'message': 'What are your skills?', 'history': history})
+    return lambda: _expect_ok(ctx.http.post('/chatbot/chat/', body, content_type='application/json'))
+
+
+@benchmark('view_chat_paraphrase', rounds=20)
+def bench_view_chat_paraphrase(ctx):
+    """Standalone questions served from the semantic cache after the first answer"""
+    questions = ['What are your skills?', 'Which skills do you have?', 'What skills do you have?', 'what are your SKILLS']
+    bodies = [json.dumps({'message': q}) for q in questions]
+    return lambda: [_expect_ok(ctx.http.post('/chatbot/chat/', body, content_type='application/json'))
+                    for body in bodies]
+
+
+@benchmark('view_chat_session', rounds=20)
+def bench_view_chat_session(ctx):
+    """Same conversation length as view_chat, with the history held server-side"""
+    first = _expect_ok(ctx.http.post('/chatbot/chat/', json.dumps({'message': 'Hello'}),
+                                     content_type='application/json')).json()
+    body = json.dumps({'message': 'What are your skills?', 'session_id': first['session_id']})
+    return lambda: _expect_ok(ctx.http.post('/chatbot/chat/', body, content_type='application/json'))
+
+
+@benchmark('view_run_forecast', rounds=3)
+def bench_view_run_forecast(ctx):
+    return lambda: _expect_ok(ctx.http.post('/graphrag/api/run-forecast/'))
+
+
+def _expect_ok(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.content[:200]!r}")
+    return response
+
+
+@contextlib.contextmanager
+def patched_openai(client_factory, data_dir):
+    """Route every OpenAI client construction to the stub and point DATA_DIR at ``data_dir``"""
+    with contextlib.ExitStack() as stack:
+        for target in OPENAI_PATCH_TARGETS:
+            stack.enter_context(mock.patch(target, client_factory))
+        stack.enter_context(override_settings(
+            OPENAI_API_KEY='benchmark', DATA_DIR=data_dir,
+            CHAT_SESSIONS=dict(settings.CHAT_SESSIONS, spill_path=data_dir / 'chat_sessions.sqlite3'),
+            # Every test-client request comes from 127.0.0.1 and would exhaust the per-IP bucket
+            ADMISSION_CONTROL=dict(settings.ADMISSION_CONTROL, enabled=False),
+        ))
+        try:
+            yield
+        finally:
+            chat_sessions._store = None
+
+
+def run(scales, selected=None, latency=0.0, seed=0):
+    results = {}
+    client_factory = stub_factory(latency=latency)
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = datasets.write_dataset(Path(tmp), scale, seed)
+            with patched_openai(client_factory, data_dir):
+                ctx = Context(scale, data_dir, client_factory)
+                for name, (setup, rounds) in BENCHMARKS.items():
+                    if selected and name not in selected:
+                        continue
+                    key = f"{name}[scale={scale}]"
+                    results[key] = time_callable(setup(ctx), rounds)
+                    print(f"{key:<40} median {results[key]['median'] * 1000:10.2f} ms", flush=True)
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scales': scales,
+            'llm_latency': latency,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Print median ratios against ``baseline`` and return the regressed keys"""
+    regressions = []
+    print(f"\nComparison against {baseline['meta'].get('commit')} (tolerance {tolerance:.0%})")
+    for key, result in current['results'].items():
+        previous = baseline['results'].get(key)
+        if previous is None:
+            continue
+        ratio = result['median'] / previous['median'] if previous['median'] else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressions.append(key)
+        print(f"{key:<40} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 4],
+                        help='dataset scale factors (series count and history length grow with scale)')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='run a subset of benchmarks')
+    parser.add_argument('--llm-latency', type=float, default=0.0, help='seconds the stub LLM sleeps per call')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, help='write JSON results to this file')
+    parser.add_argument('--compare', type=Path, help='JSON results from a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed median slowdown before flagging a regression (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    current = run(args.scales, set(args.only or []), args.llm_latency, args.seed)
+
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if compare(current, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Cold-start report: import time and peak RSS of a fresh Django process.
+
+Each scenario runs in a new interpreter under ``python -X importtime``;
+the report lists wall time, peak RSS, which heavy libraries ended up
+loaded and the slowest top-level imports.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --ref HEAD~1   # compare against another commit
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ['numpy', 'pandas', 'matplotlib', 'networkx', 'statsmodels', 'scipy', 'openai', 'sklearn']
+
+# Code run in the child process; {path} and {setup} are filled per scenario
+CHILD_TEMPLATE = '''
+import json, os, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+os.environ['DJANGO_SETTINGS_MODULE'] = 'personal_website.settings'
+os.environ.pop('OPENAI_API_KEY', None)
+import django
+django.setup()
+from django.test import Client
+{setup}
+response = Client(HTTP_HOST='localhost').get({path!r})
+assert response.status_code == 200, response.status_code
+print(json.dumps({{
+    'seconds': time.perf_counter() - start,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy_loaded': sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+'''
+
+SCENARIOS = {
+    'portfolio_page': {'path': '/', 'setup': ''},
+    'resume_page': {'path': '/resume/', 'setup': ''},
+    'graphrag_page': {'path': '/graphrag/', 'setup': ''},
+    'graphrag_warm': {'path': '/graphrag/', 'setup': (
+        # Older revisions import everything eagerly and have no warm_up()
+        'import graphrag.services as services; getattr(services, "warm_up", lambda: None)()'
+    )},
+}
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def run_scenario(root, name, repeat):
+    scenario = SCENARIOS[name]
+    code = CHILD_TEMPLATE.format(root=str(root), heavy=HEAVY_MODULES, **scenario)
+    samples = []
+    imports = {}
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=root, capture_output=True, text=True, env={**os.environ, 'PYTHONWARNINGS': 'ignore'},
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{name} failed:\n{proc.stderr[-2000:]}")
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        imports = top_level_imports(proc.stderr)
+    return {
+        'seconds': statistics.median(s['seconds'] for s in samples),
+        'rss_mb': statistics.median(s['rss_mb'] for s in samples),
+        'heavy_loaded': samples[-1]['heavy_loaded'],
+        'slowest_imports': sorted(imports.items(), key=lambda item: item[1], reverse=True)[:8],
+    }
+
+
+def top_level_imports(stderr):
+    """Return cumulative import seconds of each top-level package"""
+    totals = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        if len(indent) <= 1:
+            top = module.split('.')[0]
+            totals[top] = totals.get(top, 0) + int(cumulative) / 1e6
+    return totals
+
+
+def report(root, repeat):
+    return {name: run_scenario(root, name, repeat) for name in SCENARIOS}
+
+
+def print_report(label, results):
+    print(f"\n== {label}")
+    for name, result in results.items():
+        heavy = ', '.join(result['heavy_loaded']) or 'none'
+        print(f"{name:<16} {result['seconds'] * 1000:8.0f} ms  {result['rss_mb']:7.1f} MB  heavy: {heavy}")
+        slowest = ', '.join(f"{module} {seconds * 1000:.0f}ms" for module, seconds in result['slowest_imports'][:5])
+        print(f"{'':<16} slowest imports: {slowest}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help='processes started per scenario')
+    parser.add_argument('--ref', help='git revision to measure for comparison (checked out in a temporary worktree)')
+    parser.add_argument('--output', type=Path, help='write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    results = {'current': report(BASE_DIR, args.repeat)}
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = Path(tmp) / 'ref'
+            subprocess.run(['git', 'worktree', 'add', '--detach', str(worktree), args.ref],
+                           cwd=BASE_DIR, check=True, capture_output=True)
+            try:
+                results[args.ref] = report(worktree, args.repeat)
+            finally:
+                subprocess.run(['git', 'worktree', 'remove', '--force', str(worktree)],
+                               cwd=BASE_DIR, capture_output=True)
+
+    for label, result in results.items():
+        print_report(label, result)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the batched trading environments.
+
+Steps ``VectorTradingEnv`` and ``SubprocVectorTradingEnv`` with random
+actions and reports environment steps per minute.
+
+    python -m benchmarks.trading_env --envs 1024 4096 --workers 4
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.timing import git_commit  # noqa: E402
+from stock_trading.backtest import synthetic_ohlcv  # noqa: E402
+from stock_trading.env import SubprocVectorTradingEnv, VectorTradingEnv  # noqa: E402
+
+
+def measure(env, n_steps, seed=0):
+    """Return environment steps per minute for ``n_steps`` batched steps"""
+    rng = np.random.default_rng(seed)
+    env.reset(seed=seed)
+    actions = rng.integers(-1, 2, (n_steps, env.n_envs)).astype(np.float32)
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    elapsed = time.perf_counter() - start
+    return n_steps * env.n_envs / elapsed * 60
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--envs', type=int, nargs='+', default=[256, 1024, 4096])
+    parser.add_argument('--workers', type=int, default=4, help='worker processes for the subprocess variant (0 skips it)')
+    parser.add_argument('--steps', type=int, default=500)
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--output', type=Path, help='write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    close = synthetic_ohlcv(args.tickers, 252 * args.years, seed=0)['close']
+    results = {}
+    for n_envs in args.envs:
+        results[f"vector[envs={n_envs}]"] = measure(VectorTradingEnv(close, n_envs), args.steps)
+        if args.workers:
+            with SubprocVectorTradingEnv(close, n_envs, n_workers=args.workers) as env:
+                results[f"subproc{args.workers}[envs={n_envs}]"] = measure(env, args.steps)
+
+    for name, steps_per_minute in results.items():
+        print(f"{name:<28} {steps_per_minute / 1e6:8.1f}M steps/min")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            'meta': {'commit': git_commit(), 'steps': args.steps, 'tickers': args.tickers},
+            'steps_per_minute': results,
+        }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
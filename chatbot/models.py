@@ -1,3 +1,3 @@
 from django.db import models
 
-# No models needed for this app - using stateless API
+# No models needed for this app - conversations live in chatbot.sessions
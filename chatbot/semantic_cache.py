@@ -0,0 +1,209 @@
+"""
+Approximate response cache for the chatbot.
+
+Questions are embedded locally with two hashing vectorizers over the
+question's words once pure filler ("do", "you", "tell me about") is removed:
+word unigrams/bigrams, which keep "what" apart from "where" and "project a"
+apart from "project b", and character n-grams, which tolerate plurals and
+typos. Interrogatives are kept, "which" is read as "what", and a negation is
+folded into the next word so "not know" never matches "know". Site-specific
+words such as the owner's name are passed in as ``ignored_words``.
+Embeddings live in one L2-normalised float32 matrix that doubles in size as
+entries arrive, up to ``max_entries`` rows of ``n_features`` floats; a
+lookup is a single matrix-vector product followed by an argmax. Entries
+expire after a TTL and the least recently used entry is evicted when the
+cache is full.
+"""
+import re
+import threading
+import time
+
+import numpy as np
+
+from personal_website.instrumentation import registry, timed
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Words that do not change what is being asked; interrogatives and negations are deliberately absent
+FILLER_WORDS = frozenset({
+    'the', 'is', 'are', 'am', 'was', 'were', 'be', 'been', 'do', 'does', 'did', 'done', 'have', 'has',
+    'had', 'you', 'your', 'yours', 'yourself', 'i', 'me', 'my', 'we', 'us', 'he', 'him', 'his', 'she',
+    'her', 'they', 'them', 'their', 's', 'tell', 'about', 'please', 'can', 'could', 'would',
+    'will', 'of', 'to', 'in', 'on', 'for', 'and', 'any', 'some', 'kind', 'kinds', 'sort', 'sorts', 'got',
+})
+SYNONYMS = {'which': 'what'}
+NEGATIONS = frozenset({'not', 'no', 'never', 'nt', 'cannot', 'without'})
+INITIAL_CAPACITY = 16
+
+
+class SemanticCache:
+    """Cosine nearest-neighbour cache of question -> answer"""
+
+    def __init__(self, threshold=0.85, max_entries=1000, max_bytes=4_000_000, n_features=2 ** 12,
+                 ttl_seconds=86400, word_weight=0.5, ignored_words=()):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.filler_words = FILLER_WORDS | {word.lower() for word in ignored_words}
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.word_weight = word_weight
+        half = n_features // 2
+        self.word_vectorizer = HashingVectorizer(
+            analyzer='word', token_pattern=r"\S+", ngram_range=(1, 2), n_features=half,
+            alternate_sign=False, norm='l2', dtype=np.float32,
+        )
+        self.char_vectorizer = HashingVectorizer(
+            analyzer='char_wb', ngram_range=(3, 5), n_features=n_features - half,
+            alternate_sign=False, norm='l2', dtype=np.float32,
+        )
+
+        self._lock = threading.Lock()
+        capacity = min(max_entries, INITIAL_CAPACITY)
+        self.vectors = np.zeros((capacity, n_features), dtype=np.float32)
+        self.used = np.zeros(capacity, dtype=bool)
+        self.last_access = np.zeros(capacity, dtype=np.int64)
+        self.expires = np.zeros(capacity, dtype=np.float64)
+        self.answers = [None] * capacity
+        self.questions = [None] * capacity
+        self.size_bytes = 0
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+
+    def normalize(self, text):
+        """Lower-case question words without filler, with synonyms and negations folded in"""
+        words = []
+        negate = False
+        for word in TOKEN_RE.findall(text.lower().replace("n't", " not")):
+            if word in NEGATIONS:
+                negate = True
+                continue
+            word = SYNONYMS.get(word, word)
+            if word in self.filler_words:
+                continue
+            words.append(f"not_{word}" if negate else word)
+            negate = False
+        if negate:
+            words.append("not")
+        return " ".join(words) or text.lower().strip()
+
+    def embed(self, text):
+        """Unit vector whose dot products weight word and character similarity by ``word_weight``"""
+        normalized = [self.normalize(text)]
+        words = self.word_vectorizer.transform(normalized).toarray()[0]
+        chars = self.char_vectorizer.transform(normalized).toarray()[0]
+        vector = np.concatenate([np.sqrt(self.word_weight) * words, np.sqrt(1 - self.word_weight) * chars])
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, question):
+        """Return ``(answer, similarity)`` of the closest live entry, or ``(None, similarity)``"""
+        with timed('semantic_cache_lookup'):
+            query = self.embed(question)
+            with self._lock:
+                self._expire()
+                answer, score = None, 0.0
+                if self.used.any():
+                    scores = self.vectors @ query
+                    scores[~self.used] = -1.0
+                    slot = int(scores.argmax())
+                    score = float(scores[slot])
+                    if score >= self.threshold:
+                        answer = self.answers[slot]
+                        self.last_access[slot] = self._tick()
+                if answer is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                self._record(hit=answer is not None)
+        return answer, score
+
+    def store(self, question, answer):
+        """Insert an answer, evicting least recently used entries to make room"""
+        size = len(question.encode()) + len(answer.encode())
+        if size > self.max_bytes:
+            return
+        vector = self.embed(question)
+        with self._lock:
+            self._expire()
+            while self.used.any() and (self.used.sum() >= self.max_entries or self.size_bytes + size > self.max_bytes):
+                self._evict(int(np.where(self.used, self.last_access, np.iinfo(np.int64).max).argmin()))
+                registry.inc('semantic_cache_evictions_total')
+            if self.used.all():
+                self._grow()
+            slot = int((~self.used).argmax())
+            self.vectors[slot] = vector
+            self.used[slot] = True
+            self.last_access[slot] = self._tick()
+            self.expires[slot] = time.monotonic() + self.ttl_seconds
+            self.questions[slot] = question
+            self.answers[slot] = answer
+            self.size_bytes += size
+            registry.set_gauge('semantic_cache_entries', int(self.used.sum()))
+
+    def clear(self):
+        with self._lock:
+            for slot in np.flatnonzero(self.used):
+                self._evict(int(slot))
+            registry.set_gauge('semantic_cache_entries', 0)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': int(self.used.sum()),
+                'bytes': self.size_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _grow(self):
+        """Double the slot arrays, up to ``max_entries``"""
+        extra = min(self.max_entries, 2 * len(self.used)) - len(self.used)
+        self.vectors = np.vstack([self.vectors, np.zeros((extra, self.vectors.shape[1]), dtype=np.float32)])
+        self.used = np.append(self.used, np.zeros(extra, dtype=bool))
+        self.last_access = np.append(self.last_access, np.zeros(extra, dtype=np.int64))
+        self.expires = np.append(self.expires, np.zeros(extra, dtype=np.float64))
+        self.answers.extend([None] * extra)
+        self.questions.extend([None] * extra)
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def _evict(self, slot):
+        self.size_bytes -= len(self.questions[slot].encode()) + len(self.answers[slot].encode())
+        self.used[slot] = False
+        self.vectors[slot] = 0.0
+        self.questions[slot] = self.answers[slot] = None
+
+    def _expire(self):
+        for slot in np.flatnonzero(self.used & (self.expires <= time.monotonic())):
+            self._evict(int(slot))
+
+    def _record(self, hit):
+        registry.inc('semantic_cache_requests_total', outcome='hit' if hit else 'miss')
+        lookups = self.hits + self.misses
+        registry.set_gauge('semantic_cache_hit_ratio', self.hits / lookups)
+        registry.set_gauge('semantic_cache_entries', int(self.used.sum()))
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache built from ``settings.CHAT_SEMANTIC_CACHE``, or None when disabled"""
+    global _cache
+    from django.conf import settings
+
+    options = dict(settings.CHAT_SEMANTIC_CACHE)
+    if not options.pop('enabled', True):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache(**options)
+    return _cache
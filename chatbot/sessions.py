@@ -0,0 +1,142 @@
+"""
+Server-side chatbot conversations.
+
+The browser sends only a ``session_id`` and the new message; the last
+``max_messages`` turns live here. Recently used sessions are kept in an
+``OrderedDict`` in LRU order. When more than ``max_sessions`` are held, the
+least recently used ones are spilled to a small SQLite file and loaded back
+on their next message. Sessions idle for longer than ``ttl_seconds`` are
+dropped from both places.
+"""
+import json
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from personal_website.instrumentation import registry
+
+SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+
+class Session:
+    """History of one conversation as compact (role, content) pairs"""
+
+    __slots__ = ('messages', 'last_seen')
+
+    def __init__(self, messages=None, last_seen=None):
+        self.messages = messages or []
+        self.last_seen = time.time() if last_seen is None else last_seen
+
+
+class SessionStore:
+    """Bounded in-memory LRU of sessions with SQLite spill and idle expiry"""
+
+    def __init__(self, spill_path, max_sessions=1000, max_messages=10, ttl_seconds=3600,
+                 purge_interval=60):
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._last_purge = 0.0
+        self._db = sqlite3.connect(str(spill_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chat_sessions ("
+            "id TEXT PRIMARY KEY, messages TEXT NOT NULL, last_seen REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chat_sessions_last_seen ON chat_sessions (last_seen)")
+
+    def history(self, session_id):
+        """
+        Return ``(session_id, messages)``; a new id and empty history are
+        returned when ``session_id`` is missing, not a string, malformed or
+        expired.
+        """
+        with self._lock:
+            self._purge()
+            valid = isinstance(session_id, str) and SESSION_ID_RE.match(session_id)
+            session = self._get(session_id) if valid else None
+            if session is None:
+                session_id = secrets.token_urlsafe(24)
+                session = self._put(session_id, Session())
+                registry.inc('chat_sessions_total', source='new')
+            return session_id, [{'role': role, 'content': content} for role, content in session.messages]
+
+    def append(self, session_id, *messages):
+        """Add ``{'role', 'content'}`` messages, keeping the last ``max_messages``"""
+        with self._lock:
+            session = self._get(session_id) or self._put(session_id, Session())
+            session.messages.extend((m['role'], m['content']) for m in messages)
+            del session.messages[:-self.max_messages]
+            session.last_seen = time.time()
+
+    def _get(self, session_id):
+        cutoff = time.time() - self.ttl_seconds
+        session = self._sessions.get(session_id)
+        if session is not None:
+            if session.last_seen < cutoff:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            session.last_seen = time.time()
+            registry.inc('chat_sessions_total', source='memory')
+            return session
+
+        row = self._db.execute(
+            "SELECT messages, last_seen FROM chat_sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._db.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,))
+        if row[1] < cutoff:
+            return None
+        registry.inc('chat_sessions_total', source='disk')
+        return self._put(session_id, Session([tuple(m) for m in json.loads(row[0])], row[1]))
+
+    def _put(self, session_id, session):
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        spilled = []
+        while len(self._sessions) > self.max_sessions:
+            old_id, old = self._sessions.popitem(last=False)
+            spilled.append((old_id, json.dumps(old.messages, separators=(',', ':')), old.last_seen))
+        if spilled:
+            self._db.executemany("INSERT OR REPLACE INTO chat_sessions VALUES (?, ?, ?)", spilled)
+            registry.inc('chat_session_spills_total', len(spilled))
+        registry.set_gauge('chat_sessions_in_memory', len(self._sessions))
+        return session
+
+    def _purge(self):
+        """Drop idle sessions: memory on every call, SQLite at most once per ``purge_interval``"""
+        now = time.time()
+        cutoff = now - self.ttl_seconds
+        # The OrderedDict is in least-recently-used order, so idle sessions are at the front
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_seen >= cutoff:
+                break
+            del self._sessions[session_id]
+        if now - self._last_purge >= self.purge_interval:
+            self._last_purge = now
+            self._db.execute("DELETE FROM chat_sessions WHERE last_seen < ?", (cutoff,))
+        registry.set_gauge('chat_sessions_in_memory', len(self._sessions))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide session store built from ``settings.CHAT_SESSIONS``"""
+    global _store
+    from django.conf import settings
+
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore(**settings.CHAT_SESSIONS)
+    return _store
@@ -1,3 +1,105 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.test import Client, SimpleTestCase, override_settings
+
+from .semantic_cache import SemanticCache
+from .sessions import SessionStore
+
+
+class SemanticCacheTests(SimpleTestCase):
+    """Paraphrases reuse an answer; questions that differ in meaning do not"""
+
+    PARAPHRASES = [
+        ("What are your skills?", "Which skills do you have?"),
+        ("What are Sugam's technical skills?", "What technical skills does Sugam have?"),
+        ("What projects has Sugam worked on?", "Which projects have you worked on?"),
+        ("Where did you study?", "Where did Sugam study?"),
+    ]
+    NEAR_MISSES = [
+        ("What did you study?", "Where did you study?"),
+        ("Do you know React?", "Do you not know React?"),
+        ("Do you know React?", "Don't you know React?"),
+        ("Tell me about project A", "Tell me about project B"),
+        ("What are your skills?", "What are your hobbies?"),
+    ]
+
+    def test_paraphrases_hit(self):
+        for stored, asked in self.PARAPHRASES:
+            with self.subTest(stored=stored, asked=asked):
+                cache = SemanticCache(ignored_words=['Sugam'])
+                cache.store(stored, "answer")
+                answer, _ = cache.lookup(asked)
+                self.assertEqual(answer, "answer")
+
+    def test_near_misses_miss(self):
+        for stored, asked in self.NEAR_MISSES:
+            with self.subTest(stored=stored, asked=asked):
+                cache = SemanticCache()
+                cache.store(stored, "answer")
+                answer, similarity = cache.lookup(asked)
+                self.assertIsNone(answer)
+                self.assertLess(similarity, cache.threshold)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SemanticCache(max_entries=2)
+        cache.store("What are your skills?", "skills")
+        cache.store("Where did you study?", "study")
+        cache.lookup("What are your skills?")
+        cache.store("What are your hobbies?", "hobbies")
+        self.assertEqual(cache.lookup("What are your skills?")[0], "skills")
+        self.assertIsNone(cache.lookup("Where did you study?")[0])
+
+    def test_owner_name_only_ignored_when_configured(self):
+        cache = SemanticCache()
+        cache.store("Where did you study?", "answer")
+        self.assertIsNone(cache.lookup("Where did Sugam study?")[0])
+
+    def test_matrix_grows_with_use(self):
+        cache = SemanticCache(max_entries=40, n_features=64)
+        self.assertEqual(cache.vectors.shape, (16, 64))
+        for i in range(20):
+            cache.store(f"question number {i}", str(i))
+        self.assertEqual(cache.vectors.shape, (32, 64))
+        for i in range(20, 50):
+            cache.store(f"question number {i}", str(i))
+        self.assertEqual(cache.vectors.shape, (40, 64))
+        self.assertEqual(cache.stats()['entries'], 40)
+        self.assertIn("49", cache.answers)
+        self.assertNotIn("0", cache.answers)
+
+
+class ChatViewCacheTests(SimpleTestCase):
+    """The chat view must not answer one question with another's cached answer"""
+
+    def test_where_is_not_answered_with_what(self):
+        from benchmarks.stubs import stub_factory
+        from . import semantic_cache
+
+        replies = iter(["Computer science.", "At the university."])
+        client = Client(HTTP_HOST='localhost')
+        config = {'threshold': 0.85, 'max_entries': 10}
+        with mock.patch('openai.OpenAI', stub_factory(responder=lambda messages, **kwargs: next(replies))), \
+                mock.patch.object(semantic_cache, '_cache', None), \
+                override_settings(OPENAI_API_KEY='test', CHAT_SEMANTIC_CACHE=config,
+                                  ADMISSION_CONTROL={'enabled': False}):
+            first = client.post('/chatbot/chat/', json.dumps({'message': 'What did you study?', 'history': []}),
+                                content_type='application/json').json()
+            second = client.post('/chatbot/chat/', json.dumps({'message': 'Where did you study?', 'history': []}),
+                                 content_type='application/json').json()
+        self.assertEqual(first['response'], "Computer science.")
+        self.assertEqual(second['response'], "At the university.")
+        self.assertNotIn('cached', second)
+
+
+class SessionStoreTests(SimpleTestCase):
+    """Client-supplied session ids that are not well-formed strings start a new session"""
+
+    def test_non_string_session_id_starts_a_new_session(self):
+        store = SessionStore(':memory:')
+        store.append('a' * 24, {'role': 'user', 'content': 'Hi'})
+        for session_id in [123, ['a' * 24], {'id': 'a' * 24}, None, 'short']:
+            new_id, messages = store.history(session_id)
+            self.assertIsInstance(new_id, str, session_id)
+            self.assertEqual(messages, [], session_id)
+        self.assertEqual(store.history('a' * 24), ('a' * 24, [{'role': 'user', 'content': 'Hi'}]))
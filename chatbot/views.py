@@ -4,7 +4,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 import json
 import os
-from openai import OpenAI
+from personal_website.instrumentation import record_llm_usage, timed
 
 
 def load_context():
@@ -33,7 +33,6 @@ def chat(request):
     try:
         data = json.loads(request.body)
         user_message = data.get('message', '')
-        conversation_history = data.get('history', [])
         
         if not user_message:
             return JsonResponse({'error': 'Message is required'}, status=400)
@@ -45,10 +44,40 @@ def chat(request):
                 'error': 'OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.'
             }, status=500)
         
+        # History is kept server-side per session; clients that still post their
+        # own 'history' without a session id are answered statelessly
+        session_store, session_id = None, None
+        if 'history' in data and 'session_id' not in data:
+            conversation_history = data.get('history') or []
+        else:
+            from .sessions import get_store
+            session_store = get_store()
+            session_id, conversation_history = session_store.history(data.get('session_id'))
+        
+        def reply(answer, **extra):
+            if session_store is not None:
+                session_store.append(
+                    session_id,
+                    {'role': 'user', 'content': user_message},
+                    {'role': 'assistant', 'content': answer},
+                )
+                extra['session_id'] = session_id
+            return JsonResponse({'response': answer, 'success': True, **extra})
+        
+        # Answers to standalone questions can be reused for paraphrases of the same question
+        from .semantic_cache import get_cache
+        semantic_cache = None if conversation_history else get_cache()
+        if semantic_cache is not None:
+            cached_answer, similarity = semantic_cache.lookup(user_message)
+            if cached_answer is not None:
+                return reply(cached_answer, cached=True, similarity=round(similarity, 3))
+        
         # Load context
-        system_prompt, profile_content = load_context()
+        with timed('load_context'):
+            system_prompt, profile_content = load_context()
         
-        # Initialize OpenAI client
+        # Initialize OpenAI client (imported lazily to keep startup cheap)
+        from openai import OpenAI
         client = OpenAI(api_key=api_key)
         
         # Prepare messages for OpenAI
@@ -73,19 +102,20 @@ def chat(request):
         })
         
         # Call OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=2048
-        )
+        with timed('llm_chat'):
+            response = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=2048
+            )
+        record_llm_usage('llm_chat', response)
         
         assistant_message = response.choices[0].message.content
+        if semantic_cache is not None and assistant_message:
+            semantic_cache.store(user_message, assistant_message)
         
-        return JsonResponse({
-            'response': assistant_message,
-            'success': True
-        })
+        return reply(assistant_message)
         
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
@@ -114,14 +144,16 @@ def text_to_speech(request):
             }, status=500)
         
         # Initialize OpenAI client
+        from openai import OpenAI
         client = OpenAI(api_key=api_key)
         
         # Generate speech
-        response = client.audio.speech.create(
-            model="tts-1",
-            voice="alloy",
-            input=text
-        )
+        with timed('llm_tts'):
+            response = client.audio.speech.create(
+                model="tts-1",
+                voice="alloy",
+                input=text
+            )
         
         # Return audio as base64
         import base64
@@ -1,3 +1,21 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ForecastExplanation, ForecastRun, ForecastValue
+
+
+class ForecastValueInline(admin.TabularInline):
+    model = ForecastValue
+    extra = 0
+
+
+class ForecastExplanationInline(admin.TabularInline):
+    model = ForecastExplanation
+    extra = 0
+
+
+@admin.register(ForecastRun)
+class ForecastRunAdmin(admin.ModelAdmin):
+    list_display = ('sku', 'region', 'run_date', 'model_name', 'created_at')
+    list_filter = ('run_date', 'region', 'model_name')
+    search_fields = ('sku', 'region')
+    inlines = [ForecastValueInline, ForecastExplanationInline]
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class GraphragConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'graphrag'
+
+    def ready(self):
+        # Workers dedicated to forecasting can import the scientific stack at boot
+        if getattr(settings, 'GRAPHRAG_WARM_UP', False):
+            from .services import warm_up
+            warm_up()
@@ -0,0 +1,191 @@
+"""
+Batched question answering over the supply-chain knowledge graph.
+
+Each (start node, question) pair needs the text of the node's n-hop
+neighbourhood as context. Rendered contexts are cached per
+(graph version, node, hops), questions that share a context are asked
+together in one structured-output prompt, and the prompts run
+concurrently. Questions whose answer is missing or malformed are retried
+in a new prompt; everything else is answered once.
+"""
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+
+from personal_website.instrumentation import record_llm_usage, registry, timed
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TEMPLATE = """Knowledge Graph context ({hops}-hop neighborhood of {node}):
+
+{context}
+
+Answer each question below using the graph context above. Each line is a JSON
+object with an id and a question; return one answer per id.
+
+{questions}
+"""
+
+
+def graph_version(G):
+    """Content fingerprint of a graph, stored on ``G.graph['version']``"""
+    version = G.graph.get('version')
+    if version is None:
+        digest = hashlib.sha1()
+        for node, data in sorted(G.nodes(data=True), key=lambda item: str(item[0])):
+            digest.update(repr((node, sorted(data.items()))).encode())
+        for u, v, data in sorted(G.edges(data=True), key=lambda item: (str(item[0]), str(item[1]))):
+            digest.update(repr((u, v, sorted(data.items()))).encode())
+        version = G.graph['version'] = digest.hexdigest()[:16]
+    return version
+
+
+def response_schema():
+    """JSON schema for the structured-output response"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "graph_answers",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "answers": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "string"},
+                                "answer": {"type": "string"},
+                            },
+                            "required": ["id", "answer"],
+                            "additionalProperties": False,
+                        },
+                    },
+                },
+                "required": ["answers"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+class GraphQueryEngine:
+    """Answer many graph questions with cached contexts and grouped LLM calls"""
+
+    def __init__(self, service, client, model="gpt-4o-mini", max_questions_per_prompt=10,
+                 max_workers=4, max_retries=1, context_cache_seconds=3600):
+        self.service = service
+        self.client = client
+        self.model = model
+        self.max_questions_per_prompt = max_questions_per_prompt
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.context_cache_seconds = context_cache_seconds
+        self.llm_calls = 0
+
+    def contexts(self, G, keys):
+        """Rendered neighbourhood text for each ``(node, hops)``, built once per graph version"""
+        version = graph_version(G)
+        cache_keys = {key: f"graphrag:context:{version}:{key[1]}:{key[0]}" for key in keys}
+        found = cache.get_many(cache_keys.values())
+        contexts, missing = {}, {}
+        for key, cache_key in cache_keys.items():
+            if cache_key in found:
+                contexts[key] = found[cache_key]
+            else:
+                node, hops = key
+                with timed('graph_context'):
+                    contexts[key] = self.service.subgraph_to_text(self.service.get_n_hop_subgraph(G, node, n=hops))
+                missing[cache_key] = contexts[key]
+        if missing:
+            cache.set_many(missing, self.context_cache_seconds)
+        registry.inc('graph_context_cache_total', len(keys) - len(missing), outcome='hit')
+        registry.inc('graph_context_cache_total', len(missing), outcome='miss')
+        return contexts
+
+    def answer(self, G, queries, default_hops=2):
+        """
+        Answer ``queries``, a list of dicts with ``node``, ``question`` and
+        optional ``hops``. Returns one result dict per query, in order.
+        """
+        results = []
+        groups = {}
+        for index, query in enumerate(queries):
+            node, question = query.get('node'), query.get('question')
+            hops = query.get('hops', default_hops)
+            result = {'node': node, 'question': question, 'hops': hops, 'answer': None}
+            results.append(result)
+            if not isinstance(question, str) or not question.strip():
+                result['error'] = "question is required"
+            elif node not in G:
+                result['error'] = f"unknown node: {node}"
+            elif not isinstance(hops, int) or isinstance(hops, bool) or not 0 <= hops <= 5:
+                result['error'] = "hops must be an integer between 0 and 5"
+            else:
+                groups.setdefault((node, hops), []).append(index)
+
+        contexts = self.contexts(G, list(groups))
+        if self.client is None:
+            # No LLM configured: answer with the raw graph context
+            for (node, hops), indices in groups.items():
+                for index in indices:
+                    results[index]['answer'] = f"Graph context for {node}: " + "; ".join(
+                        contexts[(node, hops)].splitlines())
+            return results
+
+        pending = groups
+        for attempt in range(self.max_retries + 1):
+            if not pending:
+                break
+            batches = [
+                (key, indices[start:start + self.max_questions_per_prompt])
+                for key, indices in pending.items()
+                for start in range(0, len(indices), self.max_questions_per_prompt)
+            ]
+            self.llm_calls += len(batches)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                replies = pool.map(lambda batch: self._request(batch[0], contexts[batch[0]], batch[1], queries),
+                                   batches)
+                for answers in replies:
+                    for index, text in answers.items():
+                        results[index]['answer'] = text
+            pending = {key: [i for i in indices if results[i]['answer'] is None] for key, indices in pending.items()}
+            pending = {key: indices for key, indices in pending.items() if indices}
+
+        for indices in pending.values():
+            for index in indices:
+                results[index]['error'] = "no answer from the language model"
+        return results
+
+    def _request(self, key, context, indices, queries):
+        """Ask one group of questions; returns ``{query index: answer}``"""
+        node, hops = key
+        lines = "\n".join(
+            json.dumps({"id": f"q{i}", "question": queries[i]['question']}) for i in indices
+        )
+        prompt = PROMPT_TEMPLATE.format(node=node, hops=hops, context=context, questions=lines)
+        try:
+            with timed('llm_graph_rag_batch'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format=response_schema(),
+                    temperature=0,
+                )
+            record_llm_usage('llm_graph_rag_batch', response)
+            payload = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            logger.warning("Graph query request failed (%d questions on %s): %s", len(indices), node, e)
+            return {}
+
+        wanted = {f"q{i}": i for i in indices}
+        answers = {}
+        entries = payload.get("answers", []) if isinstance(payload, dict) else []
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get("id") in wanted and isinstance(entry.get("answer"), str):
+                answers[wanted[entry["id"]]] = entry["answer"]
+        return answers
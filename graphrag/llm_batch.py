@@ -0,0 +1,192 @@
+"""
+Batched multi-series LLM forecasting with structured output.
+
+Recent-demand windows for many (SKU, Region) series are packed into
+size-limited prompts. Each prompt asks for JSON matching a schema with one
+entry per series id; replies are validated per series, and only the series
+that are missing or malformed are re-packed and retried. Batches within a
+round are sent concurrently. Every series that ends without a forecast is
+reported with the reason, including series sent in with no recent data.
+"""
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from personal_website.instrumentation import record_llm_usage, registry, timed
+
+logger = logging.getLogger(__name__)
+
+SERIES_SEPARATOR = "|"
+
+PROMPT_TEMPLATE = """You are a demand planner. Each line below is one demand series as JSON with its
+series_id, the date of its last observation and its most recent daily values (oldest first).
+For every series, forecast the next {steps} days of demand after its last date.
+Return one entry per series_id with exactly {steps} numbers in date order.
+
+{series}
+"""
+
+
+def series_id(sku, region):
+    return f"{sku}{SERIES_SEPARATOR}{region}"
+
+
+def split_series_id(value):
+    sku, _, region = value.partition(SERIES_SEPARATOR)
+    return sku, region
+
+
+def response_schema(steps):
+    """JSON schema for the structured-output response"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "demand_forecasts",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "forecasts": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "series_id": {"type": "string"},
+                                "values": {"type": "array", "items": {"type": "number"}},
+                            },
+                            "required": ["series_id", "values"],
+                            "additionalProperties": False,
+                        },
+                    },
+                },
+                "required": ["forecasts"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def _series_line(sid, recent_data):
+    dates = sorted(recent_data)
+    return json.dumps({
+        "series_id": sid,
+        "last_date": dates[-1],
+        "values": [recent_data[d] for d in dates],
+    }, separators=(",", ":"))
+
+
+def pack_batches(lines, max_series, max_chars):
+    """Greedily group ``{series_id: line}`` into batches under both limits"""
+    batches, current, size = [], [], 0
+    for sid, line in lines.items():
+        if current and (len(current) >= max_series or size + len(line) + 1 > max_chars):
+            batches.append(current)
+            current, size = [], 0
+        current.append(sid)
+        size += len(line) + 1
+    if current:
+        batches.append(current)
+    return batches
+
+
+class BatchLLMForecaster:
+    """Forecast many series with a small number of structured LLM calls"""
+
+    def __init__(self, client, model="gpt-4o-mini", steps=7, max_series_per_prompt=25,
+                 max_prompt_chars=12000, max_workers=4, max_retries=2):
+        self.client = client
+        self.model = model
+        self.steps = steps
+        self.max_series_per_prompt = max_series_per_prompt
+        self.max_prompt_chars = max_prompt_chars
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+
+    def forecast(self, windows):
+        """
+        Forecast every series in ``windows`` (``{series_id: {date: value}}``).
+
+        Returns ``(forecasts, errors)`` where ``forecasts`` maps series ids
+        to ``{date: value}`` and ``errors`` maps every other requested series
+        id to the reason it has no forecast (its last one when retried).
+        """
+        errors = {sid: "no recent data" for sid, data in windows.items() if not data}
+        lines = {sid: _series_line(sid, data) for sid, data in windows.items() if data}
+        pending = list(lines)
+        forecasts = {}
+
+        for attempt in range(self.max_retries + 1):
+            if not pending:
+                break
+            batches = pack_batches({sid: lines[sid] for sid in pending},
+                                   self.max_series_per_prompt, self.max_prompt_chars)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                for answers, batch_errors in pool.map(lambda batch: self._request(batch, lines), batches):
+                    for sid, values in answers.items():
+                        forecasts[sid] = self._to_dates(windows[sid], values)
+                    errors.update(batch_errors)
+            pending = [sid for sid in pending if sid not in forecasts]
+            if pending and attempt < self.max_retries:
+                registry.inc('llm_batch_series_total', len(pending), outcome='retried')
+
+        for sid in forecasts:
+            errors.pop(sid, None)
+        registry.inc('llm_batch_series_total', len(forecasts), outcome='ok')
+        if errors:
+            registry.inc('llm_batch_series_total', len(errors), outcome='failed')
+        return forecasts, errors
+
+    def _request(self, batch, lines):
+        """Send one batch; return valid ``{series_id: values}`` answers and ``{series_id: error}``"""
+        prompt = PROMPT_TEMPLATE.format(steps=self.steps, series="\n".join(lines[sid] for sid in batch))
+        try:
+            with timed('llm_forecast_batch'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format=response_schema(self.steps),
+                    temperature=0,
+                )
+            record_llm_usage('llm_forecast_batch', response)
+            payload = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            logger.warning("LLM batch forecast request failed (%d series): %s", len(batch), e)
+            return {}, {sid: f"request failed: {e}" for sid in batch}
+        return self.validate(payload, batch)
+
+    def validate(self, payload, batch):
+        """
+        Split a reply into answers for requested series that have ``steps``
+        finite numbers and an error for every other series of ``batch``
+        """
+        answers, errors = {}, {}
+        entries = payload.get("forecasts") if isinstance(payload, dict) else None
+        if not isinstance(entries, list):
+            logger.warning("LLM batch forecast reply has no forecasts list")
+            return {}, {sid: "reply has no forecasts list" for sid in batch}
+        for entry in entries:
+            sid = entry.get("series_id") if isinstance(entry, dict) else None
+            if sid not in batch:
+                logger.debug("Ignoring LLM forecast entry for unrequested series: %r", entry)
+                continue
+            values = entry.get("values")
+            if not isinstance(values, list) or len(values) != self.steps:
+                errors[sid] = f"expected {self.steps} values"
+            elif not all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)
+                         for v in values):
+                errors[sid] = "values must be finite numbers"
+            else:
+                answers[sid] = [float(v) for v in values]
+        for sid in batch:
+            if sid not in answers and sid not in errors:
+                errors[sid] = "missing from the reply"
+        if errors:
+            logger.warning("LLM batch forecast reply invalid for %d of %d series", len(errors), len(batch))
+        return answers, errors
+
+    @staticmethod
+    def _to_dates(recent_data, values):
+        last = date.fromisoformat(max(recent_data))
+        return {str(last + timedelta(days=i + 1)): value for i, value in enumerate(values)}
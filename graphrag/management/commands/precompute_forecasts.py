@@ -0,0 +1,112 @@
+"""
+Precompute forecasts for every (SKU, Region) series and store them.
+
+    python manage.py precompute_forecasts
+    python manage.py precompute_forecasts --with-llm --explain
+    python manage.py precompute_forecasts --every 86400   # simple scheduler loop
+"""
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from graphrag.llm_batch import series_id
+from graphrag.services import ForecastingService
+from graphrag.store import save_forecasts
+
+
+class Command(BaseCommand):
+    help = "Fit and store forecasts for all series so pages can read them instead of recomputing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--run-date', help="Run date to store (YYYY-MM-DD, default today)")
+        parser.add_argument('--steps', type=int, default=7, help="Forecast horizon in days")
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help="Series fitted per bulk write (and rows per INSERT)")
+        parser.add_argument('--sku', action='append', help="Only this SKU (repeatable)")
+        parser.add_argument('--region', action='append', help="Only this region (repeatable)")
+        parser.add_argument('--no-intervals', action='store_true', help="Skip Monte Carlo quantile bands")
+        parser.add_argument('--with-llm', action='store_true', help="Also store batched LLM forecasts")
+        parser.add_argument('--explain', action='store_true',
+                            help="Also store per-date explanations of the LLM forecast (needs --with-llm)")
+        parser.add_argument('--every', type=float, default=0,
+                            help="Repeat every N seconds instead of running once")
+
+    def handle(self, *args, **options):
+        try:
+            run_date = date.fromisoformat(options['run_date']) if options['run_date'] else None
+        except ValueError:
+            raise CommandError(f"Invalid --run-date: {options['run_date']}")
+        if options['explain'] and not options['with_llm']:
+            # run_forecast explains the LLM forecast; stored explanations must describe the same numbers
+            raise CommandError("--explain explains the LLM forecast and needs --with-llm")
+
+        while True:
+            started = time.perf_counter()
+            stored, failed = self.precompute(run_date or date.today(), options)
+            self.stdout.write(self.style.SUCCESS(
+                f"Stored {stored} forecasts ({failed} failed) in {time.perf_counter() - started:.1f}s"
+            ))
+            if not options['every']:
+                return
+            time.sleep(max(0.0, options['every'] - (time.perf_counter() - started)))
+
+    def precompute(self, run_date, options):
+        service = ForecastingService()
+        df, events_df = service.load_data()
+        if options['sku']:
+            df = df[df["SKU"].isin(options['sku'])]
+        if options['region']:
+            df = df[df["Region"].isin(options['region'])]
+        series = sorted(df.groupby(["SKU", "Region"]).groups)
+
+        llm_forecasts = {}
+        if options['with_llm']:
+            llm_forecasts, llm_errors = service.run_llm_forecast_batch(
+                service.get_all_recent_data(df), steps=options['steps']
+            )
+            for sid, error in sorted(llm_errors.items()):
+                self.stderr.write(f"LLM forecast failed for {sid}: {error}")
+
+        stored = failed = 0
+        batch_size = options['batch_size']
+        for start in range(0, len(series), batch_size):
+            results = []
+            for sku, region in series[start:start + batch_size]:
+                llm_forecast = llm_forecasts.get(series_id(sku, region))
+                try:
+                    results.append(self.forecast_series(service, df, events_df, sku, region, llm_forecast, options))
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Forecast failed for {sku}/{region}: {e}")
+            save_forecasts(results, run_date, batch_size=batch_size * options['steps'])
+            stored += len(results)
+            self.stdout.write(f"  {start + len(results)}/{len(series)} series processed")
+        return stored, failed
+
+    def forecast_series(self, service, df, events_df, sku, region, llm_forecast, options):
+        sku_df = service.prepare_sku_data(df, sku, region)
+        model_fit = service.fit_arima(sku_df)
+        ml_forecast, summary, intervals = service.forecast_from_fit(
+            model_fit, options['steps'], with_intervals=not options['no_intervals']
+        )
+        result = {
+            'sku': sku,
+            'region': region,
+            'ml_forecast': ml_forecast,
+            'intervals': intervals,
+            'model_summary': summary,
+            'model_metadata': {
+                'order': [1, 1, 1],
+                'aic': float(model_fit.aic),
+                'bic': float(model_fit.bic),
+                'nobs': int(model_fit.nobs),
+                'params': {name: float(value) for name, value in model_fit.params.items()},
+                'last_observation': str(sku_df.index[-1].date()),
+            },
+        }
+        if llm_forecast:
+            result['llm_forecast'] = llm_forecast
+            if options['explain']:
+                result['explanations'] = service.explain_forecast(llm_forecast, events_df, sku, region)
+        return result
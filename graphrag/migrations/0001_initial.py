@@ -0,0 +1,78 @@
+# Generated by Django 4.2.7 on 2026-10-19 20:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastExplanation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('text', models.TextField()),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ForecastRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sku', models.CharField(max_length=64)),
+                ('region', models.CharField(max_length=64)),
+                ('run_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('horizon', models.PositiveSmallIntegerField(default=7)),
+                ('model_name', models.CharField(default='ARIMA(1,1,1)', max_length=64)),
+                ('model_metadata', models.JSONField(blank=True, default=dict)),
+                ('model_summary', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ForecastValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('ml_value', models.FloatField()),
+                ('llm_value', models.FloatField(blank=True, null=True)),
+                ('p05', models.FloatField(blank=True, null=True)),
+                ('p25', models.FloatField(blank=True, null=True)),
+                ('p75', models.FloatField(blank=True, null=True)),
+                ('p95', models.FloatField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='values', to='graphrag.forecastrun')),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='forecastrun',
+            index=models.Index(fields=['sku', 'region', 'run_date'], name='graphrag_run_series_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='forecastrun',
+            constraint=models.UniqueConstraint(fields=('sku', 'region', 'run_date', 'model_name'), name='graphrag_run_unique'),
+        ),
+        migrations.AddField(
+            model_name='forecastexplanation',
+            name='run',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='explanations', to='graphrag.forecastrun'),
+        ),
+        migrations.AddConstraint(
+            model_name='forecastvalue',
+            constraint=models.UniqueConstraint(fields=('run', 'date'), name='graphrag_value_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='forecastexplanation',
+            constraint=models.UniqueConstraint(fields=('run', 'date'), name='graphrag_explanation_unique'),
+        ),
+    ]
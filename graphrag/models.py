@@ -1,3 +1,58 @@
 from django.db import models
 
-# Create your models here.
+
+class ForecastRun(models.Model):
+    """A materialized forecast for one (SKU, Region) series"""
+
+    sku = models.CharField(max_length=64)
+    region = models.CharField(max_length=64)
+    run_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    horizon = models.PositiveSmallIntegerField(default=7)
+    model_name = models.CharField(max_length=64, default='ARIMA(1,1,1)')
+    model_metadata = models.JSONField(default=dict, blank=True)
+    model_summary = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sku', 'region', 'run_date'], name='graphrag_run_series_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['sku', 'region', 'run_date', 'model_name'], name='graphrag_run_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.sku}/{self.region} @ {self.run_date}"
+
+
+class ForecastValue(models.Model):
+    """Forecasted demand for one date of a run, with Monte Carlo quantile bands"""
+
+    run = models.ForeignKey(ForecastRun, on_delete=models.CASCADE, related_name='values')
+    date = models.DateField()
+    ml_value = models.FloatField()
+    llm_value = models.FloatField(null=True, blank=True)
+    p05 = models.FloatField(null=True, blank=True)
+    p25 = models.FloatField(null=True, blank=True)
+    p75 = models.FloatField(null=True, blank=True)
+    p95 = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'date'], name='graphrag_value_unique'),
+        ]
+
+
+class ForecastExplanation(models.Model):
+    """Plain-language explanation of a forecasted date"""
+
+    run = models.ForeignKey(ForecastRun, on_delete=models.CASCADE, related_name='explanations')
+    date = models.DateField()
+    text = models.TextField()
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'date'], name='graphrag_explanation_unique'),
+        ]
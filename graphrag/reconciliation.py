@@ -0,0 +1,129 @@
+"""
+Hierarchical forecast reconciliation across SKU and region.
+
+Bottom-level series are (SKU, Region) pairs. Aggregates follow the
+wildcards used by the event data: ``ALL|<Region>`` (all SKUs in a region),
+``<SKU>|National`` (one SKU across regions) and ``ALL|National``. The
+summing matrix ``S`` and the aggregation matrix ``A`` (``S = [A; I]``) are
+scipy sparse matrices, so hierarchies with tens of thousands of bottom
+series never materialise a dense ``n x n`` matrix.
+
+Reconciliation uses the zero-constrained form: with ``C = [I, -A]`` (so
+coherent forecasts satisfy ``C y = 0``) and a diagonal error covariance
+``W``,
+
+    y = yhat - W C' (C W C')^-1 C yhat
+
+which equals the MinT/WLS projection ``S (S' W^-1 S)^-1 S' W^-1 yhat``.
+``C W C'`` is only ``n_aggregates x n_aggregates`` and sparse; it is
+factorised once and every horizon is solved in the same call.
+"""
+import numpy as np
+
+from .llm_batch import SERIES_SEPARATOR, series_id
+
+ALL_SKUS = "ALL"
+NATIONAL = "National"
+METHODS = ('bottom_up', 'ols', 'wls_struct', 'mint_diag')
+
+
+class Hierarchy:
+    """Summing structure of a SKU -> Region -> National hierarchy"""
+
+    def __init__(self, bottom_keys, sku_totals=True):
+        from scipy import sparse
+
+        bottom_keys = list(dict.fromkeys(bottom_keys))
+        skus = [key.partition(SERIES_SEPARATOR)[0] for key in bottom_keys]
+        regions = [key.partition(SERIES_SEPARATOR)[2] for key in bottom_keys]
+        region_names, region_index = np.unique(regions, return_inverse=True)
+        sku_names, sku_index = np.unique(skus, return_inverse=True)
+        n_bottom = len(bottom_keys)
+        columns = np.arange(n_bottom)
+
+        aggregate_keys = [series_id(ALL_SKUS, NATIONAL)]
+        aggregate_keys += [series_id(ALL_SKUS, region) for region in region_names]
+        rows = [np.zeros(n_bottom, dtype=np.int64), 1 + region_index]
+        if sku_totals:
+            aggregate_keys += [series_id(sku, NATIONAL) for sku in sku_names]
+            rows.append(1 + len(region_names) + sku_index)
+
+        n_aggregates = len(aggregate_keys)
+        self.A = sparse.csr_matrix(
+            (np.ones(n_bottom * len(rows)), (np.concatenate(rows), np.tile(columns, len(rows)))),
+            shape=(n_aggregates, n_bottom),
+        )
+        self.S = sparse.vstack([self.A, sparse.identity(n_bottom, format='csr')], format='csr')
+        self.aggregate_keys = aggregate_keys
+        self.bottom_keys = bottom_keys
+        self.keys = aggregate_keys + bottom_keys
+        self.index = {key: i for i, key in enumerate(self.keys)}
+
+    @property
+    def n_aggregates(self):
+        return len(self.aggregate_keys)
+
+    @property
+    def n_bottom(self):
+        return len(self.bottom_keys)
+
+    def aggregate(self, bottom):
+        """All levels, ``(n_total, ...)``, from bottom-level values ``(n_bottom, ...)``"""
+        return np.asarray(self.S @ np.asarray(bottom, dtype=float))
+
+    def coherence_error(self, values):
+        """Largest absolute violation of ``C y = 0`` over all aggregates and horizons"""
+        values = np.asarray(values, dtype=float)
+        gap = values[:self.n_aggregates] - self.A @ values[self.n_aggregates:]
+        return float(np.abs(gap).max()) if gap.size else 0.0
+
+
+def reconcile(hierarchy, base, method='mint_diag', variances=None):
+    """
+    Reconcile base forecasts ``base`` (``(n_total, H)`` in ``hierarchy.keys``
+    order) so every aggregate equals the sum of its children.
+
+    ``method`` is ``bottom_up``, ``ols`` (W = I), ``wls_struct`` (W = number
+    of bottom series under each node) or ``mint_diag`` (W = in-sample
+    one-step error variance per series, passed as ``variances``).
+    """
+    from scipy import sparse
+    from scipy.sparse.linalg import splu
+
+    base = np.asarray(base, dtype=float)
+    squeeze = base.ndim == 1
+    base = base.reshape(len(hierarchy.keys), -1)
+    n_aggregates = hierarchy.n_aggregates
+
+    if method == 'bottom_up':
+        result = hierarchy.aggregate(base[n_aggregates:])
+        return result[:, 0] if squeeze else result
+
+    if method == 'ols':
+        weights = np.ones(len(hierarchy.keys))
+    elif method == 'wls_struct':
+        weights = np.asarray(hierarchy.S.sum(axis=1)).ravel()
+    elif method == 'mint_diag':
+        if variances is None:
+            raise ValueError("mint_diag needs per-series error variances")
+        weights = np.asarray(variances, dtype=float).ravel()
+        if weights.shape != (len(hierarchy.keys),) or not np.isfinite(weights).all():
+            raise ValueError("variances must be one finite value per series")
+        # Series with (near) zero in-sample error would otherwise be treated as exact
+        floor = max(float(np.median(weights[weights > 0])) * 1e-6, 1e-12) if (weights > 0).any() else 1.0
+        weights = np.maximum(weights, floor)
+    else:
+        raise ValueError(f"unknown reconciliation method {method!r}, expected one of {METHODS}")
+
+    w_aggregate = weights[:n_aggregates]
+    w_bottom = sparse.diags(weights[n_aggregates:])
+    A = hierarchy.A
+    # C W C' = W_a + A W_b A'
+    system = (sparse.diags(w_aggregate) + A @ w_bottom @ A.T).tocsc()
+    gap = base[:n_aggregates] - A @ base[n_aggregates:]
+    lam = splu(system).solve(gap)
+
+    # W C' lam = [W_a lam; -W_b A' lam]
+    adjustment = np.vstack([w_aggregate[:, None] * lam, -(w_bottom @ (A.T @ lam))])
+    result = base - adjustment
+    return result[:, 0] if squeeze else result
@@ -1,20 +1,41 @@
 """
 Forecasting services containing ML and LLM forecasting logic
+
+pandas, numpy, matplotlib, networkx, statsmodels and openai are imported
+inside the methods that need them so that importing this module (which
+happens whenever the URLconf loads) stays cheap for processes that only
+serve the portfolio pages or the chatbot. Call ``warm_up()`` in workers
+that should pay the import cost up front.
 """
 import ast
-import pandas as pd
-import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import networkx as nx
-from statsmodels.tsa.arima.model import ARIMA
-from openai import OpenAI
+import logging
 from django.conf import settings
+from personal_website.instrumentation import record_llm_usage, timed
 import io
 import base64
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+
+def _pyplot():
+    """Import pyplot with the non-interactive Agg backend"""
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def warm_up():
+    """Import every heavy dependency of the forecasting pipeline now"""
+    with timed('graphrag_warm_up'):
+        import numpy  # noqa: F401
+        import pandas  # noqa: F401
+        import networkx  # noqa: F401
+        import openai  # noqa: F401
+        from statsmodels.tsa.arima.model import ARIMA  # noqa: F401
+        _pyplot()
+
 
 class ForecastingService:
     """Service class for handling all forecasting operations"""
@@ -23,12 +44,15 @@ class ForecastingService:
         self.data_dir = settings.DATA_DIR
         self.openai_client = None
         if settings.OPENAI_API_KEY:
+            from openai import OpenAI
             self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
     
     def load_data(self):
         """Load demand and event data"""
-        df = pd.read_csv(self.data_dir / "synthetic_demand_timeseries.csv", parse_dates=["Date"])
-        events_df = pd.read_csv(self.data_dir / "Synthetic_Event_Data.csv")
+        import pandas as pd
+        with timed('csv_load'):
+            df = pd.read_csv(self.data_dir / "synthetic_demand_timeseries.csv", parse_dates=["Date"])
+            events_df = pd.read_csv(self.data_dir / "Synthetic_Event_Data.csv")
         return df, events_df
     
     def prepare_sku_data(self, df, sku="SKU123", region="North"):
@@ -42,11 +66,27 @@ class ForecastingService:
         recent_data = {str(k.date()): int(v) for k, v in sku_df["Demand"].tail(days).items()}
         return recent_data
     
+    def fit_arima(self, sku_df):
+        """Fit the ARIMA model used for the ML forecast"""
+        from statsmodels.tsa.arima.model import ARIMA
+        with timed('arima_fit'):
+            model = ARIMA(sku_df["Demand"], order=(1, 1, 1))
+            return model.fit()
+    
     def run_ml_forecast(self, sku_df, steps=7):
         """Run ARIMA ML forecast"""
-        model = ARIMA(sku_df["Demand"], order=(1, 1, 1))
-        model_fit = model.fit()
-        
+        ml_forecast_dict, summary, _ = self._ml_forecast(sku_df, steps, with_intervals=False)
+        return ml_forecast_dict, summary
+    
+    def run_ml_forecast_with_intervals(self, sku_df, steps=7):
+        """Run ARIMA ML forecast plus Monte Carlo quantile bands"""
+        return self._ml_forecast(sku_df, steps, with_intervals=True)
+    
+    def _ml_forecast(self, sku_df, steps, with_intervals):
+        return self.forecast_from_fit(self.fit_arima(sku_df), steps, with_intervals)
+    
+    def forecast_from_fit(self, model_fit, steps=7, with_intervals=True):
+        """Point forecast, summary text and optional quantile bands from a fitted model"""
         # Get forecast
         pred = model_fit.forecast(steps=steps)
         
@@ -56,17 +96,65 @@ class ForecastingService:
         # Get model summary as string
         summary = str(model_fit.summary())
         
-        return ml_forecast_dict, summary
+        intervals = None
+        if with_intervals:
+            from .uncertainty import prediction_intervals
+            with timed('monte_carlo_intervals'):
+                intervals = prediction_intervals(
+                    model_fit, pred,
+                    n_paths=settings.FORECAST_MC_PATHS,
+                    max_elements=settings.FORECAST_MC_MAX_ELEMENTS,
+                )
+        
+        return ml_forecast_dict, summary, intervals
     
-    def run_llm_forecast(self, recent_data):
+    def run_reconciled_forecast(self, df, steps=7, method=None):
+        """
+        ARIMA forecasts for every SKU/Region series and every aggregate
+        (``ALL|<Region>``, ``<SKU>|National``, ``ALL|National``), reconciled
+        so totals add up. Returns ``{series_id: {date: value}}``.
+        
+        The base forecasts come from one ARIMA fit per hierarchy node, in a
+        Python loop at roughly 20-30 ms per fit. That loop, not the sparse
+        reconciliation, dominates the runtime: tens of thousands of series
+        take minutes, so at that scale call this from precompute_forecasts
+        rather than from a request.
+        """
+        import numpy as np
+        import pandas as pd
+        from .llm_batch import series_id
+        from .reconciliation import Hierarchy, reconcile
+        from .uncertainty import model_residuals
+        
+        method = method or settings.FORECAST_RECONCILIATION_METHOD
+        history = df.pivot_table(index=["SKU", "Region"], columns="Date", values="Demand", aggfunc="sum")
+        history = history.T.asfreq("D").T.fillna(0.0)
+        hierarchy = Hierarchy([series_id(sku, region) for sku, region in history.index])
+        levels = hierarchy.aggregate(history.to_numpy())
+        
+        base = np.empty((len(hierarchy.keys), steps))
+        variances = np.empty(len(hierarchy.keys))
+        for i, values in enumerate(levels):
+            model_fit = self.fit_arima(pd.DataFrame({"Demand": values}, index=history.columns))
+            base[i] = model_fit.forecast(steps=steps).to_numpy()
+            residuals = model_residuals(model_fit)
+            variances[i] = residuals.var() if residuals.size > 1 else 1.0
+        
+        with timed('reconcile_forecasts'):
+            reconciled = reconcile(hierarchy, base, method=method, variances=variances)
+        dates = [str(d.date()) for d in pd.date_range(history.columns[-1] + pd.Timedelta(days=1), periods=steps)]
+        return {key: dict(zip(dates, map(float, row))) for key, row in zip(hierarchy.keys, reconciled)}
+    
+    def run_llm_forecast(self, recent_data, sku="SKU123", region="North"):
         """Run LLM-based forecast"""
+        import pandas as pd
         if not self.openai_client:
             # Return dummy data if no API key
             return self._dummy_llm_forecast(recent_data)
         
         prompt = f"""
         You are a demand planner. Based on the recent 14 days of data below, find the latest day of data and then start forecasting the value for the next 7 days.
-        Please forecast the next 7 days of demand for SKU123 in the North region.
+        Please forecast the next 7 days of demand for {sku} in the {region} region.
         Answer will be in a list of numbers with forecasted value sorted in ascending order with date.
         Answer just the final list with no explanation with following structure: [value1, value2, value3, value4, value5, value6, value7]
         
@@ -75,10 +163,12 @@ class ForecastingService:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with timed('llm_forecast'):
+                response = self.openai_client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            record_llm_usage('llm_forecast', response)
             
             llm_response = response.choices[0].message.content
             llm_forecast_list = ast.literal_eval(llm_response)
@@ -96,8 +186,42 @@ class ForecastingService:
             print(f"LLM forecast error: {e}")
             return self._dummy_llm_forecast(recent_data)
     
+    def get_all_recent_data(self, df, days=14):
+        """Recent data of every (SKU, Region) series, keyed by series id"""
+        from .llm_batch import series_id
+        recent = df.sort_values("Date").groupby(["SKU", "Region"], sort=False).tail(days)
+        windows = {}
+        for (sku, region), group in recent.groupby(["SKU", "Region"], sort=True):
+            windows[series_id(sku, region)] = {
+                str(d.date()): int(v) for d, v in zip(group["Date"], group["Demand"])
+            }
+        return windows
+    
+    def run_llm_forecast_batch(self, series_windows, steps=7):
+        """
+        Forecast many series with few structured-output LLM calls.
+        
+        Returns ``(forecasts, errors)``. ``errors`` maps each series the LLM
+        did not forecast to the reason; those with recent data get the dummy
+        forecast, series without any are left out of ``forecasts``.
+        """
+        if not self.openai_client:
+            forecasts = {sid: self._dummy_llm_forecast(data) for sid, data in series_windows.items() if data}
+            return forecasts, {sid: "no recent data" for sid, data in series_windows.items() if not data}
+        
+        from .llm_batch import BatchLLMForecaster
+        forecaster = BatchLLMForecaster(self.openai_client, steps=steps, **settings.LLM_BATCH_FORECAST)
+        forecasts, errors = forecaster.forecast(series_windows)
+        for sid, error in errors.items():
+            if series_windows[sid]:
+                logger.warning("LLM batch forecast failed for %s (%s), using fallback", sid, error)
+                forecasts[sid] = self._dummy_llm_forecast(series_windows[sid])
+        return forecasts, errors
+    
     def _dummy_llm_forecast(self, recent_data):
         """Generate dummy forecast if LLM is not available"""
+        import numpy as np
+        import pandas as pd
         last_date = max([pd.to_datetime(d) for d in recent_data.keys()])
         first_forecast_date = last_date + pd.Timedelta(days=1)
         dates = pd.date_range(start=first_forecast_date, periods=7, freq="D")
@@ -105,12 +229,13 @@ class ForecastingService:
         # Simple forecast based on recent average
         recent_values = list(recent_data.values())
         avg = sum(recent_values) / len(recent_values)
-        forecast_values = [int(avg + np.random.randint(-10, 10)) for _ in range(7)]
+        forecast_values = [int(v) for v in avg + np.random.randint(-10, 10, size=7)]
         
         return {str(date.date()): val for date, val in zip(dates, forecast_values)}
     
     def get_events_for_date(self, date_str, events_df, sku="SKU123", region="North"):
         """Get events for a specific date"""
+        import pandas as pd
         date = pd.to_datetime(date_str)
         subset = events_df[
             (pd.to_datetime(events_df["Start_Date"]) <= date) &
@@ -141,10 +266,12 @@ class ForecastingService:
             """
             
             try:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}]
-                )
+                with timed('llm_explain'):
+                    response = self.openai_client.chat.completions.create(
+                        model="gpt-3.5-turbo",
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                record_llm_usage('llm_explain', response)
                 explanations[date] = response.choices[0].message.content
             except Exception as e:
                 explanations[date] = f"Unable to generate explanation. Events: {event_text}"
@@ -165,8 +292,11 @@ class ForecastingService:
         
         return explanations
     
-    def create_visualization(self, sku_df, ml_forecast_dict, llm_forecast_dict):
+    @timed('render_forecast_plot')
+    def create_visualization(self, sku_df, ml_forecast_dict, llm_forecast_dict, ml_intervals=None):
         """Create forecast visualization"""
+        import pandas as pd
+        plt = _pyplot()
         plt.figure(figsize=(14, 6))
         
         # Plot historical data
@@ -175,6 +305,15 @@ class ForecastingService:
         # Plot ML forecast
         ml_dates = [pd.to_datetime(d) for d in ml_forecast_dict.keys()]
         ml_values = list(ml_forecast_dict.values())
+        
+        # Shade Monte Carlo bands, widest first
+        if ml_intervals:
+            levels = sorted(ml_intervals, key=float)
+            for low, high in zip(levels[:len(levels) // 2], reversed(levels[len(levels) // 2:])):
+                coverage = round((float(high) - float(low)) * 100)
+                plt.fill_between(ml_dates, list(ml_intervals[low].values()), list(ml_intervals[high].values()),
+                                 color="red", alpha=0.12, label=f"ML {coverage}% interval")
+        
         plt.plot(ml_dates, ml_values, label="ML Forecast (ARIMA)", color="red", marker='o', linewidth=2)
         
         # Plot LLM forecast
@@ -191,7 +330,8 @@ class ForecastingService:
         
         # Convert plot to base64 string
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+        with timed('savefig'):
+            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
         buffer.seek(0)
         image_base64 = base64.b64encode(buffer.read()).decode()
         plt.close()
@@ -200,6 +340,7 @@ class ForecastingService:
     
     def create_graph_rag(self):
         """Create supply chain knowledge graph"""
+        import networkx as nx
         G = nx.DiGraph()
         
         # Add nodes
@@ -230,8 +371,11 @@ class ForecastingService:
         
         return G
     
+    @timed('render_graph')
     def visualize_graph(self, G):
         """Visualize the knowledge graph"""
+        import networkx as nx
+        plt = _pyplot()
         color_map = []
         for node, data in G.nodes(data=True):
             if data["type"] == "Supplier":
@@ -250,7 +394,8 @@ class ForecastingService:
                 color_map.append("gray")
         
         plt.figure(figsize=(12, 8))
-        pos = nx.spring_layout(G, seed=42, k=2, iterations=50)
+        with timed('graph_layout'):
+            pos = nx.spring_layout(G, seed=42, k=2, iterations=50)
         nx.draw(G, pos, with_labels=True, node_color=color_map, 
                 node_size=2000, font_size=9, font_color="white", 
                 font_weight="bold", arrows=True, edge_color="gray",
@@ -265,7 +410,8 @@ class ForecastingService:
         
         # Convert to base64
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+        with timed('savefig'):
+            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
         buffer.seek(0)
         image_base64 = base64.b64encode(buffer.read()).decode()
         plt.close()
@@ -277,9 +423,8 @@ class ForecastingService:
         if not self.openai_client:
             return self._dummy_graph_explanation(G)
         
-        # Get subgraph
-        subG = self.get_n_hop_subgraph(G, "SKU123", n=2)
-        context_text = self.subgraph_to_text(subG)
+        # Get subgraph (rendered text is cached per graph version)
+        context_text = self.graph_context(G, "SKU123", hops=2)
         
         prompt = f"""
         Knowledge Graph context (2-hop neighborhood of SKU123):
@@ -292,14 +437,33 @@ class ForecastingService:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with timed('llm_graph_rag'):
+                response = self.openai_client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            record_llm_usage('llm_graph_rag', response)
             return response.choices[0].message.content
         except Exception as e:
             return self._dummy_graph_explanation(G)
     
+    def graph_context(self, G, node, hops=2):
+        """Cached text of the n-hop neighbourhood of ``node``"""
+        return self._graph_query_engine().contexts(G, [(node, hops)])[(node, hops)]
+    
+    def answer_graph_queries(self, G, queries, hops=2):
+        """
+        Answer many ``{'node', 'question', 'hops'}`` queries against ``G``.
+        
+        Returns ``(results, llm_calls)``; results keep the order of ``queries``.
+        """
+        engine = self._graph_query_engine()
+        return engine.answer(G, queries, default_hops=hops), engine.llm_calls
+    
+    def _graph_query_engine(self):
+        from .graph_query import GraphQueryEngine
+        return GraphQueryEngine(self, self.openai_client, **settings.GRAPH_RAG_QUERY)
+    
     def _dummy_graph_explanation(self, G):
         """Dummy graph explanation if LLM not available"""
         return ("Based on the supply chain graph, SKU123 is connected to multiple entities including "
@@ -0,0 +1,121 @@
+"""
+Materialized forecast store.
+
+``save_forecasts`` writes precomputed forecasts in bulk; ``latest_forecast``
+serves the newest stored forecast for a series through the
+(sku, region, run_date) index. The serialized payload is cached under the
+id of that newest run, so every process picks up new writes on its next
+read without sharing a cache.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import ForecastExplanation, ForecastRun, ForecastValue
+
+QUANTILE_FIELDS = {'0.05': 'p05', '0.25': 'p25', '0.75': 'p75', '0.95': 'p95'}
+
+
+def save_forecasts(results, run_date, batch_size=500):
+    """
+    Store a batch of forecasts for ``run_date``, replacing earlier runs of the
+    same series, date and model. Each result is a dict with ``sku``,
+    ``region``, ``ml_forecast`` and optionally ``llm_forecast``,
+    ``intervals``, ``explanations``, ``model_name``, ``model_metadata`` and
+    ``model_summary``.
+    """
+    if not results:
+        return []
+    runs = [
+        ForecastRun(
+            sku=r['sku'],
+            region=r['region'],
+            run_date=run_date,
+            horizon=len(r['ml_forecast']),
+            model_name=r.get('model_name', 'ARIMA(1,1,1)'),
+            model_metadata=r.get('model_metadata', {}),
+            model_summary=r.get('model_summary', ''),
+        )
+        for r in results
+    ]
+
+    with transaction.atomic():
+        stale = Q()
+        for run in runs:
+            stale |= Q(sku=run.sku, region=run.region, model_name=run.model_name)
+        ForecastRun.objects.filter(stale, run_date=run_date).delete()
+
+        runs = ForecastRun.objects.bulk_create(runs, batch_size=batch_size)
+        if runs[0].pk is None:
+            # Backends without RETURNING: look the new rows up again
+            saved = {
+                (run.sku, run.region, run.model_name): run
+                for run in ForecastRun.objects.filter(stale, run_date=run_date)
+            }
+            runs = [saved[(run.sku, run.region, run.model_name)] for run in runs]
+
+        values, explanations = [], []
+        for run, result in zip(runs, results):
+            llm = result.get('llm_forecast') or {}
+            bands = result.get('intervals') or {}
+            for day, ml_value in result['ml_forecast'].items():
+                quantiles = {field: bands[q].get(day) for q, field in QUANTILE_FIELDS.items() if q in bands}
+                values.append(ForecastValue(
+                    run=run, date=date.fromisoformat(day), ml_value=ml_value, llm_value=llm.get(day), **quantiles
+                ))
+            for day, text in (result.get('explanations') or {}).items():
+                explanations.append(ForecastExplanation(run=run, date=date.fromisoformat(day), text=text))
+
+        ForecastValue.objects.bulk_create(values, batch_size=batch_size)
+        ForecastExplanation.objects.bulk_create(explanations, batch_size=batch_size)
+    return runs
+
+
+def serialize_run(run):
+    """Forecast run as JSON, in the same shape as the run_forecast API"""
+    values = list(run.values.all())
+    intervals = {
+        q: {str(v.date): getattr(v, field) for v in values}
+        for q, field in QUANTILE_FIELDS.items()
+        if values and getattr(values[0], field) is not None
+    }
+    return {
+        'sku': run.sku,
+        'region': run.region,
+        'run_date': str(run.run_date),
+        'created_at': run.created_at.isoformat(),
+        'model_name': run.model_name,
+        'model_metadata': run.model_metadata,
+        'ml_summary': run.model_summary,
+        'ml_forecast': {str(v.date): v.ml_value for v in values},
+        'llm_forecast': {str(v.date): v.llm_value for v in values if v.llm_value is not None},
+        'ml_intervals': intervals or None,
+        'explanations': {str(e.date): e.text for e in run.explanations.all()},
+    }
+
+
+def latest_forecast(sku, region):
+    """Newest stored forecast for a series as a dict, or None"""
+    latest = (
+        ForecastRun.objects
+        .filter(sku=sku, region=region)
+        .order_by('-run_date', '-created_at')
+        .values_list('pk', flat=True)
+        .first()
+    )
+    if latest is None:
+        return None
+    # Rewrites delete and re-insert runs, so a new id means new content
+    key = f"graphrag:store:run:{latest}"
+    payload = cache.get(key)
+    if payload is None:
+        run = ForecastRun.objects.filter(pk=latest).prefetch_related('values', 'explanations').first()
+        if run is None:
+            # Replaced by a concurrent save_forecasts since the lookup above
+            return None
+        payload = serialize_run(run)
+        cache.set(key, payload, settings.FORECAST_STORE_CACHE_SECONDS)
+    return payload
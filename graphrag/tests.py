@@ -1,3 +1,438 @@
-from django.test import TestCase
+import json
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+
+from benchmarks.stubs import StubOpenAI
+
+from . import store
+from .graph_query import GraphQueryEngine
+from .llm_batch import BatchLLMForecaster
+from .reconciliation import METHODS, Hierarchy, reconcile
+from .uncertainty import prediction_intervals, psi_weights, simulate_quantiles
+from .services import ForecastingService
+from .timeseries import lttb, minmax
+
+
+def _result(value, sku='SKU123', region='North'):
+    return {'sku': sku, 'region': region, 'ml_forecast': {'2024-04-01': value, '2024-04-02': value + 1}}
+
+
+class ForecastStoreTests(TestCase):
+    """Cached reads follow the database, not a per-process version counter"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rewrite_is_visible_without_cache_invalidation(self):
+        store.save_forecasts([_result(10.0)], date(2024, 3, 31))
+        self.assertEqual(store.latest_forecast('SKU123', 'North')['ml_forecast']['2024-04-01'], 10.0)
+
+        # As if stored by precompute_forecasts in another process with its own cache
+        store.save_forecasts([_result(20.0)], date(2024, 3, 31))
+        self.assertEqual(store.latest_forecast('SKU123', 'North')['ml_forecast']['2024-04-01'], 20.0)
+
+    def test_cached_read_skips_serialization(self):
+        store.save_forecasts([_result(10.0)], date(2024, 3, 31))
+        store.latest_forecast('SKU123', 'North')
+        with self.assertNumQueries(1):
+            self.assertIsNotNone(store.latest_forecast('SKU123', 'North'))
+        self.assertIsNone(store.latest_forecast('SKU999', 'North'))
+
+
+@override_settings(OPENAI_API_KEY='', ADMISSION_CONTROL={'enabled': False})
+class RunForecastStoreTests(TestCase):
+    """The run_forecast API reuses a fresh stored forecast instead of refitting"""
+
+    url = '/graphrag/api/run-forecast/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client(HTTP_HOST='localhost')
+
+    def store(self, last_observation='2024-03-30', **extra):
+        result = dict(_result(10.0), model_metadata={'last_observation': last_observation}, **extra)
+        store.save_forecasts([result], date(2024, 3, 31))
+
+    def test_stored_forecast_skips_model_fit(self):
+        self.store(llm_forecast={'2024-04-01': 12.0}, explanations={'2024-04-01': 'Promo'})
+        with mock.patch.object(ForecastingService, 'fit_arima', side_effect=AssertionError('refitted')), \
+                mock.patch.object(ForecastingService, 'run_llm_forecast', side_effect=AssertionError('re-asked')):
+            response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['ml_forecast'], {'2024-04-01': 10.0, '2024-04-02': 11.0})
+        self.assertEqual(data['explanations'], {'2024-04-01': 'Promo'})
+
+    def test_stale_stored_forecast_is_recomputed(self):
+        self.store(last_observation='2024-02-29', llm_forecast={'2024-04-01': 12.0})
+        data = self.client.post(self.url).json()
+        self.assertNotEqual(data['ml_forecast'], {'2024-04-01': 10.0, '2024-04-02': 11.0})
+        self.assertNotEqual(data['llm_forecast'], {'2024-04-01': 12.0})
+
+    def test_explanations_describe_the_served_llm_forecast(self):
+        # Without a stored LLM forecast the live one is explained, never stored text
+        self.store(explanations={'2024-04-01': 'About another forecast'})
+        live = {'2024-04-01': 42.0}
+        with mock.patch.object(ForecastingService, 'run_llm_forecast', return_value=live):
+            data = self.client.post(self.url).json()
+        self.assertEqual(data['llm_forecast'], live)
+        self.assertIn('42.0 units', data['explanations']['2024-04-01'])
+
+
+class LatestForecastViewTests(TestCase):
+    """The stored-forecast API degrades to 404 when the store is unavailable"""
+
+    def test_unavailable_store_is_not_found(self):
+        with mock.patch.object(store, 'latest_forecast', side_effect=OperationalError('no such table')), \
+                self.assertLogs('graphrag.views', 'WARNING'):
+            response = Client(HTTP_HOST='localhost').get('/graphrag/api/forecast/latest/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_explain_needs_the_llm_forecast(self):
+        with self.assertRaisesMessage(CommandError, '--with-llm'):
+            call_command('precompute_forecasts', '--explain')
+
+
+class DownsamplingTests(SimpleTestCase):
+    """LTTB and min-max return exactly ``width`` ordered points and keep both ends"""
+
+    def test_output_length_and_endpoints(self):
+        y = np.random.default_rng(0).normal(size=1000)
+        y[500], y[200] = 50.0, -50.0
+        for name, keep in [('lttb', lttb(np.arange(1000), y, 100)), ('minmax', minmax(y, 100))]:
+            self.assertEqual(len(keep), 100, name)
+            self.assertEqual((keep[0], keep[-1]), (0, 999), name)
+            self.assertTrue((np.diff(keep) > 0).all(), name)
+            self.assertIn(500, keep, name)
+            self.assertIn(200, keep, name)
+
+    def test_short_series_is_returned_whole(self):
+        y = np.arange(5.0)
+        self.assertEqual(lttb(np.arange(5), y, 10).tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(minmax(y, 10).tolist(), [0, 1, 2, 3, 4])
+
+
+@override_settings(ADMISSION_CONTROL={'enabled': False})
+class TimeseriesViewTests(TestCase):
+    """Validation of the downsampled history API"""
+
+    url = '/graphrag/api/timeseries/'
+
+    def setUp(self):
+        self.client = Client(HTTP_HOST='localhost')
+
+    def test_history_without_stored_forecast(self):
+        response = self.client.get(self.url, {'series': 'SKU123|North', 'width': 20, 'method': 'minmax'})
+        self.assertEqual(response.status_code, 200)
+        (series,) = response.json()['series']
+        self.assertEqual(series['points'], 20)
+        self.assertIsNone(series['forecast'])
+
+    def test_bad_parameters_are_rejected(self):
+        for params in [
+            {'width': 'wide'},
+            {'method': 'average'},
+            {'start': 'yesterday'},
+            {'start': '2024-03-01', 'end': '2024-02-01'},
+        ]:
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
+
+    def test_unknown_series_is_not_found(self):
+        self.assertEqual(self.client.get(self.url, {'series': 'SKU999|Nowhere'}).status_code, 404)
+
+    def test_unavailable_store_omits_the_forecast(self):
+        with mock.patch.object(store, 'latest_forecast', side_effect=OperationalError('no such table')), \
+                self.assertLogs('graphrag.views', 'WARNING'):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['series'][0]['forecast'])
+
+
+class BatchLLMForecastTests(SimpleTestCase):
+    """Schema validation, per-series errors and retries of the batched LLM forecaster"""
+
+    windows = {
+        'SKU1|North': {'2024-03-29': 10, '2024-03-30': 12},
+        'SKU2|North': {'2024-03-29': 20, '2024-03-30': 22},
+        'SKU3|North': {},
+    }
+
+    def forecaster(self, responder, **kwargs):
+        client = StubOpenAI(responder=responder)
+        return client, BatchLLMForecaster(client, steps=2, **kwargs)
+
+    def test_validate_reports_each_bad_entry(self):
+        _, forecaster = self.forecaster(None)
+        batch = ['ok', 'short', 'nan', 'bool', 'missing']
+        answers, errors = forecaster.validate({'forecasts': [
+            {'series_id': 'ok', 'values': [1, 2.5]},
+            {'series_id': 'short', 'values': [1]},
+            {'series_id': 'nan', 'values': [1, float('nan')]},
+            {'series_id': 'bool', 'values': [True, 2]},
+            {'series_id': 'unrequested', 'values': [1, 2]},
+            'not an object',
+        ]}, batch)
+        self.assertEqual(answers, {'ok': [1.0, 2.5]})
+        self.assertEqual(errors, {
+            'short': 'expected 2 values',
+            'nan': 'values must be finite numbers',
+            'bool': 'values must be finite numbers',
+            'missing': 'missing from the reply',
+        })
+
+    def test_validate_rejects_reply_without_list(self):
+        _, forecaster = self.forecaster(None)
+        self.assertEqual(forecaster.validate({'forecasts': 'none'}, ['a']), ({}, {'a': 'reply has no forecasts list'}))
+        self.assertEqual(forecaster.validate([], ['a']), ({}, {'a': 'reply has no forecasts list'}))
+
+    def test_only_failed_series_are_retried(self):
+        prompts = []
+
+        def responder(messages, **kwargs):
+            prompts.append(messages[-1]['content'])
+            # SKU2 only gets a valid answer on the retry
+            values = {'SKU1|North': [1, 2], 'SKU2|North': [3] if len(prompts) == 1 else [3, 4]}
+            return json.dumps({'forecasts': [
+                {'series_id': sid, 'values': v} for sid, v in values.items() if sid in prompts[-1]
+            ]})
+
+        client, forecaster = self.forecaster(responder)
+        forecasts, errors = forecaster.forecast(self.windows)
+        self.assertEqual(client.calls, 2)
+        self.assertIn('SKU1|North', prompts[0])
+        self.assertNotIn('SKU1|North', prompts[1])
+        self.assertIn('SKU2|North', prompts[1])
+        self.assertEqual(forecasts, {
+            'SKU1|North': {'2024-03-31': 1.0, '2024-04-01': 2.0},
+            'SKU2|North': {'2024-03-31': 3.0, '2024-04-01': 4.0},
+        })
+        # The empty window is never sent but is reported
+        self.assertEqual(errors, {'SKU3|North': 'no recent data'})
+
+    def test_failed_requests_are_reported_per_series(self):
+        def responder(messages, **kwargs):
+            raise ConnectionError('timeout')
+
+        client, forecaster = self.forecaster(responder, max_retries=1)
+        with self.assertLogs('graphrag.llm_batch', 'WARNING'):
+            forecasts, errors = forecaster.forecast(self.windows)
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(forecasts, {})
+        self.assertEqual(errors, {
+            'SKU1|North': 'request failed: timeout',
+            'SKU2|North': 'request failed: timeout',
+            'SKU3|North': 'no recent data',
+        })
+
+
+class GraphQueryEngineTests(SimpleTestCase):
+    """Batched graph questions: grouping by context, per-item errors and the context cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = ForecastingService()
+        self.graph = self.service.create_graph_rag()
+
+    def engine(self, responder=None, **kwargs):
+        client = StubOpenAI(**({'responder': responder} if responder else {}))
+        return client, GraphQueryEngine(self.service, client, **kwargs)
+
+    def test_questions_sharing_a_context_share_a_prompt(self):
+        prompts = []
+
+        def responder(messages, **kwargs):
+            prompts.append(messages[-1]['content'])
+            ids = [json.loads(line)['id'] for line in prompts[-1].splitlines() if line.startswith('{"id"')]
+            return json.dumps({'answers': [{'id': i, 'answer': f'answer {i}'} for i in ids]})
+
+        client, engine = self.engine(responder)
+        queries = [
+            {'node': 'SKU123', 'question': 'Which promotions?'},
+            {'node': 'North', 'question': 'Which holidays?'},
+            {'node': 'SKU123', 'question': 'Which plants?'},
+            {'node': 'SKU123', 'question': 'Which plants, one hop?', 'hops': 1},
+        ]
+        results = engine.answer(self.graph, queries)
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(engine.llm_calls, 3)
+        self.assertEqual([r['answer'] for r in results], ['answer q0', 'answer q1', 'answer q2', 'answer q3'])
+        (sku_prompt,) = [p for p in prompts if 'Which promotions?' in p]
+        self.assertIn('Which plants?', sku_prompt)
+        self.assertNotIn('Which holidays?', sku_prompt)
+        self.assertNotIn('one hop', sku_prompt)
+
+    def test_bad_items_do_not_affect_the_rest(self):
+        def responder(messages, **kwargs):
+            # Never answers the second valid question
+            return json.dumps({'answers': [{'id': 'q0', 'answer': 'Spring Sale'}, {'id': 'q5', 'answer': 5}]})
+
+        client, engine = self.engine(responder, max_retries=1)
+        results = engine.answer(self.graph, [
+            {'node': 'SKU123', 'question': 'Which promotions?'},
+            {'node': 'SKU123', 'question': ''},
+            {'node': 'Nowhere', 'question': 'Anything?'},
+            {'node': 'SKU123', 'question': 'Too far?', 'hops': 9},
+            {'node': 'SKU123', 'question': 'Not a number?', 'hops': True},
+            {'node': 'SKU123', 'question': 'Which plants?'},
+        ])
+        self.assertEqual(results[0]['answer'], 'Spring Sale')
+        self.assertNotIn('error', results[0])
+        self.assertEqual([r.get('error') for r in results[1:]], [
+            'question is required',
+            'unknown node: Nowhere',
+            'hops must be an integer between 0 and 5',
+            'hops must be an integer between 0 and 5',
+            'no answer from the language model',
+        ])
+        # Only the unanswered question was retried
+        self.assertEqual(client.calls, 2)
+
+    def test_failed_request_is_logged_and_reported(self):
+        def responder(messages, **kwargs):
+            raise ConnectionError('timeout')
+
+        _, engine = self.engine(responder, max_retries=0)
+        with self.assertLogs('graphrag.graph_query', 'WARNING'):
+            (result,) = engine.answer(self.graph, [{'node': 'SKU123', 'question': 'Which promotions?'}])
+        self.assertEqual(result['error'], 'no answer from the language model')
+
+    def test_contexts_are_cached_per_graph_version(self):
+        _, engine = self.engine()
+        with mock.patch.object(self.service, 'get_n_hop_subgraph', wraps=self.service.get_n_hop_subgraph) as build:
+            first = engine.contexts(self.graph, [('SKU123', 2), ('North', 1)])
+            second = engine.contexts(self.graph, [('SKU123', 2), ('North', 1)])
+            self.assertEqual(build.call_count, 2)
+            self.assertEqual(first, second)
+
+            changed = self.service.create_graph_rag()
+            changed.add_edge('SKU123', 'WarehouseS', relation='STORES')
+            third = engine.contexts(changed, [('SKU123', 2)])
+            self.assertEqual(build.call_count, 3)
+            self.assertIn('WarehouseS', third[('SKU123', 2)])
+
+
+class ReconciliationTests(SimpleTestCase):
+    """Reconciled forecasts are coherent and MinT reduces to the textbook projections"""
+
+    def setUp(self):
+        keys = [f"SKU{s}|{r}" for s in range(6) for r in ('North', 'South', 'East')]
+        self.hierarchy = Hierarchy(keys)
+        rng = np.random.default_rng(0)
+        self.base = rng.normal(100, 20, size=(len(self.hierarchy.keys), 7))
+        self.variances = rng.uniform(0.5, 5.0, size=len(self.hierarchy.keys))
+
+    def test_every_method_is_coherent(self):
+        n_aggregates = self.hierarchy.n_aggregates
+        for method in METHODS:
+            result = reconcile(self.hierarchy, self.base, method=method, variances=self.variances)
+            self.assertLess(self.hierarchy.coherence_error(result), 1e-9, method)
+            bottom = result[n_aggregates:]
+            for i, key in enumerate(self.hierarchy.aggregate_keys):
+                sku, _, region = key.partition('|')
+                children = [
+                    j for j, child in enumerate(self.hierarchy.bottom_keys)
+                    if sku in ('ALL', child.partition('|')[0]) and region in ('National', child.partition('|')[2])
+                ]
+                np.testing.assert_allclose(result[i], bottom[children].sum(axis=0), atol=1e-9, err_msg=method)
+
+    def test_mint_with_identity_weights_is_ols(self):
+        ols = reconcile(self.hierarchy, self.base, method='ols')
+        mint = reconcile(self.hierarchy, self.base, method='mint_diag', variances=np.ones(len(self.hierarchy.keys)))
+        np.testing.assert_allclose(mint, ols, atol=1e-9)
+        # Both equal the dense projection S (S'S)^-1 S' yhat
+        S = self.hierarchy.S.toarray()
+        np.testing.assert_allclose(ols, S @ np.linalg.solve(S.T @ S, S.T @ self.base), atol=1e-9)
+
+    def test_mint_matches_the_dense_wls_projection(self):
+        mint = reconcile(self.hierarchy, self.base, method='mint_diag', variances=self.variances)
+        S = self.hierarchy.S.toarray()
+        W_inv = np.diag(1 / self.variances)
+        expected = S @ np.linalg.solve(S.T @ W_inv @ S, S.T @ W_inv @ self.base)
+        np.testing.assert_allclose(mint, expected, atol=1e-9)
+
+    def test_bottom_up_keeps_the_bottom_level(self):
+        result = reconcile(self.hierarchy, self.base, method='bottom_up')
+        np.testing.assert_array_equal(result[self.hierarchy.n_aggregates:], self.base[self.hierarchy.n_aggregates:])
+
+    def test_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            reconcile(self.hierarchy, self.base, method='mint_diag')
+        with self.assertRaises(ValueError):
+            reconcile(self.hierarchy, self.base, method='mint_diag', variances=[1.0])
+        with self.assertRaises(ValueError):
+            reconcile(self.hierarchy, self.base, method='top_down')
+
+    def test_service_forecast_is_coherent(self):
+        service = ForecastingService()
+        df, _ = service.load_data()
+        forecasts = service.run_reconciled_forecast(df, steps=3)
+        dates = sorted(forecasts['ALL|National'])
+        self.assertEqual(len(dates), 3)
+        bottom = [key for key in forecasts if not key.startswith('ALL|') and not key.endswith('|National')]
+        for date_ in dates:
+            self.assertAlmostEqual(forecasts['ALL|National'][date_], sum(forecasts[k][date_] for k in bottom), places=6)
+
+
+class PredictionIntervalTests(SimpleTestCase):
+    """psi-weight propagation agrees with statsmodels; bootstrap bands are ordered and reproducible"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import warnings
+
+        import pandas as pd
+        from statsmodels.tsa.arima.model import ARIMA
+
+        rng = np.random.default_rng(0)
+        shocks = rng.normal(0, 5, 400)
+        demand = pd.Series(100 + 0.3 * np.cumsum(shocks) + shocks, index=pd.date_range('2023-01-01', periods=400))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            cls.fit = ARIMA(demand, order=(1, 1, 1)).fit()
+        cls.forecast = cls.fit.forecast(7)
+
+    def test_psi_weight_intervals_match_statsmodels(self):
+        psi = psi_weights(self.fit, 7)
+        std = np.sqrt(self.fit.params['sigma2'] * np.cumsum(psi ** 2))
+        self.assertTrue((np.diff(std) > 0).all())
+        bounds = self.fit.get_forecast(7).conf_int(alpha=0.1).to_numpy()
+        np.testing.assert_allclose(bounds[:, 1] - self.forecast.to_numpy(), 1.6448536 * std, rtol=1e-6)
+        np.testing.assert_allclose(self.forecast.to_numpy() - bounds[:, 0], 1.6448536 * std, rtol=1e-6)
+
+    def test_bootstrap_quantiles_are_ordered_and_seeded(self):
+        bands = prediction_intervals(self.fit, self.forecast, n_paths=5000, seed=1)
+        self.assertEqual(list(bands), ['0.05', '0.25', '0.75', '0.95'])
+        values = np.array([list(band.values()) for band in bands.values()])
+        self.assertTrue((np.diff(values, axis=0) > 0).all())
+        self.assertEqual(bands, prediction_intervals(self.fit, self.forecast, n_paths=5000, seed=1))
+        # Gaussian residuals: the outer band is close to the analytic 90 % interval
+        psi = psi_weights(self.fit, 7)
+        std = np.sqrt(self.fit.params['sigma2'] * np.cumsum(psi ** 2))
+        np.testing.assert_allclose(values[3] - self.forecast.to_numpy(), 1.6448536 * std, rtol=0.15)
+
+    def test_service_bands_surround_the_point_forecast(self):
+        service = ForecastingService()
+        df, _ = service.load_data()
+        forecast, _, intervals = service.run_ml_forecast_with_intervals(service.prepare_sku_data(df))
+        for day, value in forecast.items():
+            self.assertLess(intervals['0.05'][day], value)
+            self.assertGreater(intervals['0.95'][day], value)
+
+    def test_chunking_does_not_change_the_result(self):
+        residuals = [np.random.default_rng(i).normal(size=50 + i) for i in range(5)]
+        psi = np.tile(psi_weights(self.fit, 7), (5, 1))
+        points = np.full((5, 7), 100.0)
+        whole = simulate_quantiles(points, residuals, psi, n_paths=200, seed=3)
+        self.assertEqual(whole.shape, (5, 4, 7))
+        chunked = simulate_quantiles(points, residuals, psi, n_paths=200, seed=3, max_elements=200 * 7)
+        self.assertTrue((np.diff(chunked, axis=1) >= 0).all())
+        np.testing.assert_allclose(whole.mean(), chunked.mean(), rtol=0.01)
+        with self.assertRaises(ValueError):
+            simulate_quantiles(points[:1], [np.array([])], psi[:1])
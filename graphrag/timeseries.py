@@ -0,0 +1,162 @@
+"""
+Range-queryable, downsampled demand history for charts.
+
+``DemandSeries`` holds every SKU/Region series plus the ``ALL|<Region>``,
+``<SKU>|National`` and ``ALL|National`` totals as one (series x day)
+matrix, and precomputes weekly and monthly mean/min/max aggregates. A query
+picks the coarsest resolution that still gives at least ``width`` points
+for the requested range, then reduces it to about ``width`` points with
+LTTB (shape-preserving) or min-max (spike-preserving) downsampling, so the
+payload depends on the chart width rather than on the length of history.
+"""
+import threading
+
+import numpy as np
+
+RESOLUTIONS = ('D', 'W', 'M')
+PANDAS_FREQ = {'W': 'W-SUN', 'M': 'MS'}
+METHODS = ('lttb', 'minmax')
+
+
+def lttb(x, y, n_out):
+    """Indices of ``n_out`` points chosen by Largest-Triangle-Three-Buckets"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.int64), n)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[anchor] - avg_x) * (y[lo:hi] - y[anchor]) - (x[anchor] - x[lo:hi]) * (avg_y - y[anchor]))
+        anchor = lo + int(area.argmax())
+        selected[i + 1] = anchor
+    return selected
+
+
+def minmax(y, n_out):
+    """
+    Indices of the first and last points plus the minimum and maximum of
+    ``(n_out - 2) // 2`` equal-count buckets in between, in order
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 4:
+        return np.array([0, n - 1])
+    y = np.asarray(y, dtype=float)[1:-1]
+    n_buckets = (n_out - 2) // 2
+    bucket = np.arange(n - 2) * n_buckets // (n - 2)
+    # Within each bucket the lexsort puts the minimum first and the maximum last
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(n_buckets))
+    ends = np.append(starts[1:], n - 2) - 1
+    interior = np.unique(np.concatenate([order[starts], order[ends]])) + 1
+    return np.concatenate([[0], interior, [n - 1]])
+
+
+class DemandSeries:
+    """Daily demand of every series and its weekly/monthly aggregates"""
+
+    def __init__(self, df):
+        import pandas as pd
+        from .llm_batch import series_id
+        from .reconciliation import Hierarchy
+
+        daily = df.pivot_table(index="Date", columns=["SKU", "Region"], values="Demand", aggfunc="sum")
+        daily = daily.asfreq("D")
+        hierarchy = Hierarchy([series_id(sku, region) for sku, region in daily.columns])
+        # Missing days stay missing in the series and count as zero in the totals
+        bottom = daily.to_numpy(dtype=float).T
+        totals = hierarchy.aggregate(np.nan_to_num(bottom))[:hierarchy.n_aggregates]
+        values = np.vstack([totals, bottom])
+
+        self.keys = hierarchy.keys
+        self.index = hierarchy.index
+        frame = pd.DataFrame(values.T, index=daily.index, columns=range(len(self.keys)))
+        self.levels = {'D': self._level(frame.index, values, values, values)}
+        for resolution in ('W', 'M'):
+            grouped = frame.resample(PANDAS_FREQ[resolution])
+            self.levels[resolution] = self._level(
+                grouped.mean().index, grouped.mean().to_numpy().T, grouped.min().to_numpy().T,
+                grouped.max().to_numpy().T,
+            )
+
+    @staticmethod
+    def _level(dates, mean, low, high):
+        return {
+            'dates': np.asarray(dates.values.astype('datetime64[D]')),
+            'mean': np.asarray(mean, dtype=float),
+            'min': np.asarray(low, dtype=float),
+            'max': np.asarray(high, dtype=float),
+        }
+
+    def query(self, key, start=None, end=None, width=800, method='lttb'):
+        """
+        History of series ``key`` between ``start`` and ``end`` (ISO dates,
+        inclusive) reduced to at most about ``width`` points.
+        """
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}")
+        row = self.index[key]
+        start = np.datetime64(start, 'D') if start else None
+        end = np.datetime64(end, 'D') if end else None
+        if start is not None and end is not None and start > end:
+            raise ValueError("start must not be after end")
+
+        for resolution in reversed(RESOLUTIONS):
+            level = self.levels[resolution]
+            lo = 0 if start is None else int(np.searchsorted(level['dates'], start))
+            hi = len(level['dates']) if end is None else int(np.searchsorted(level['dates'], end, side='right'))
+            if hi - lo >= width or resolution == 'D':
+                break
+
+        dates = level['dates'][lo:hi]
+        mean = level['mean'][row, lo:hi]
+        valid = ~np.isnan(mean)
+        dates, mean = dates[valid], mean[valid]
+        low = level['min'][row, lo:hi][valid]
+        high = level['max'][row, lo:hi][valid]
+
+        if method == 'lttb':
+            keep = lttb(dates.astype(np.int64), mean, width)
+        else:
+            keep = minmax(mean, width)
+        payload = {
+            'series': key,
+            'resolution': resolution,
+            'method': method,
+            'points': int(len(keep)),
+            'source_points': int(len(dates)),
+            # Dates as day offsets from ``start`` keep the payload small
+            'start': str(dates[0]) if len(dates) else None,
+            'day_offsets': (dates[keep] - dates[0]).astype(np.int64).tolist() if len(dates) else [],
+            'values': np.round(mean[keep], 2).tolist(),
+        }
+        if resolution != 'D':
+            payload['min'] = np.round(low[keep], 2).tolist()
+            payload['max'] = np.round(high[keep], 2).tolist()
+        return payload
+
+
+_series = (None, None)
+_series_lock = threading.Lock()
+
+
+def get_demand_series(service):
+    """Process-wide ``DemandSeries`` for the service's demand CSV, rebuilt when the file changes"""
+    global _series
+    path = service.data_dir / "synthetic_demand_timeseries.csv"
+    version = (str(path), path.stat().st_mtime_ns)
+    with _series_lock:
+        if _series[0] != version:
+            df, _ = service.load_data()
+            _series = (version, DemandSeries(df))
+        return _series[1]
@@ -10,4 +10,7 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('dashboard/', views.dashboard, name='dashboard'),
     path('api/run-forecast/', views.run_forecast, name='run_forecast'),
+    path('api/forecast/latest/', views.latest_forecast, name='latest_forecast'),
+    path('api/graph-query/', views.graph_query, name='graph_query'),
+    path('api/timeseries/', views.timeseries, name='timeseries'),
 ]
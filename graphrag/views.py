@@ -1,13 +1,19 @@
 """
 Views for graphrag forecasting application
 """
+from django.conf import settings
+from django.db import DatabaseError
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, require_GET
 from .services import ForecastingService
+import json
+import logging
 import traceback
 
+logger = logging.getLogger(__name__)
+
 
 def index(request):
     """Main dashboard view"""
@@ -17,7 +23,12 @@ def index(request):
 @require_http_methods(["POST"])
 @csrf_exempt
 def run_forecast(request):
-    """Run all forecasting operations and return results"""
+    """
+    Run all forecasting operations and return results. Parts already
+    materialized by precompute_forecasts are read from the store instead of
+    being recomputed, as long as the stored run was fitted on the same last
+    observation as the current data.
+    """
     try:
         service = ForecastingService()
         
@@ -26,17 +37,29 @@ def run_forecast(request):
         sku_df = service.prepare_sku_data(df)
         recent_data = service.get_recent_data(sku_df)
         
-        # Run ML forecast
-        ml_forecast_dict, ml_summary = service.run_ml_forecast(sku_df)
+        stored = _stored_forecast('SKU123', 'North') or {}
+        if stored and stored['model_metadata'].get('last_observation') != str(sku_df.index[-1].date()):
+            # Fitted before the latest data arrived; recompute until precompute_forecasts runs again
+            stored = {}
         
-        # Run LLM forecast
-        llm_forecast_dict = service.run_llm_forecast(recent_data)
+        # Run ML forecast
+        if stored:
+            ml_forecast_dict, ml_summary, ml_intervals = (
+                stored['ml_forecast'], stored['ml_summary'], stored['ml_intervals']
+            )
+        else:
+            ml_forecast_dict, ml_summary, ml_intervals = service.run_ml_forecast_with_intervals(sku_df)
         
-        # Get explanations
-        explanations = service.explain_forecast(llm_forecast_dict, events_df)
+        # Run LLM forecast; stored explanations describe the stored LLM forecast
+        if stored.get('llm_forecast'):
+            llm_forecast_dict = stored['llm_forecast']
+            explanations = stored['explanations'] or service.explain_forecast(llm_forecast_dict, events_df)
+        else:
+            llm_forecast_dict = service.run_llm_forecast(recent_data)
+            explanations = service.explain_forecast(llm_forecast_dict, events_df)
         
         # Create visualization
-        viz_image = service.create_visualization(sku_df, ml_forecast_dict, llm_forecast_dict)
+        viz_image = service.create_visualization(sku_df, ml_forecast_dict, llm_forecast_dict, ml_intervals)
         
         # Create graph
         G = service.create_graph_rag()
@@ -48,6 +71,7 @@ def run_forecast(request):
             'recent_data': recent_data,
             'ml_forecast': ml_forecast_dict,
             'ml_summary': ml_summary,
+            'ml_intervals': ml_intervals,
             'llm_forecast': llm_forecast_dict,
             'explanations': explanations,
             'visualization': viz_image,
@@ -71,3 +95,114 @@ def dashboard(request):
         'forecast_ready': False,
     }
     return render(request, 'graphrag/dashboard.html', context)
+
+
+def _stored_forecast(sku, region):
+    """Latest stored forecast, or None when there is none or the tables are not migrated"""
+    from .store import latest_forecast as load_latest
+    
+    try:
+        return load_latest(sku, region)
+    except DatabaseError as e:
+        logger.warning("Forecast store unavailable: %s", e)
+        return None
+
+
+@require_GET
+def latest_forecast(request):
+    """
+    Latest precomputed forecast for ?sku=&region= (see precompute_forecasts).
+    The stored run is served as is until the next precompute_forecasts.
+    """
+    sku = request.GET.get('sku', 'SKU123')
+    region = request.GET.get('region', 'North')
+    forecast = _stored_forecast(sku, region)
+    if forecast is None:
+        return JsonResponse({
+            'success': False,
+            'error': f"No stored forecast for {sku}/{region}; run manage.py precompute_forecasts",
+        }, status=404)
+    return JsonResponse({'success': True, **forecast})
+
+
+@require_http_methods(["POST"])
+@csrf_exempt
+def graph_query(request):
+    """Answer a batch of questions about knowledge-graph nodes"""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON'}, status=400)
+    
+    queries = data.get('queries') if isinstance(data, dict) else None
+    if not isinstance(queries, list) or not queries or not all(isinstance(q, dict) for q in queries):
+        return JsonResponse({'success': False, 'error': 'queries must be a non-empty list of objects'}, status=400)
+    max_queries = settings.GRAPH_RAG_MAX_QUERIES
+    if len(queries) > max_queries:
+        return JsonResponse({'success': False, 'error': f'At most {max_queries} queries per request'}, status=400)
+    
+    try:
+        service = ForecastingService()
+        G = service.create_graph_rag()
+        results, llm_calls = service.answer_graph_queries(G, queries, hops=data.get('hops', 2))
+        return JsonResponse({'success': True, 'results': results, 'llm_calls': llm_calls})
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }, status=500)
+
+
+@require_GET
+def timeseries(request):
+    """
+    Downsampled demand history plus the latest stored forecast for a date range.
+    
+    Query: ``series=SKU|Region`` (repeatable, also ``ALL|<Region>`` and
+    ``<SKU>|National``) or ``sku``/``region``, optional ``start``/``end``
+    (YYYY-MM-DD), ``width`` in pixels and ``method`` (``lttb`` or ``minmax``).
+    """
+    from .llm_batch import series_id, split_series_id
+    from .timeseries import get_demand_series
+    
+    keys = request.GET.getlist('series') or [
+        series_id(request.GET.get('sku', 'SKU123'), request.GET.get('region', 'North'))
+    ]
+    if len(keys) > settings.TIMESERIES_MAX_SERIES:
+        return JsonResponse({'success': False, 'error': f'At most {settings.TIMESERIES_MAX_SERIES} series'}, status=400)
+    try:
+        width = min(max(int(request.GET.get('width', 800)), 10), settings.TIMESERIES_MAX_WIDTH)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'width must be an integer'}, status=400)
+    start, end = request.GET.get('start'), request.GET.get('end')
+    method = request.GET.get('method', 'lttb')
+    
+    demand = get_demand_series(ForecastingService())
+    unknown = [key for key in keys if key not in demand.index]
+    if unknown:
+        return JsonResponse({'success': False, 'error': f"Unknown series: {', '.join(unknown)}"}, status=404)
+    
+    results = []
+    try:
+        for key in keys:
+            payload = demand.query(key, start, end, width, method)
+            forecast = _stored_forecast(*split_series_id(key))
+            if forecast is not None:
+                in_range = [d for d in forecast['ml_forecast'] if (not start or d >= start) and (not end or d <= end)]
+                payload['forecast'] = {
+                    'run_date': forecast['run_date'],
+                    'dates': in_range,
+                    'ml': [round(forecast['ml_forecast'][d], 2) for d in in_range],
+                    'llm': [forecast['llm_forecast'].get(d) for d in in_range] if forecast['llm_forecast'] else None,
+                    'intervals': {
+                        q: [round(band[d], 2) for d in in_range] for q, band in (forecast['ml_intervals'] or {}).items()
+                    },
+                }
+            else:
+                payload['forecast'] = None
+            results.append(payload)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    return JsonResponse({'success': True, 'series': results})
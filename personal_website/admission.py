@@ -0,0 +1,238 @@
+"""
+Admission control for the LLM-backed and CPU-heavy endpoints.
+
+``AdmissionMiddleware`` looks up the resolved view name in
+``settings.ADMISSION_CONTROL['endpoints']``. For a controlled endpoint a
+request must first take tokens from its client IP's token bucket (429 when
+empty), then a concurrency slot for the endpoint. When every slot is busy
+the request waits in a bounded FIFO queue until ``queue_timeout``; a full
+queue or an expired wait is rejected at once with 503. Rejections carry a
+``Retry-After`` header so well-behaved clients back off instead of piling
+on. Streaming responses keep their slot until the stream is exhausted or
+closed.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from .instrumentation import registry
+
+DEFAULT_POLICY = {'concurrency': 4, 'queue': 8, 'queue_timeout': 5.0, 'cost': 1.0}
+
+
+class Rejected(Exception):
+    """Raised when a request is shed; carries the HTTP status and Retry-After seconds"""
+
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBuckets:
+    """Per-client token buckets, pruned to the ``max_clients`` most recently seen"""
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, client, cost=1.0):
+        """Spend ``cost`` tokens or raise ``Rejected`` (429) with the wait until they refill"""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        if not allowed:
+            raise Rejected(429, 'rate_limited', (cost - tokens) / self.rate)
+
+
+class EndpointLimiter:
+    """Concurrency slots for one endpoint with a bounded FIFO wait queue"""
+
+    def __init__(self, name, concurrency, queue, queue_timeout):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiters = deque()
+        self.service_time = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a slot, waiting in line if needed; raise ``Rejected`` (503) when saturated"""
+        with self._lock:
+            if self.active < self.concurrency and not self.waiters:
+                self.active += 1
+                self._record()
+                return 0.0
+            if len(self.waiters) >= self.max_queue:
+                raise Rejected(503, 'queue_full', self._retry_after())
+            waiter = threading.Event()
+            self.waiters.append(waiter)
+            self._record()
+
+        start = time.monotonic()
+        admitted = waiter.wait(self.queue_timeout)
+        with self._lock:
+            if not admitted and not waiter.is_set():
+                self.waiters.remove(waiter)
+                self._record()
+                raise Rejected(503, 'queue_timeout', self._retry_after())
+        return time.monotonic() - start
+
+    def release(self, elapsed):
+        """Free a slot, handing it straight to the longest-waiting request if any"""
+        with self._lock:
+            # Smoothed service time feeds the Retry-After estimate
+            self.service_time = elapsed if self.service_time is None else 0.8 * self.service_time + 0.2 * elapsed
+            if self.waiters:
+                self.waiters.popleft().set()
+            else:
+                self.active -= 1
+            self._record()
+
+    def _retry_after(self):
+        service_time = self.service_time or 1.0
+        return service_time * (len(self.waiters) + 1) / self.concurrency
+
+    def _record(self):
+        registry.set_gauge('admission_in_flight', self.active, endpoint=self.name)
+        registry.set_gauge('admission_queue_depth', len(self.waiters), endpoint=self.name)
+
+
+class AdmissionController:
+    """Limiters and token buckets built from ``settings.ADMISSION_CONTROL``"""
+
+    def __init__(self, config):
+        self.trust_forwarded_for = config.get('trust_forwarded_for', False)
+        self.buckets = TokenBuckets(config.get('rate', 0), config.get('burst', 1), config.get('max_clients', 10000))
+        self.policies = {}
+        self.limiters = {}
+        for name, policy in config.get('endpoints', {}).items():
+            policy = dict(DEFAULT_POLICY, **policy)
+            self.policies[name] = policy
+            self.limiters[name] = EndpointLimiter(
+                name, policy['concurrency'], policy['queue'], policy['queue_timeout']
+            )
+
+    def client_ip(self, request):
+        if self.trust_forwarded_for:
+            forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+            if forwarded:
+                return forwarded.split(',')[0].strip()
+        return request.META.get('REMOTE_ADDR', '')
+
+    def admit(self, name, request):
+        """Return the endpoint's limiter once a slot is held; raise ``Rejected`` otherwise"""
+        self.buckets.take(self.client_ip(request), self.policies[name]['cost'])
+        limiter = self.limiters[name]
+        waited = limiter.acquire()
+        registry.observe('admission_wait_seconds', waited, endpoint=name)
+        return limiter
+
+
+class ReleasingStream:
+    """Iterator over streamed content that calls ``release`` once, on exhaustion or close"""
+
+    def __init__(self, content, release):
+        self.content = iter(content)
+        self._release = release
+        self._lock = threading.Lock()
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.content)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        try:
+            if hasattr(self.content, 'close'):
+                self.content.close()
+        finally:
+            self._release()
+
+
+_controller = (None, None)
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    """Process-wide controller for the current settings, or None when disabled"""
+    global _controller
+    config = getattr(settings, 'ADMISSION_CONTROL', {})
+    with _controller_lock:
+        if _controller[0] is not config:
+            _controller = (config, AdmissionController(config) if config.get('enabled', True) else None)
+        return _controller[1]
+
+
+class AdmissionMiddleware:
+    """Shed load on the endpoints listed in ``settings.ADMISSION_CONTROL``"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            admitted = getattr(request, '_admission', None)
+            if admitted is not None:
+                limiter, started = admitted
+                release = lambda: limiter.release(time.monotonic() - started)  # noqa: E731
+                if response is not None and response.streaming:
+                    # The view only built the stream; hold the slot until it is consumed or closed
+                    response.streaming_content = ReleasingStream(response.streaming_content, release)
+                else:
+                    release()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        controller = get_controller()
+        if controller is None or request.method == 'OPTIONS':
+            return None
+        name = request.resolver_match.view_name
+        if name not in controller.limiters:
+            return None
+        try:
+            limiter = controller.admit(name, request)
+        except Rejected as rejected:
+            registry.inc('admission_requests_total', endpoint=name, outcome=rejected.reason)
+            response = JsonResponse({
+                'success': False,
+                'error': 'Too many requests, please retry later' if rejected.status == 429
+                else 'Server is busy, please retry later',
+            }, status=rejected.status)
+            response['Retry-After'] = str(max(1, math.ceil(rejected.retry_after)))
+            return response
+        registry.inc('admission_requests_total', endpoint=name, outcome='admitted')
+        request._admission = (limiter, time.monotonic())
+        return None
@@ -0,0 +1,68 @@
+"""
+Full-page caching for the static portfolio pages
+"""
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.text import compress_string
+
+
+def cached_page(view):
+    """
+    Cache the rendered body of a GET view together with a gzip copy and an
+    ETag, so repeat hits skip the template engine and conditional requests
+    get a 304 with the same caching headers. HEAD requests get the headers
+    only. Pages must not depend on the user or the query string.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timeout = getattr(settings, 'PAGE_CACHE_SECONDS', 600)
+        if request.method not in ('GET', 'HEAD') or not timeout:
+            return view(request, *args, **kwargs)
+
+        key = f"page:{request.path}"
+        entry = cache.get(key)
+        if entry is None:
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            content = response.content
+            entry = {
+                'content': content,
+                'gzip': compress_string(content),
+                'content_type': response['Content-Type'],
+                'etag': f'W/"{hashlib.sha1(content).hexdigest()}"',
+            }
+            cache.set(key, entry, timeout)
+
+        not_modified = get_conditional_response(request, etag=entry['etag'])
+        if not_modified is not None:
+            # A 304 must carry the same validators and caching headers as the 200
+            return _with_cache_headers(not_modified, entry)
+
+        if 'gzip' in request.headers.get('Accept-Encoding', '') and len(entry['gzip']) < len(entry['content']):
+            body = entry['gzip']
+            response = HttpResponse(content_type=entry['content_type'])
+            response['Content-Encoding'] = 'gzip'
+        else:
+            body = entry['content']
+            response = HttpResponse(content_type=entry['content_type'])
+        # HEAD gets the headers of the GET response without its body
+        response['Content-Length'] = str(len(body))
+        if request.method != 'HEAD':
+            response.content = body
+        return _with_cache_headers(response, entry)
+
+    return wrapper
+
+
+def _with_cache_headers(response, entry):
+    response['ETag'] = entry['etag']
+    patch_vary_headers(response, ('Accept-Encoding',))
+    # Browsers revalidate every time, which costs a 304 once cached
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    return response
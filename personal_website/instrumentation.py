@@ -0,0 +1,222 @@
+"""
+Lightweight in-process instrumentation shared by all apps.
+
+Stage timers, counters and LLM token usage are aggregated in memory and
+rendered in the Prometheus text exposition format by the ``/metrics`` view.
+When ``settings.METRICS_ENABLED`` is False every helper returns immediately.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+METRIC_PREFIX = 'portfolio_'
+
+# Latency buckets in seconds, wide enough for both CSV loads and LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_HELP = {
+    'stage_duration_seconds': ('histogram', 'Time spent in an instrumented pipeline stage'),
+    'stage_errors_total': ('counter', 'Instrumented stages that raised an exception'),
+    'http_request_duration_seconds': ('histogram', 'Django request latency by view'),
+    'http_requests_total': ('counter', 'Django requests by view, method and status'),
+    'llm_tokens_total': ('counter', 'OpenAI tokens consumed by stage and kind'),
+    'llm_batch_series_total': ('counter', 'Series handled by batched LLM forecasting by outcome'),
+    'semantic_cache_requests_total': ('counter', 'Chatbot semantic cache lookups by outcome'),
+    'semantic_cache_hit_ratio': ('gauge', 'Share of chatbot semantic cache lookups served from the cache'),
+    'semantic_cache_entries': ('gauge', 'Answers held in the chatbot semantic cache'),
+    'semantic_cache_evictions_total': ('counter', 'Chatbot semantic cache entries evicted to make room'),
+    'graph_context_cache_total': ('counter', 'Graph-RAG neighbourhood context lookups by cache outcome'),
+    'chat_sessions_total': ('counter', 'Chatbot session lookups by where the session was found'),
+    'chat_sessions_in_memory': ('gauge', 'Chatbot sessions held in memory'),
+    'chat_session_spills_total': ('counter', 'Chatbot sessions spilled from memory to SQLite'),
+    'admission_requests_total': ('counter', 'Requests to admission-controlled endpoints by outcome'),
+    'admission_wait_seconds': ('histogram', 'Time admitted requests waited in the admission queue'),
+    'admission_queue_depth': ('gauge', 'Requests waiting for an admission slot'),
+    'admission_in_flight': ('gauge', 'Requests holding an admission slot'),
+}
+
+
+def metrics_enabled():
+    """Return True when instrumentation is switched on in settings"""
+    return getattr(settings, 'METRICS_ENABLED', True)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe in-memory store of histograms, counters and gauges"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        """Record a value in the histogram ``name``"""
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        """Increase the counter ``name`` by ``amount``"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        """Set the gauge ``name`` to ``value``"""
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def reset(self):
+        """Drop every recorded metric"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def snapshot(self):
+        """Return plain-dict copies of all metrics, keyed by (name, labels)"""
+        with self._lock:
+            histograms = {
+                key: {'count': h.count, 'sum': h.total, 'buckets': list(zip(h.buckets, h.counts))}
+                for key, h in self._histograms.items()
+            }
+            return {
+                'histograms': histograms,
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+            }
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = {key: (h.buckets, list(h.counts), h.total, h.count)
+                          for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        lines = []
+        seen = set()
+
+        def header(name, default_type):
+            if name in seen:
+                return
+            seen.add(name)
+            metric_type, help_text = METRIC_HELP.get(name, (default_type, name.replace('_', ' ')))
+            lines.append(f"# HELP {METRIC_PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} {metric_type}")
+
+        for (name, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{_format_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{METRIC_PREFIX}{name}_bucket{_format_labels(labels, le='+Inf')} {count}")
+            lines.append(f"{METRIC_PREFIX}{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{METRIC_PREFIX}{name}_count{_format_labels(labels)} {count}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f"{METRIC_PREFIX}{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), value in sorted(gauges.items()):
+            header(name, 'gauge')
+            lines.append(f"{METRIC_PREFIX}{name}{_format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    escaped = []
+    for key, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{key}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+registry = MetricsRegistry()
+
+
+class timed:
+    """
+    Time a block of code (context manager) or every call of a function
+    (decorator) as the pipeline stage ``stage``.
+    """
+
+    __slots__ = ('stage', 'labels', '_start')
+
+    def __init__(self, stage, **labels):
+        self.stage = stage
+        self.labels = labels
+        self._start = None
+
+    def __enter__(self):
+        if metrics_enabled():
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._start is None:
+            return False
+        elapsed = time.perf_counter() - self._start
+        self._start = None
+        registry.observe('stage_duration_seconds', elapsed, stage=self.stage, **self.labels)
+        if exc_type is not None:
+            registry.inc('stage_errors_total', stage=self.stage, **self.labels)
+        return False
+
+    def __call__(self, func):
+        stage, labels = self.stage, self.labels
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # A fresh timer per call keeps concurrent calls independent
+            with timed(stage, **labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+def record_llm_usage(stage, response):
+    """Count prompt/completion tokens reported on an OpenAI response"""
+    if not metrics_enabled():
+        return
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return
+    for kind in ('prompt_tokens', 'completion_tokens'):
+        tokens = getattr(usage, kind, None)
+        if tokens:
+            registry.inc('llm_tokens_total', tokens, stage=stage, kind=kind.split('_')[0])
@@ -0,0 +1,28 @@
+"""
+Project-wide middleware
+"""
+import time
+
+from .instrumentation import metrics_enabled, registry
+
+
+class MetricsMiddleware:
+    """Record latency and status of every request, labelled by view name"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics_enabled():
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        registry.observe('http_request_duration_seconds', elapsed, view=view)
+        registry.inc('http_requests_total', view=view, method=request.method,
+                     status=response.status_code)
+        return response
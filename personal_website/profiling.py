@@ -0,0 +1,148 @@
+"""
+Opt-in per-request profiling.
+
+A request is profiled with cProfile when a staff user asks for it with
+``?profile=1`` or an ``X-Profile: 1`` header, or when it is picked by
+``settings.PROFILING_SAMPLE_RATE``. Each profile is written to
+``settings.PROFILING_DIR`` as a ``.prof`` (pstats) file plus a ``.json``
+summary of the top functions; only the newest ``PROFILING_MAX_FILES`` are kept.
+Responses to staff requests carry the new profile's id in ``X-Profile-Id``.
+"""
+import cProfile
+import io
+import json
+import pstats
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+
+TOP_FUNCTIONS = 25
+
+# cProfile cannot run two profilers at once, so concurrent requests skip profiling
+_profiler_lock = threading.Lock()
+
+
+def profile_dir():
+    return Path(getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def _trigger(request):
+    """Return why ``request`` should be profiled, or None"""
+    if not getattr(settings, 'PROFILING_ENABLED', False):
+        return None
+    asked = request.GET.get('profile') == '1' or request.headers.get('X-Profile') == '1'
+    if asked:
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            return 'requested'
+    sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+    if sample_rate and random.random() < sample_rate:
+        return 'sampled'
+    return None
+
+
+def top_functions(stats, limit=TOP_FUNCTIONS):
+    """Return the ``limit`` functions with the highest cumulative time"""
+    rows = []
+    for (filename, lineno, name), (cc, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f"{Path(filename).name}:{lineno}({name})" if lineno else name,
+            'ncalls': ncalls,
+            'primitive_calls': cc,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        })
+    rows.sort(key=lambda row: row['cumtime'], reverse=True)
+    return rows[:limit]
+
+
+def save_profile(profiler, request, response, duration, trigger):
+    """Write pstats and a JSON summary for one request, then rotate old profiles"""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    now = datetime.now(timezone.utc)
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+    profile_id = f"{now:%Y%m%dT%H%M%S%f}-{request.method.lower()}-{slug[:60]}"
+
+    profiler.dump_stats(directory / f"{profile_id}.prof")
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    summary = {
+        'id': profile_id,
+        'path': request.get_full_path(),
+        'method': request.method,
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 2),
+        'trigger': trigger,
+        'created': now.isoformat(),
+        'total_calls': stats.total_calls,
+        'top_functions': top_functions(stats),
+    }
+    (directory / f"{profile_id}.json").write_text(json.dumps(summary))
+    rotate_profiles(directory, getattr(settings, 'PROFILING_MAX_FILES', 50))
+    return profile_id
+
+
+def rotate_profiles(directory, keep):
+    """Delete all but the newest ``keep`` profiles"""
+    summaries = sorted(directory.glob('*.json'), reverse=True)
+    for summary_path in summaries[keep:]:
+        summary_path.unlink(missing_ok=True)
+        summary_path.with_suffix('.prof').unlink(missing_ok=True)
+
+
+def recent_profiles(limit=None):
+    """Return stored profile summaries, newest first"""
+    directory = profile_dir()
+    if not directory.exists():
+        return []
+    summaries = []
+    for summary_path in sorted(directory.glob('*.json'), reverse=True)[:limit]:
+        try:
+            summaries.append(json.loads(summary_path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return summaries
+
+
+def profile_path(profile_id):
+    """Return the pstats file for ``profile_id`` if it exists"""
+    if not re.fullmatch(r'[A-Za-z0-9-]+', profile_id):
+        return None
+    path = profile_dir() / f"{profile_id}.prof"
+    return path if path.exists() else None
+
+
+class ProfilingMiddleware:
+    """Wrap selected requests in cProfile and store the result on disk"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = _trigger(request)
+        if trigger is None or not _profiler_lock.acquire(blocking=False):
+            return self.get_response(request)
+
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+        finally:
+            _profiler_lock.release()
+
+        profile_id = save_profile(profiler, request, response, duration, trigger)
+        if trigger == 'requested':
+            # Only the staff user who asked learns the id; sampled requests may be anonymous
+            response['X-Profile-Id'] = profile_id
+        return response
@@ -46,12 +46,15 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'personal_website',
     'graphrag',
     'stock_trading',
     'chatbot',
 ]
 
 MIDDLEWARE = [
+    'personal_website.middleware.MetricsMiddleware',
+    'personal_website.admission.AdmissionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,6 +62,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'personal_website.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'personal_website.urls'
@@ -132,6 +136,17 @@ STATIC_URL = 'static/'
 # Static files (CSS, JavaScript, Images)
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# collectstatic is the asset build step: hashed names + manifest, WebP image
+# variants and .gz/.br siblings for the web server to serve precompressed
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'personal_website.storage.OptimizedManifestStaticFilesStorage',
+    },
+}
+
 # Default primary key field type
 
 # Default primary key field type
@@ -144,3 +159,118 @@ DATA_DIR = BASE_DIR / 'graphrag' / 'data'
 
 # OpenAI API Key (use environment variable in production)
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+
+# Instrumentation: stage timers, request latency and token usage served at /metrics
+# to staff users and to scrapers connecting from METRICS_ALLOWED_IPS (comma-separated)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_ALLOWED_IPS = [
+    ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()
+]
+
+# Opt-in cProfile of single requests (?profile=1 or X-Profile: 1 for staff, or random sampling)
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '1') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = BASE_DIR / 'profiles'
+PROFILING_MAX_FILES = 50
+
+# Import pandas/statsmodels/matplotlib at startup instead of on the first forecast request
+GRAPHRAG_WARM_UP = os.environ.get('GRAPHRAG_WARM_UP', '0') == '1'
+
+# Rendered portfolio pages are cached (with ETag + gzip copy) for this many seconds; 0 disables
+PAGE_CACHE_SECONDS = int(os.environ.get('PAGE_CACHE_SECONDS', '600'))
+
+# Backtest data for the stock trading dashboard: long-format OHLCV CSV
+# (Date,Ticker,Open,High,Low,Close,Volume); synthetic prices are used when it is missing
+STOCK_PRICES_CSV = BASE_DIR / 'stock_trading' / 'data' / 'prices.csv'
+STOCK_SYNTHETIC_TICKERS = 50
+STOCK_SYNTHETIC_BARS = 252 * 3
+STOCK_DASHBOARD_CACHE_SECONDS = 900
+
+# Tick replay streamed to the dashboard over SSE: CSVs of timestamp,symbol,price
+# in STOCK_TICKS_DIR, or a synthetic random walk when the directory is empty
+STOCK_TICKS_DIR = BASE_DIR / 'stock_trading' / 'data' / 'ticks'
+STOCK_SYNTHETIC_TICK_SYMBOLS = 200
+STOCK_SYNTHETIC_TICK_ROUNDS = 3600
+STOCK_REPLAY_SPEED = 60.0
+STOCK_REPLAY_MAX_SPEED = 1000.0
+STOCK_REPLAY_FLUSH_SECONDS = 1.0
+
+# Monte Carlo prediction intervals for the ARIMA forecast: simulated paths per
+# series, and the cap on path values held in memory at once when batching series
+FORECAST_MC_PATHS = 2000
+FORECAST_MC_MAX_ELEMENTS = 1_000_000
+
+# Batched multi-series LLM forecasting (structured JSON output, retries only failed series)
+LLM_BATCH_FORECAST = {
+    'model': 'gpt-4o-mini',
+    'max_series_per_prompt': 25,
+    'max_prompt_chars': 12000,
+    'max_workers': 4,
+    'max_retries': 2,
+}
+
+# Materialized forecasts (manage.py precompute_forecasts): cache lifetime of a
+# serialized run; reads look up the newest run id first, so new runs show up at once
+FORECAST_STORE_CACHE_SECONDS = 3600
+
+# Chatbot answers reused for paraphrased questions without history (cosine
+# similarity of local hashed word and character n-grams at or above the threshold).
+# Each process holds up to max_entries x n_features float32 embeddings: 16 MB when
+# full at these values, allocated as entries arrive. ignored_words are dropped from
+# questions like other filler ("What are Sugam's skills?" == "What are your skills?").
+CHAT_SEMANTIC_CACHE = {
+    'enabled': os.environ.get('CHAT_SEMANTIC_CACHE', '1') == '1',
+    'threshold': float(os.environ.get('CHAT_SEMANTIC_CACHE_THRESHOLD', '0.85')),
+    'max_entries': 1000,
+    'max_bytes': 4_000_000,
+    'n_features': 2 ** 12,
+    'ttl_seconds': 86400,
+    'ignored_words': ['Sugam'],
+}
+
+# Batched graph-RAG questions (POST /graphrag/api/graph-query/): questions sharing a
+# node neighbourhood go into one structured-output prompt; contexts are cached per graph version
+GRAPH_RAG_MAX_QUERIES = 100
+GRAPH_RAG_QUERY = {
+    'model': 'gpt-4o-mini',
+    'max_questions_per_prompt': 10,
+    'max_workers': 4,
+    'max_retries': 1,
+    'context_cache_seconds': 3600,
+}
+
+# Hierarchical reconciliation of SKU/Region forecasts with their region and national
+# totals: bottom_up, ols, wls_struct or mint_diag (in-sample error variance weights)
+FORECAST_RECONCILIATION_METHOD = 'mint_diag'
+
+# Server-side chatbot conversations: the last max_messages turns per session in
+# memory (LRU, max_sessions), least recently used sessions spilled to SQLite
+CHAT_SESSIONS = {
+    'spill_path': BASE_DIR / 'chat_sessions.sqlite3',
+    'max_sessions': 1000,
+    'max_messages': 10,
+    'ttl_seconds': int(os.environ.get('CHAT_SESSION_TTL_SECONDS', '3600')),
+}
+
+# Admission control for LLM-backed / CPU-heavy views (by resolved view name): at most
+# `concurrency` requests run at once, up to `queue` more wait `queue_timeout` seconds,
+# the rest get 503. Each client IP's token bucket refills `rate` tokens/s up to
+# `burst`; a request spends `cost` tokens or gets 429. Both carry Retry-After.
+ADMISSION_CONTROL = {
+    'enabled': os.environ.get('ADMISSION_CONTROL', '1') == '1',
+    'rate': float(os.environ.get('ADMISSION_RATE_PER_IP', '1.0')),
+    'burst': float(os.environ.get('ADMISSION_BURST_PER_IP', '10')),
+    'trust_forwarded_for': os.environ.get('ADMISSION_TRUST_X_FORWARDED_FOR', '0') == '1',
+    'endpoints': {
+        'chatbot:chat': {'concurrency': 8, 'queue': 16, 'queue_timeout': 10.0},
+        'chatbot:text_to_speech': {'concurrency': 4, 'queue': 8, 'queue_timeout': 10.0},
+        'graphrag:run_forecast': {'concurrency': 2, 'queue': 4, 'queue_timeout': 15.0, 'cost': 3.0},
+        'graphrag:graph_query': {'concurrency': 2, 'queue': 4, 'queue_timeout': 15.0, 'cost': 3.0},
+        # Each replay holds a worker for the whole stream, so extra viewers are turned away
+        'stock_trading:replay_stream': {'concurrency': 4, 'queue': 0, 'queue_timeout': 0.0, 'cost': 5.0},
+    },
+}
+
+# Downsampled history API (GET /graphrag/api/timeseries/): limits per request
+TIMESERIES_MAX_SERIES = 20
+TIMESERIES_MAX_WIDTH = 4000
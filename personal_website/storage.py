@@ -0,0 +1,120 @@
+"""
+Static files storage used by ``collectstatic`` as the asset build step.
+
+On top of Django's hashed, manifest-backed storage it writes resized WebP
+variants of raster images (recorded in the manifest) and precompressed
+``.gz`` / ``.br`` siblings of text assets for the web server to serve
+directly (nginx ``gzip_static`` / ``brotli_static``).
+"""
+import gzip
+import io
+import re
+from pathlib import PurePosixPath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip siblings are written without it
+    brotli = None
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+IMAGE_WIDTHS = (320, 480, 960)
+WEBP_QUALITY = 80
+COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.txt', '.json', '.html', '.xml', '.map')
+COMPRESS_MIN_SIZE = 512
+
+VARIANT_PATTERN = re.compile(r'^(?P<stem>.+)\.(?P<width>\d+)w\.webp$')
+
+
+def variant_name(name, width):
+    """Static path of the WebP variant of ``name`` at ``width`` pixels"""
+    path = PurePosixPath(name)
+    return str(path.with_name(f"{path.stem}.{width}w.webp"))
+
+
+class OptimizedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Hashed storage that also emits WebP image variants and compressed siblings"""
+
+    # Fall back to the unhashed name instead of raising for files missing from the manifest
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected into STATIC_ROOT either (DEBUG off without collectstatic,
+            # e.g. under the test runner): the base class cannot hash it, so keep the name
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for name in sorted(paths):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                for variant in self._write_image_variants(name, paths[name]):
+                    yield name, variant, True
+        self._variant_index = None
+        self.save_manifest()
+
+        for hashed in sorted(set(self.hashed_files.values())):
+            if hashed.lower().endswith(COMPRESS_EXTENSIONS):
+                self._write_compressed(hashed)
+
+    def _write_image_variants(self, name, source):
+        from PIL import Image
+
+        storage, path = source
+        with storage.open(path) as handle:
+            image = Image.open(handle)
+            image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+
+        written = []
+        # Images narrower than a target width get one full-size variant instead
+        for width in sorted({min(width, image.width) for width in IMAGE_WIDTHS}):
+            height = round(image.height * width / image.width)
+            buffer = io.BytesIO()
+            image.resize((width, height), Image.LANCZOS).save(buffer, 'WEBP', quality=WEBP_QUALITY, method=6)
+
+            variant = variant_name(name, width)
+            content = ContentFile(buffer.getvalue())
+            hashed = self.hashed_name(variant, content)
+            if self.exists(hashed):
+                self.delete(hashed)
+            self._save(hashed, content)
+            self.hashed_files[self.hash_key(variant)] = hashed
+            written.append(hashed)
+        return written
+
+    def _write_compressed(self, name):
+        with self.open(name) as handle:
+            data = handle.read()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return
+        encoders = [('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append(('.br', lambda raw: brotli.compress(raw, quality=11)))
+        for suffix, encode in encoders:
+            compressed = encode(data)
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+
+    def webp_variants(self, name):
+        """Return ``(url, width)`` pairs of collected WebP variants of ``name``"""
+        if getattr(self, '_variant_index', None) is None:
+            index = {}
+            for key in self.hashed_files:
+                match = VARIANT_PATTERN.match(key)
+                if match:
+                    index.setdefault(match['stem'], []).append((int(match['width']), key))
+            self._variant_index = index
+        stem = str(PurePosixPath(name).with_suffix(''))
+        return [(self.url(variant), width) for width, variant in sorted(self._variant_index.get(stem, []))]
@@ -0,0 +1,30 @@
+"""
+Template tags for optimized static assets
+"""
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(path, alt='', css_class='', sizes='100vw'):
+    """
+    Render ``<img>`` for a static image, wrapped in ``<picture>`` with a WebP
+    ``srcset`` when collectstatic produced resized variants of it.
+    """
+    img = format_html('<img src="{}" alt="{}" class="{}" decoding="async">', static(path), alt, css_class)
+
+    webp_variants = getattr(staticfiles_storage, 'webp_variants', None)
+    # Variants only exist in STATIC_ROOT; the DEBUG server serves the source tree
+    if settings.DEBUG or webp_variants is None:
+        return img
+    variants = webp_variants(path)
+    if not variants:
+        return img
+
+    srcset = format_html_join(', ', '{} {}w', variants)
+    return format_html('<picture><source type="image/webp" srcset="{}" sizes="{}">{}</picture>', srcset, sizes, img)
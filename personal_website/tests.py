@@ -0,0 +1,454 @@
+import gzip
+import re
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.template import Context, Template
+from django.test import Client, RequestFactory, SimpleTestCase, override_settings
+
+from . import profiling, views
+from .admission import EndpointLimiter, Rejected, ReleasingStream, TokenBuckets, get_controller
+from .caching import cached_page
+from .instrumentation import MetricsRegistry, registry, timed
+
+PAGE = b'<html><body>' + b'<p>Portfolio</p>' * 200 + b'</body></html>'
+
+
+@cached_page
+def page(request):
+    page.calls += 1
+    return HttpResponse(PAGE, content_type='text/html; charset=utf-8')
+
+
+@override_settings(PAGE_CACHE_SECONDS=600)
+class CachedPageTests(SimpleTestCase):
+    """Cached pages answer conditional, HEAD and compressed requests with consistent headers"""
+
+    def setUp(self):
+        cache.clear()
+        page.calls = 0
+        self.factory = RequestFactory()
+
+    def assertCacheHeaders(self, response, etag):
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=0, must-revalidate')
+
+    def test_repeat_hits_skip_the_view(self):
+        first = page(self.factory.get('/page/'))
+        second = page(self.factory.get('/page/'))
+        self.assertEqual(page.calls, 1)
+        self.assertEqual(first.content, PAGE)
+        self.assertEqual(second.content, PAGE)
+
+    def test_if_none_match_gets_304_with_cache_headers(self):
+        etag = page(self.factory.get('/page/'))['ETag']
+        response = page(self.factory.get('/page/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertCacheHeaders(response, etag)
+
+    def test_head_has_headers_but_no_body(self):
+        get = page(self.factory.get('/page/', HTTP_ACCEPT_ENCODING='gzip'))
+        head = page(self.factory.head('/page/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(head.status_code, 200)
+        self.assertEqual(head.content, b'')
+        self.assertEqual(head['Content-Length'], str(len(get.content)))
+        self.assertEqual(head['Content-Encoding'], 'gzip')
+        self.assertCacheHeaders(head, get['ETag'])
+
+    def test_gzip_only_when_accepted(self):
+        plain = page(self.factory.get('/page/'))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(plain.content, PAGE)
+
+        compressed = page(self.factory.get('/page/', HTTP_ACCEPT_ENCODING='br, gzip'))
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), PAGE)
+        self.assertCacheHeaders(compressed, plain['ETag'])
+
+    @override_settings(DEBUG=False)
+    def test_pages_render_without_collectstatic(self):
+        client = Client(HTTP_HOST='localhost')
+        for path in ('/', '/resume/'):
+            self.assertEqual(client.get(path).status_code, 200, path)
+
+
+class ResponsiveImageTests(SimpleTestCase):
+    """The responsive_image tag adds a WebP srcset only when collected variants exist"""
+
+    template = Template(
+        "{% load assets %}{% responsive_image 'images/me.png' alt='A & B' css_class='photo' sizes='50vw' %}"
+    )
+
+    def render(self, variants):
+        storage = SimpleNamespace(webp_variants=lambda path: variants)
+        with mock.patch('personal_website.templatetags.assets.staticfiles_storage', storage):
+            return self.template.render(Context())
+
+    @override_settings(DEBUG=False)
+    def test_picture_with_webp_srcset(self):
+        html = self.render([('/static/images/me.320w.abc.webp', 320), ('/static/images/me.960w.def.webp', 960)])
+        self.assertInHTML(
+            '<picture><source type="image/webp" sizes="50vw" '
+            'srcset="/static/images/me.320w.abc.webp 320w, /static/images/me.960w.def.webp 960w">'
+            '<img src="/static/images/me.png" alt="A &amp; B" class="photo" decoding="async"></picture>',
+            html,
+        )
+
+    @override_settings(DEBUG=False)
+    def test_plain_img_without_variants(self):
+        html = self.render([])
+        self.assertNotIn('<picture>', html)
+        self.assertInHTML('<img src="/static/images/me.png" alt="A &amp; B" class="photo" decoding="async">', html)
+
+    @override_settings(DEBUG=True)
+    def test_plain_img_in_debug(self):
+        self.assertNotIn('<picture>', self.render([('/static/images/me.320w.abc.webp', 320)]))
+
+
+class TokenBucketTests(SimpleTestCase):
+    """Per-client buckets allow a burst, then reject with the time until enough tokens refill"""
+
+    def test_exhausted_bucket_rejects_with_retry_after(self):
+        buckets = TokenBuckets(rate=0.5, burst=2)
+        buckets.take('1.2.3.4')
+        buckets.take('1.2.3.4')
+        with self.assertRaises(Rejected) as raised:
+            buckets.take('1.2.3.4')
+        self.assertEqual(raised.exception.status, 429)
+        self.assertAlmostEqual(raised.exception.retry_after, 2.0, delta=0.1)
+        # Other clients have their own bucket
+        buckets.take('5.6.7.8')
+
+    def test_least_recently_seen_clients_are_pruned(self):
+        buckets = TokenBuckets(rate=0.001, burst=1, max_clients=2)
+        for client in ('a', 'b', 'c'):
+            buckets.take(client)
+        # 'a' was pruned and starts again with a full bucket
+        buckets.take('a')
+        with self.assertRaises(Rejected):
+            buckets.take('c')
+
+
+class EndpointLimiterTests(SimpleTestCase):
+    """Concurrency slots with a bounded FIFO queue"""
+
+    def wait_for_waiters(self, limiter, count):
+        deadline = time.monotonic() + 2
+        while len(limiter.waiters) < count:
+            self.assertLess(time.monotonic(), deadline, 'waiter did not queue')
+            time.sleep(0.001)
+
+    def test_full_queue_is_rejected(self):
+        limiter = EndpointLimiter('test', concurrency=1, queue=0, queue_timeout=1.0)
+        limiter.acquire()
+        with self.assertRaises(Rejected) as raised:
+            limiter.acquire()
+        self.assertEqual((raised.exception.status, raised.exception.reason), (503, 'queue_full'))
+        self.assertGreater(raised.exception.retry_after, 0)
+
+    def test_expired_wait_is_rejected_and_leaves_the_queue(self):
+        limiter = EndpointLimiter('test', concurrency=1, queue=1, queue_timeout=0.01)
+        limiter.acquire()
+        with self.assertRaises(Rejected) as raised:
+            limiter.acquire()
+        self.assertEqual((raised.exception.status, raised.exception.reason), (503, 'queue_timeout'))
+        self.assertEqual(len(limiter.waiters), 0)
+        limiter.release(0.1)
+        self.assertEqual(limiter.active, 0)
+
+    def test_waiters_are_admitted_in_arrival_order(self):
+        limiter = EndpointLimiter('test', concurrency=1, queue=3, queue_timeout=5.0)
+        limiter.acquire()
+        admitted = []
+        threads = []
+        for i in range(3):
+            thread = threading.Thread(target=lambda i=i: (limiter.acquire(), admitted.append(i)))
+            thread.start()
+            threads.append(thread)
+            self.wait_for_waiters(limiter, i + 1)
+        for released in range(1, 4):
+            limiter.release(0.1)
+            deadline = time.monotonic() + 2
+            while len(admitted) < released and time.monotonic() < deadline:
+                time.sleep(0.001)
+            self.assertEqual(admitted, list(range(released)))
+        for thread in threads:
+            thread.join(2)
+        # The last admitted request still holds the only slot
+        self.assertEqual(limiter.active, 1)
+
+
+class ReleasingStreamTests(SimpleTestCase):
+    """A streamed response releases its admission slot exactly once"""
+
+    def test_release_on_exhaustion(self):
+        release = mock.Mock()
+        stream = ReleasingStream(iter([b'a', b'b']), release)
+        self.assertEqual(list(stream), [b'a', b'b'])
+        stream.close()
+        release.assert_called_once_with()
+
+    def test_release_on_close_before_iteration(self):
+        # A client that disconnects before the first event: the generator never starts
+        started = []
+
+        def events():
+            started.append(True)
+            yield b'event: one\n\n'
+
+        release = mock.Mock()
+        content = events()
+        stream = ReleasingStream(content, release)
+        stream.close()
+        stream.close()
+        release.assert_called_once_with()
+        self.assertEqual(started, [])
+        with self.assertRaises(StopIteration):
+            next(content)
+
+    def test_release_when_the_stream_fails(self):
+        def events():
+            yield b'event: one\n\n'
+            raise RuntimeError('tick source failed')
+
+        release = mock.Mock()
+        stream = ReleasingStream(events(), release)
+        next(stream)
+        with self.assertRaises(RuntimeError):
+            next(stream)
+        release.assert_called_once_with()
+
+
+ADMISSION = {
+    'rate': 0.01,
+    'burst': 1,
+    'endpoints': {'graphrag:graph_query': {'concurrency': 1, 'queue': 0, 'queue_timeout': 0.0, 'cost': 1.0}},
+}
+
+
+class AdmissionMiddlewareTests(SimpleTestCase):
+    """Shed requests get 429 or 503 with Retry-After; other views are not limited"""
+
+    url = '/graphrag/api/graph-query/'
+
+    def setUp(self):
+        self.client = Client(HTTP_HOST='localhost')
+
+    @override_settings(ADMISSION_CONTROL=dict(ADMISSION))
+    def test_rate_limited_client_gets_429(self):
+        # Invalid JSON is answered right after admission, so no model is needed
+        self.assertEqual(self.client.post(self.url, 'not json', content_type='application/json').status_code, 400)
+        response = self.client.post(self.url, 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        # Another client still gets through
+        response = self.client.post(self.url, 'not json', content_type='application/json', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ADMISSION_CONTROL=dict(ADMISSION, rate=100.0, burst=100.0))
+    def test_saturated_endpoint_gets_503(self):
+        limiter = get_controller().limiters['graphrag:graph_query']
+        limiter.acquire()
+        try:
+            response = self.client.post(self.url, 'not json', content_type='application/json')
+        finally:
+            limiter.release(0.1)
+        self.assertEqual(response.status_code, 503)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(self.client.post(self.url, 'not json', content_type='application/json').status_code, 400)
+        self.assertEqual(limiter.active, 0)
+
+    @override_settings(ADMISSION_CONTROL=dict(ADMISSION))
+    def test_uncontrolled_views_are_not_limited(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/contact/').status_code, 200)
+
+
+class ProfilingMiddlewareTests(SimpleTestCase):
+    """Who gets profiled, who sees the profile id, and how many profiles are kept"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0, PROFILING_DIR=directory.name, PROFILING_MAX_FILES=3,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.middleware = profiling.ProfilingMiddleware(lambda request: HttpResponse('ok'))
+        self.factory = RequestFactory()
+
+    def request(self, path='/resume/', staff=False, **extra):
+        request = self.factory.get(path, **extra)
+        request.user = SimpleNamespace(is_staff=staff)
+        return request
+
+    def test_staff_request_is_profiled_and_gets_the_id(self):
+        for request in (self.request('/?profile=1', staff=True), self.request(staff=True, HTTP_X_PROFILE='1')):
+            self.assertEqual(profiling._trigger(request), 'requested')
+            response = self.middleware(request)
+            self.assertIsNotNone(profiling.profile_path(response['X-Profile-Id']))
+
+    def test_anonymous_request_for_a_profile_is_ignored(self):
+        request = self.request('/?profile=1')
+        self.assertIsNone(profiling._trigger(request))
+        self.assertFalse(self.middleware(request).has_header('X-Profile-Id'))
+        self.assertEqual(profiling.recent_profiles(), [])
+
+    def test_sampled_request_is_stored_without_exposing_the_id(self):
+        with override_settings(PROFILING_SAMPLE_RATE=0.5), mock.patch('random.random', return_value=0.1):
+            response = self.middleware(self.request())
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        (summary,) = profiling.recent_profiles()
+        self.assertEqual((summary['trigger'], summary['path'], summary['status']), ('sampled', '/resume/', 200))
+
+    def test_disabled_profiling_ignores_staff(self):
+        with override_settings(PROFILING_ENABLED=False):
+            self.assertIsNone(profiling._trigger(self.request('/?profile=1', staff=True)))
+
+    def test_concurrent_request_skips_profiling(self):
+        with profiling._profiler_lock:
+            response = self.middleware(self.request('/?profile=1', staff=True))
+        self.assertEqual(response.content, b'ok')
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(profiling.recent_profiles(), [])
+
+    def test_only_the_newest_profiles_are_kept(self):
+        ids = []
+        for _ in range(5):
+            ids.append(self.middleware(self.request('/?profile=1', staff=True))['X-Profile-Id'])
+            time.sleep(0.001)
+        self.assertEqual([summary['id'] for summary in profiling.recent_profiles()], ids[:1:-1])
+        self.assertEqual(len(list(profiling.profile_dir().glob('*.prof'))), 3)
+        self.assertIsNone(profiling.profile_path(ids[0]))
+
+    def test_profile_path_rejects_traversal(self):
+        self.assertIsNone(profiling.profile_path('../settings'))
+
+
+# One sample line of the Prometheus text format: name, optional labels, value
+SAMPLE_RE = re.compile(
+    r'^[a-zA-Z_:][a-zA-Z0-9_:]*'
+    r'(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*"(?:,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\[\\"n])*")*\})?'
+    r' [-+]?(?:[0-9.e+-]+|Inf|NaN)$'
+)
+
+
+class MetricsRenderTests(SimpleTestCase):
+    """The registry renders valid Prometheus text exposition output"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def assertValidExposition(self, text):
+        self.assertTrue(text.endswith('\n'))
+        typed = set()
+        for line in text.splitlines():
+            if line.startswith('# TYPE '):
+                typed.add(line.split()[2])
+            elif not line.startswith('# HELP '):
+                self.assertRegex(line, SAMPLE_RE)
+                name = re.match(r'[a-zA-Z0-9_:]+', line).group()
+                self.assertTrue(any(name == family or name.startswith(family + '_') for family in typed),
+                                f"{name} has no TYPE line before it")
+
+    def test_help_and_type_lines_precede_samples(self):
+        self.registry.inc('http_requests_total', view='home', method='GET', status=200)
+        self.registry.inc('http_requests_total', view='resume', method='GET', status=200)
+        self.registry.set_gauge('semantic_cache_entries', 3)
+        text = self.registry.render()
+        self.assertValidExposition(text)
+        lines = text.splitlines()
+        self.assertEqual(lines.count('# TYPE portfolio_http_requests_total counter'), 1)
+        self.assertIn('# HELP portfolio_http_requests_total Django requests by view, method and status', lines)
+        self.assertIn('# TYPE portfolio_semantic_cache_entries gauge', lines)
+        self.assertIn('portfolio_http_requests_total{method="GET",status="200",view="home"} 1', lines)
+        self.assertIn('portfolio_semantic_cache_entries 3', lines)
+
+    def test_label_values_are_escaped(self):
+        self.registry.inc('stage_errors_total', stage='say "hi"\\now\nplease')
+        text = self.registry.render()
+        self.assertValidExposition(text)
+        self.assertIn('portfolio_stage_errors_total{stage="say \\"hi\\"\\\\now\\nplease"} 1', text.splitlines())
+
+    def test_histogram_has_cumulative_buckets_sum_and_count(self):
+        for value in (0.003, 0.2, 0.2, 100.0):
+            self.registry.observe('stage_duration_seconds', value, stage='load')
+        text = self.registry.render()
+        self.assertValidExposition(text)
+        lines = text.splitlines()
+        self.assertIn('# TYPE portfolio_stage_duration_seconds histogram', lines)
+        buckets = [line for line in lines if line.startswith('portfolio_stage_duration_seconds_bucket')]
+        counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+        self.assertEqual(counts, sorted(counts))
+        self.assertIn('portfolio_stage_duration_seconds_bucket{stage="load",le="0.005"} 1', lines)
+        self.assertIn('portfolio_stage_duration_seconds_bucket{stage="load",le="0.25"} 3', lines)
+        self.assertIn('portfolio_stage_duration_seconds_bucket{stage="load",le="60.0"} 3', lines)
+        self.assertEqual(buckets[-1], 'portfolio_stage_duration_seconds_bucket{stage="load",le="+Inf"} 4')
+        self.assertIn('portfolio_stage_duration_seconds_sum{stage="load"} 100.403', lines)
+        self.assertIn('portfolio_stage_duration_seconds_count{stage="load"} 4', lines)
+
+    def test_timed_records_duration_and_errors(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+        @timed('unit', kind='test')
+        def fails():
+            raise ValueError
+
+        with timed('unit', kind='test'):
+            pass
+        with self.assertRaises(ValueError):
+            fails()
+        snapshot = registry.snapshot()
+        key = (('kind', 'test'), ('stage', 'unit'))
+        self.assertEqual(snapshot['histograms'][('stage_duration_seconds', key)]['count'], 2)
+        self.assertEqual(snapshot['counters'][('stage_errors_total', key)], 1)
+        self.assertValidExposition(registry.render())
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_timed_is_a_no_op_when_disabled(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+        with timed('unit'):
+            pass
+        self.assertEqual(registry.snapshot()['histograms'], {})
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_ALLOWED_IPS=['127.0.0.1', '::1'])
+class MetricsViewTests(SimpleTestCase):
+    """/metrics is served only to staff and allowed scrape addresses"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, remote_addr, is_staff=False):
+        request = self.factory.get('/metrics', REMOTE_ADDR=remote_addr)
+        request.user = SimpleNamespace(is_staff=is_staff)
+        return views.metrics(request)
+
+    def test_allowed_address_gets_prometheus_text(self):
+        response = Client(HTTP_HOST='localhost').get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+
+    def test_other_addresses_are_refused(self):
+        response = Client(HTTP_HOST='localhost', REMOTE_ADDR='203.0.113.7').get('/metrics')
+        self.assertEqual(response.status_code, 404)
+        with self.assertRaises(Http404):
+            self.get('203.0.113.7')
+
+    def test_staff_can_read_from_any_address(self):
+        self.assertEqual(self.get('203.0.113.7', is_staff=True).status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_metrics_are_not_found(self):
+        with self.assertRaises(Http404):
+            self.get('127.0.0.1', is_staff=True)
@@ -21,12 +21,15 @@ from django.conf.urls.static import static
 from . import views as personal_website_views
 
 urlpatterns = [
+    path('admin/profiles/', personal_website_views.profiles, name='profiles'),
+    path('admin/profiles/<str:profile_id>.prof', personal_website_views.profile_download, name='profile_download'),
     path('admin/', admin.site.urls),
     path('', personal_website_views.base, name='home'),
     path('resume/', personal_website_views.resume, name='resume'),
     path('projects/', personal_website_views.projects, name='projects'),
     path('contact/', personal_website_views.contact, name='contact'),
     path('chatbot-demo/', personal_website_views.chatbot_demo, name='chatbot_demo'),
+    path('metrics', personal_website_views.metrics, name='metrics'),
     path('graphrag/', include('graphrag.urls')),
     path('stock-trading/', include('stock_trading.urls')),
     path('chatbot/', include('chatbot.urls')),
@@ -1,16 +1,53 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import render
 
+from .caching import cached_page
+from .instrumentation import metrics_enabled, registry
+from .profiling import profile_path, recent_profiles
+
+@cached_page
 def base(request):
     return render(request, 'base.html')
 
+@cached_page
 def resume(request):
     return render(request, 'resume.html')
 
+@cached_page
 def contact(request):
     return render(request, 'contact.html')
 
+@cached_page
 def projects(request):
     return render(request, 'projects.html')
 
+@cached_page
 def chatbot_demo(request):
-    return render(request, 'chatbot_demo.html')
\ No newline at end of file
+    return render(request, 'chatbot_demo.html')
+
+def metrics(request):
+    """Expose in-process metrics in Prometheus text format to staff and allowed scrape IPs"""
+    if not metrics_enabled():
+        raise Http404("Metrics are disabled")
+    if not request.user.is_staff and request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404("Metrics are not available to this client")
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@staff_member_required
+def profiles(request):
+    """Admin page listing recent request profiles with their top functions"""
+    context = {
+        'title': 'Request profiles',
+        'profiles': recent_profiles(),
+    }
+    return render(request, 'admin/profiles.html', context)
+
+@staff_member_required
+def profile_download(request, profile_id):
+    """Download the raw pstats file of a stored profile"""
+    path = profile_path(profile_id)
+    if path is None:
+        raise Http404("Profile not found")
+    return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
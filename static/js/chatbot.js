@@ -2,7 +2,7 @@
 class Chatbot {
   constructor() {
     this.isOpen = false;
-    this.conversationHistory = [];
+    this.sessionId = null;
     this.isRecording = false;
     this.mediaRecorder = null;
     this.audioChunks = [];
@@ -381,7 +381,7 @@ class Chatbot {
         },
         body: JSON.stringify({
           message: message,
-          history: this.conversationHistory
+          session_id: this.sessionId
         })
       });
       
@@ -394,11 +394,8 @@ class Chatbot {
         // Add assistant message
         this.addMessage(data.response, 'assistant');
         
-        // Update conversation history
-        this.conversationHistory.push(
-          { role: 'user', content: message },
-          { role: 'assistant', content: data.response }
-        );
+        // Conversation history is kept on the server under this session
+        this.sessionId = data.session_id;
         
         // Auto-speak in voice mode
         if (this.isVoiceMode) {
@@ -0,0 +1,232 @@
+"""
+Vectorized backtesting engine.
+
+Prices and positions are 2-D arrays shaped ``(n_tickers, n_bars)``. Every
+computation (fills, PnL, equity, trade extraction, statistics) is done with
+whole-array NumPy operations, so there is no Python loop over bars or tickers.
+
+Positions are the target exposure decided at the close of each bar
+(e.g. -1, 0, 1 or fractional weights). They are filled at the next bar's
+open when opens are available, otherwise at the next close.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+TRADE_DTYPE = np.dtype([
+    ('ticker', np.int32),
+    ('entry_bar', np.int32),
+    ('exit_bar', np.int32),
+    ('direction', np.float64),
+    ('return', np.float64),
+])
+
+
+def load_ohlcv(csv_path, cache_dir=None):
+    """
+    Load long-format OHLCV data (``Date,Ticker,Open,High,Low,Close,Volume``)
+    as memory-mapped ``(n_tickers, n_bars)`` arrays.
+
+    The CSV is pivoted once into ``.npy`` files in ``cache_dir`` (default:
+    ``<csv stem>_npy`` next to the CSV); later calls memory-map those files
+    directly until the CSV is modified.
+    """
+    csv_path = Path(csv_path)
+    cache_dir = Path(cache_dir) if cache_dir else csv_path.with_name(f"{csv_path.stem}_npy")
+    meta_path = cache_dir / 'meta.json'
+
+    if not meta_path.exists() or meta_path.stat().st_mtime < csv_path.stat().st_mtime:
+        _build_npy_cache(csv_path, cache_dir)
+
+    meta = json.loads(meta_path.read_text())
+    data = {field: np.load(cache_dir / f"{field}.npy", mmap_mode='r') for field in OHLCV_FIELDS}
+    data['tickers'] = meta['tickers']
+    data['dates'] = np.load(cache_dir / 'dates.npy')
+    return data
+
+
+def _build_npy_cache(csv_path, cache_dir):
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, parse_dates=['Date'])
+    df.columns = [column.lower() for column in df.columns]
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    for field in OHLCV_FIELDS:
+        wide = df.pivot(index='ticker', columns='date', values=field).sort_index()
+        # Forward-fill gaps so missing bars behave like an unchanged price
+        wide = wide.ffill(axis=1).bfill(axis=1)
+        np.save(cache_dir / f"{field}.npy", np.ascontiguousarray(wide.to_numpy(dtype=np.float64)))
+
+    tickers = sorted(df['ticker'].unique().tolist())
+    dates = np.array(sorted(df['date'].unique()), dtype='datetime64[D]')
+    np.save(cache_dir / 'dates.npy', dates)
+    (cache_dir / 'meta.json').write_text(json.dumps({'tickers': tickers}))
+
+
+def synthetic_ohlcv(n_tickers, n_bars, seed=0, annual_vol=0.25, annual_drift=0.07):
+    """Geometric Brownian motion prices with plausible intrabar ranges"""
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / TRADING_DAYS_PER_YEAR
+    vol = rng.uniform(0.5, 1.5, (n_tickers, 1)) * annual_vol
+    drift = (annual_drift - 0.5 * vol ** 2) * dt
+    log_returns = drift + vol * np.sqrt(dt) * rng.standard_normal((n_tickers, n_bars))
+    start = rng.uniform(20, 200, (n_tickers, 1))
+
+    close = start * np.exp(np.cumsum(log_returns, axis=1))
+    gap = 1 + 0.3 * vol * np.sqrt(dt) * rng.standard_normal((n_tickers, n_bars))
+    open_ = np.concatenate([start, close[:, :-1]], axis=1) * gap
+    spread = np.abs(rng.standard_normal((n_tickers, n_bars))) * vol * np.sqrt(dt) * close
+    return {
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.integers(10_000, 1_000_000, (n_tickers, n_bars)).astype(np.float64),
+        'tickers': [f"T{i:05d}" for i in range(n_tickers)],
+    }
+
+
+def moving_average_crossover(close, fast=20, slow=50, allow_short=False):
+    """Long (or short) when the fast SMA is above (below) the slow SMA; flat during warm-up"""
+    close = np.atleast_2d(close)
+    fast_ma = rolling_mean(close, fast)
+    slow_ma = rolling_mean(close, slow)
+    positions = np.where(fast_ma > slow_ma, 1.0, -1.0 if allow_short else 0.0)
+    positions[:, :slow - 1] = 0.0
+    return positions
+
+
+def rolling_mean(values, window):
+    """Trailing mean along the last axis computed with a cumulative sum; NaN before ``window`` bars"""
+    cumsum = np.cumsum(values, axis=-1, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    out[..., window - 1] = cumsum[..., window - 1] / window
+    out[..., window:] = (cumsum[..., window:] - cumsum[..., :-window]) / window
+    return out
+
+
+def run_backtest(close, positions, open_=None, cost_bps=5.0, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Backtest ``positions`` against ``close`` (and optionally ``open_``) prices.
+
+    Capital is split equally across tickers. ``cost_bps`` is charged on
+    every unit of position change. Returns a dict with per-ticker and
+    portfolio returns, the equity curve, a structured trade array
+    (``TRADE_DTYPE``) and summary statistics.
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    positions = np.atleast_2d(np.asarray(positions, dtype=np.float64))
+    if positions.shape != close.shape:
+        raise ValueError(f"positions shape {positions.shape} does not match prices {close.shape}")
+
+    # Exposure actually held during each bar: yesterday's target, filled today
+    held = np.zeros_like(positions)
+    held[:, 1:] = positions[:, :-1]
+    prev_held = np.zeros_like(held)
+    prev_held[:, 1:] = held[:, :-1]
+    prev_close = np.empty_like(close)
+    prev_close[:, 0] = close[:, 0]
+    prev_close[:, 1:] = close[:, :-1]
+
+    if open_ is not None:
+        open_ = np.atleast_2d(np.asarray(open_, dtype=np.float64))
+        # Old exposure rides the overnight gap, the new one the session
+        overnight = prev_held * (open_ / prev_close - 1)
+        intraday = held * (close / open_ - 1)
+    else:
+        overnight = np.zeros_like(held)
+        intraday = held * (close / prev_close - 1)
+
+    turnover = np.abs(held - prev_held)
+    costs = turnover * (cost_bps / 1e4)
+    ticker_returns = overnight + intraday - costs
+
+    # Split each change's cost between the position being closed and the one
+    # being opened, pro rata to their size (a reversal charges each side half)
+    exposure = np.abs(prev_held) + np.abs(held)
+    exit_share = np.divide(np.abs(prev_held), exposure, out=np.zeros_like(exposure), where=exposure > 0)
+    exit_returns = overnight - costs * exit_share
+    entry_returns = intraday - costs * (1 - exit_share)
+
+    portfolio_returns = ticker_returns.mean(axis=0)
+    equity = np.cumprod(1 + portfolio_returns)
+    trades = extract_trades(held, ticker_returns, entry_returns, exit_returns)
+
+    stats = summary_stats(portfolio_returns, equity, trades, periods_per_year)
+    stats['turnover'] = float(turnover.sum() / close.shape[0])
+    return {
+        'ticker_returns': ticker_returns,
+        'portfolio_returns': portfolio_returns,
+        'equity': equity,
+        'trades': trades,
+        'stats': stats,
+    }
+
+
+def extract_trades(held, ticker_returns, entry_returns=None, exit_returns=None):
+    """
+    Turn a held-position array into a trade list. A trade is a maximal run of
+    bars holding the same non-zero position; its return compounds the
+    ticker's strategy returns over that run.
+
+    On the bars where the position changes, ``ticker_returns`` mixes the old
+    and the new position. ``entry_returns`` is the opening trade's share of
+    such a bar (session move less entry cost) and ``exit_returns`` the closing
+    trade's share (overnight gap less exit cost); both default to treating
+    the whole bar as belonging to the new position.
+    """
+    n_tickers, n_bars = held.shape
+    padded = np.zeros((n_tickers, n_bars + 2))
+    padded[:, 1:-1] = held
+    # change[t, b] marks that bar b starts a new run for ticker t (b == n_bars closes the last one)
+    ticker_idx, bar_idx = np.nonzero(padded[:, 1:] != padded[:, :-1])
+
+    same_ticker = ticker_idx[:-1] == ticker_idx[1:]
+    starts = bar_idx[:-1][same_ticker]
+    ends = bar_idx[1:][same_ticker]
+    tickers = ticker_idx[:-1][same_ticker]
+    direction = held[tickers, np.minimum(starts, n_bars - 1)]
+    is_trade = (direction != 0) & (starts < n_bars)
+    starts, ends, tickers, direction = starts[is_trade], ends[is_trade], tickers[is_trade], direction[is_trade]
+
+    if entry_returns is None:
+        entry_returns = ticker_returns
+    if exit_returns is None:
+        exit_returns = np.zeros_like(ticker_returns)
+
+    log_growth = np.zeros((n_tickers, n_bars + 1))
+    np.cumsum(np.log1p(ticker_returns), axis=1, out=log_growth[:, 1:])
+    # Entry bar, the bars held throughout, then the exit bar (absent if still open at the end)
+    trade_log = np.log1p(entry_returns[tickers, starts]) + log_growth[tickers, ends] - log_growth[tickers, starts + 1]
+    closed = ends < n_bars
+    trade_log[closed] += np.log1p(exit_returns[tickers[closed], ends[closed]])
+    trade_returns = np.expm1(trade_log)
+
+    trades = np.empty(len(starts), dtype=TRADE_DTYPE)
+    trades['ticker'] = tickers
+    trades['entry_bar'] = starts
+    trades['exit_bar'] = ends
+    trades['direction'] = direction
+    trades['return'] = trade_returns
+    return trades
+
+
+def summary_stats(portfolio_returns, equity, trades, periods_per_year=TRADING_DAYS_PER_YEAR):
+    """Headline statistics of a backtest"""
+    std = portfolio_returns.std()
+    running_peak = np.maximum.accumulate(np.concatenate([[1.0], equity]))[1:]
+    drawdown = equity / running_peak - 1
+    durations = trades['exit_bar'] - trades['entry_bar']
+    return {
+        'total_return': float(equity[-1] - 1) if len(equity) else 0.0,
+        'sharpe_ratio': float(portfolio_returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0,
+        'max_drawdown': float(drawdown.min()) if len(drawdown) else 0.0,
+        'total_trades': int(len(trades)),
+        'win_rate': float((trades['return'] > 0).mean()) if len(trades) else 0.0,
+        'avg_trade_duration': float(durations.mean()) if len(trades) else 0.0,
+    }
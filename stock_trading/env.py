@@ -0,0 +1,159 @@
+"""
+Batched trading environments for reinforcement-learning training.
+
+``VectorTradingEnv`` steps N independent single-ticker episodes at once:
+observations, actions, rewards and done masks are NumPy arrays with a
+leading ``n_envs`` axis, so one Python call advances every environment.
+``SubprocVectorTradingEnv`` shards the environments across worker processes
+to use several cores.
+
+Observation: the last ``window`` log returns of the episode's ticker
+followed by the currently held position. Action: target position in
+[-1, 1] (discrete actions -1/0/1 work as well). Reward: held position times
+the next bar's log return minus ``cost_bps`` on the position change.
+Finished episodes are reset automatically; ``info['episode_return']``
+holds their total reward (NaN for environments that did not finish).
+"""
+import multiprocessing as mp
+
+import numpy as np
+
+
+class VectorTradingEnv:
+    """N trading episodes over a shared price array, stepped in lock-step"""
+
+    def __init__(self, close, n_envs, window=30, episode_length=252, cost_bps=5.0, seed=None):
+        close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+        if close.shape[1] < window + episode_length + 1:
+            raise ValueError("price history is shorter than window + episode_length + 1 bars")
+
+        self.log_returns = np.diff(np.log(close), axis=1).astype(np.float32)
+        self.n_envs = n_envs
+        self.window = window
+        self.episode_length = episode_length
+        self.cost = cost_bps / 1e4
+        self.observation_shape = (window + 1,)
+        self.rng = np.random.default_rng(seed)
+
+        self._offsets = np.arange(-window, 0)
+        self.ticker = np.zeros(n_envs, dtype=np.int64)
+        self.bar = np.zeros(n_envs, dtype=np.int64)
+        self.steps = np.zeros(n_envs, dtype=np.int64)
+        self.position = np.zeros(n_envs, dtype=np.float32)
+        self.episode_return = np.zeros(n_envs, dtype=np.float64)
+
+    def reset(self, seed=None):
+        """Start a new episode in every environment and return the observations"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_envs(np.ones(self.n_envs, dtype=bool))
+        return self._observe()
+
+    def step(self, actions):
+        """Apply target positions and advance every environment one bar"""
+        actions = np.clip(np.asarray(actions, dtype=np.float32).reshape(self.n_envs), -1.0, 1.0)
+
+        market_return = self.log_returns[self.ticker, self.bar]
+        rewards = actions * market_return - self.cost * np.abs(actions - self.position)
+
+        self.position = actions
+        self.bar += 1
+        self.steps += 1
+        self.episode_return += rewards
+
+        dones = self.steps >= self.episode_length
+        episode_return = np.where(dones, self.episode_return, np.nan)
+        if dones.any():
+            self._reset_envs(dones)
+        return self._observe(), rewards, dones, {'episode_return': episode_return}
+
+    def _reset_envs(self, mask):
+        count = int(mask.sum())
+        n_tickers, n_returns = self.log_returns.shape
+        self.ticker[mask] = self.rng.integers(0, n_tickers, count)
+        self.bar[mask] = self.rng.integers(self.window, n_returns - self.episode_length + 1, count)
+        self.steps[mask] = 0
+        self.position[mask] = 0.0
+        self.episode_return[mask] = 0.0
+
+    def _observe(self):
+        obs = np.empty((self.n_envs, self.window + 1), dtype=np.float32)
+        obs[:, :-1] = self.log_returns[self.ticker[:, None], self.bar[:, None] + self._offsets]
+        obs[:, -1] = self.position
+        return obs
+
+
+def _worker(conn, close, n_envs, kwargs):
+    env = VectorTradingEnv(close, n_envs, **kwargs)
+    try:
+        while True:
+            command, payload = conn.recv()
+            if command == 'step':
+                conn.send(env.step(payload))
+            elif command == 'reset':
+                conn.send(env.reset(payload))
+            elif command == 'close':
+                break
+    finally:
+        conn.close()
+
+
+class SubprocVectorTradingEnv:
+    """
+    ``VectorTradingEnv`` sharded across ``n_workers`` processes.
+
+    Each worker steps its slice of the environments; results are
+    concatenated so the interface matches the single-process version.
+    """
+
+    def __init__(self, close, n_envs, n_workers=None, seed=None, **kwargs):
+        n_workers = n_workers or mp.cpu_count()
+        n_workers = max(1, min(n_workers, n_envs))
+        self.n_envs = n_envs
+        self.splits = np.array_split(np.arange(n_envs), n_workers)
+        seeds = np.random.SeedSequence(seed).spawn(n_workers)
+
+        # fork shares the price array copy-on-write instead of pickling it per worker
+        context = mp.get_context('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+        self.conns = []
+        self.processes = []
+        for split, worker_seed in zip(self.splits, seeds):
+            parent, child = context.Pipe()
+            worker_kwargs = dict(kwargs, seed=worker_seed.generate_state(1)[0])
+            process = context.Process(target=_worker, args=(child, close, len(split), worker_kwargs), daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+        self.observation_shape = (kwargs.get('window', 30) + 1,)
+
+    def reset(self, seed=None):
+        for i, conn in enumerate(self.conns):
+            conn.send(('reset', None if seed is None else seed + i))
+        return np.concatenate([conn.recv() for conn in self.conns])
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.float32).reshape(self.n_envs)
+        for conn, split in zip(self.conns, self.splits):
+            conn.send(('step', actions[split[0]:split[-1] + 1]))
+        results = [conn.recv() for conn in self.conns]
+        obs, rewards, dones, infos = zip(*results)
+        info = {'episode_return': np.concatenate([i['episode_return'] for i in infos])}
+        return np.concatenate(obs), np.concatenate(rewards), np.concatenate(dones), info
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+        self.conns, self.processes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
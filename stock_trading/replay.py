@@ -0,0 +1,273 @@
+"""
+Streaming tick replay with incremental indicators.
+
+Ticks flow through plain generators (file readers -> merge -> pacing ->
+``IndicatorEngine.consume``). Every indicator is updated in constant time
+per tick from ring buffers and running sums, so the cost per tick does not
+depend on window length and thousands of symbols fit in one process.
+
+Tick files are CSVs with ``timestamp,symbol,price`` rows sorted by
+timestamp; timestamps are ISO-8601 strings or epoch seconds. Rows with an
+unparsable timestamp or a price that is not a finite positive number are
+skipped and counted, so one bad row cannot end a stream.
+"""
+import csv
+import heapq
+import logging
+import math
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+
+TRADING_SECONDS_PER_YEAR = 252 * 6.5 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO that returns the value it evicts"""
+
+    __slots__ = ('values', 'capacity', 'index', 'count')
+
+    def __init__(self, capacity):
+        self.values = [0.0] * capacity
+        self.capacity = capacity
+        self.index = 0
+        self.count = 0
+
+    def push(self, value):
+        evicted = self.values[self.index] if self.count == self.capacity else None
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        return evicted
+
+    @property
+    def full(self):
+        return self.count == self.capacity
+
+
+class RollingMoments:
+    """Rolling mean and sample standard deviation over the last ``window`` values"""
+
+    __slots__ = ('buffer', 'total', 'total_sq')
+
+    def __init__(self, window):
+        self.buffer = RingBuffer(window)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, value):
+        evicted = self.buffer.push(value)
+        if evicted is not None:
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+        self.total += value
+        self.total_sq += value * value
+        if self.buffer.index == 0:
+            # Re-sum once per wrap so floating-point drift stays bounded (amortised O(1))
+            self.total = math.fsum(self.buffer.values)
+            self.total_sq = math.fsum(v * v for v in self.buffer.values)
+
+    @property
+    def mean(self):
+        count = self.buffer.count
+        return self.total / count if count else None
+
+    @property
+    def std(self):
+        count = self.buffer.count
+        if count < 2:
+            return None
+        variance = (self.total_sq - self.total * self.total / count) / (count - 1)
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+
+class SymbolIndicators:
+    """Incremental SMA, EMA, rolling volatility, RSI, rolling Sharpe and drawdown for one symbol"""
+
+    __slots__ = (
+        'last_price', 'last_ts', 'ticks', 'prices', 'ema', 'ema_alpha',
+        'vol', 'sharpe', 'rsi_period', 'avg_gain', 'avg_loss', 'peak', 'drawdown', 'max_drawdown',
+    )
+
+    def __init__(self, sma_window, ema_span, vol_window, rsi_period, sharpe_window):
+        self.last_price = None
+        self.last_ts = None
+        self.ticks = 0
+        self.prices = RollingMoments(sma_window)
+        self.ema = None
+        self.ema_alpha = 2.0 / (ema_span + 1)
+        self.vol = RollingMoments(vol_window)
+        self.sharpe = RollingMoments(sharpe_window)
+        self.rsi_period = rsi_period
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.peak = None
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+
+    def update(self, price, ts=None):
+        previous = self.last_price
+        self.last_price = price
+        self.last_ts = ts
+        self.ticks += 1
+        self.prices.push(price)
+        self.ema = price if self.ema is None else self.ema + self.ema_alpha * (price - self.ema)
+
+        self.peak = price if self.peak is None or price > self.peak else self.peak
+        self.drawdown = price / self.peak - 1
+        if self.drawdown < self.max_drawdown:
+            self.max_drawdown = self.drawdown
+
+        if previous is None or previous <= 0:
+            return
+        log_return = math.log(price / previous)
+        self.vol.push(log_return)
+        self.sharpe.push(log_return)
+
+        # Wilder smoothing: simple average for the first period, then exponential
+        change = price - previous
+        gain, loss = (change, 0.0) if change > 0 else (0.0, -change)
+        changes = self.ticks - 1
+        weight = 1.0 / min(changes, self.rsi_period)
+        self.avg_gain += (gain - self.avg_gain) * weight
+        self.avg_loss += (loss - self.avg_loss) * weight
+
+    def snapshot(self, periods_per_year=TRADING_SECONDS_PER_YEAR):
+        """Current indicator values as a JSON-friendly dict"""
+        rsi = None
+        if self.ticks > self.rsi_period:
+            rsi = 100.0 if self.avg_loss == 0 else 100.0 - 100.0 / (1 + self.avg_gain / self.avg_loss)
+
+        sharpe = None
+        mean, std = self.sharpe.mean, self.sharpe.std
+        if std:
+            sharpe = mean / std * math.sqrt(periods_per_year)
+
+        return {
+            'price': self.last_price,
+            'ts': self.last_ts,
+            'sma': self.prices.mean if self.prices.buffer.full else None,
+            'ema': self.ema,
+            'volatility': self.vol.std,
+            'rsi': rsi,
+            'sharpe': sharpe,
+            'drawdown': self.drawdown,
+            'max_drawdown': self.max_drawdown,
+        }
+
+
+class IndicatorEngine:
+    """Indicator state for many symbols, updated one tick at a time"""
+
+    def __init__(self, sma_window=20, ema_span=20, vol_window=20, rsi_period=14, sharpe_window=60,
+                 periods_per_year=TRADING_SECONDS_PER_YEAR):
+        self.params = (sma_window, ema_span, vol_window, rsi_period, sharpe_window)
+        self.periods_per_year = periods_per_year
+        self.symbols = {}
+        self.dirty = set()
+
+    def update(self, symbol, price, ts=None):
+        if not (price > 0 and math.isfinite(price)):
+            # Returns and drawdown are undefined for non-positive prices
+            return
+        state = self.symbols.get(symbol)
+        if state is None:
+            state = self.symbols[symbol] = SymbolIndicators(*self.params)
+        state.update(price, ts)
+        self.dirty.add(symbol)
+
+    def consume(self, ticks):
+        """Update from a tick iterable, passing each tick through"""
+        for ts, symbol, price in ticks:
+            self.update(symbol, price, ts)
+            yield ts, symbol, price
+
+    def snapshot(self, symbol):
+        return self.symbols[symbol].snapshot(self.periods_per_year)
+
+    def drain_updates(self):
+        """Snapshots of symbols updated since the previous call"""
+        updates = {symbol: self.snapshot(symbol) for symbol in self.dirty}
+        self.dirty.clear()
+        return updates
+
+
+def _parse_ts(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def read_ticks(path):
+    """Yield ``(ts, symbol, price)`` from one tick CSV, skipping malformed rows"""
+    skipped = 0
+    with open(path, newline='') as handle:
+        for row in csv.DictReader(handle):
+            try:
+                ts, price = _parse_ts(row['timestamp']), float(row['price'])
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            if not (price > 0 and math.isfinite(price)):
+                skipped += 1
+                continue
+            yield ts, row['symbol'], price
+    if skipped:
+        logger.warning("Skipped %d malformed ticks in %s", skipped, path)
+
+
+def merge_tick_files(paths):
+    """Merge several timestamp-sorted tick files into one ordered stream"""
+    return heapq.merge(*(read_ticks(path) for path in paths), key=lambda tick: tick[0])
+
+
+def tick_files(directory):
+    directory = Path(directory)
+    return sorted(directory.glob('*.csv')) if directory.is_dir() else []
+
+
+def synthetic_ticks(n_symbols, n_rounds, seed=0, start_ts=None, interval=1.0):
+    """Random-walk ticks: every round emits one tick per symbol, ``interval`` seconds apart"""
+    rng = random.Random(seed)
+    start_ts = time.time() if start_ts is None else start_ts
+    symbols = [f"SYM{i:04d}" for i in range(n_symbols)]
+    prices = [rng.uniform(20, 200) for _ in symbols]
+    sigma = 0.2 / math.sqrt(TRADING_SECONDS_PER_YEAR)
+    for round_index in range(n_rounds):
+        ts = start_ts + round_index * interval
+        for i, symbol in enumerate(symbols):
+            prices[i] *= math.exp(rng.gauss(0.0, sigma * math.sqrt(interval)))
+            yield ts, symbol, prices[i]
+
+
+def paced(ticks, speed):
+    """Sleep so ticks are released at ``speed`` times their recorded rate"""
+    first_ts = None
+    started = time.monotonic()
+    for tick in ticks:
+        if first_ts is None:
+            first_ts = tick[0]
+        delay = (tick[0] - first_ts) / speed - (time.monotonic() - started)
+        if delay > 0:
+            time.sleep(delay)
+        yield tick
+
+
+def batched_updates(ticks, engine, flush_seconds=1.0):
+    """
+    Run ``ticks`` through ``engine`` and yield ``{symbol: snapshot}`` for the
+    symbols that changed, at most once per ``flush_seconds`` of wall time.
+    """
+    last_flush = time.monotonic()
+    for _ in engine.consume(ticks):
+        now = time.monotonic()
+        if now - last_flush >= flush_seconds:
+            last_flush = now
+            yield engine.drain_updates()
+    if engine.dirty:
+        yield engine.drain_updates()
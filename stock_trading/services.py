@@ -0,0 +1,55 @@
+"""
+Backtesting services feeding the trading dashboard
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from personal_website.instrumentation import timed
+
+DASHBOARD_CACHE_KEY = 'stock_trading:dashboard'
+
+
+class BacktestService:
+    """Service class that loads prices, builds signals and runs the backtest engine"""
+
+    def __init__(self, fast=20, slow=50, cost_bps=5.0):
+        self.prices_csv = settings.STOCK_PRICES_CSV
+        self.fast = fast
+        self.slow = slow
+        self.cost_bps = cost_bps
+
+    def load_prices(self):
+        """Load OHLCV arrays from the local CSV, or synthetic prices when it is absent"""
+        from . import backtest
+
+        with timed('ohlcv_load'):
+            if self.prices_csv and self.prices_csv.exists():
+                return backtest.load_ohlcv(self.prices_csv)
+            return backtest.synthetic_ohlcv(
+                settings.STOCK_SYNTHETIC_TICKERS, settings.STOCK_SYNTHETIC_BARS, seed=7
+            )
+
+    def run(self, prices=None):
+        """Backtest a moving-average crossover over every ticker at once"""
+        from . import backtest
+
+        prices = prices if prices is not None else self.load_prices()
+        with timed('backtest'):
+            positions = backtest.moving_average_crossover(prices['close'], self.fast, self.slow)
+            return backtest.run_backtest(prices['close'], positions, prices['open'], cost_bps=self.cost_bps)
+
+    def dashboard_metrics(self):
+        """Headline metrics formatted for the dashboard template (cached)"""
+        return cache.get_or_set(DASHBOARD_CACHE_KEY, self._compute_dashboard_metrics,
+                                settings.STOCK_DASHBOARD_CACHE_SECONDS)
+
+    def _compute_dashboard_metrics(self):
+        stats = self.run()['stats']
+        return {
+            'total_trades': stats['total_trades'],
+            'win_rate': round(stats['win_rate'] * 100, 1),
+            'total_return': round(stats['total_return'] * 100, 1),
+            'sharpe_ratio': round(stats['sharpe_ratio'], 2),
+            'max_drawdown': round(stats['max_drawdown'] * 100, 1),
+            'avg_trade_duration': f"{stats['avg_trade_duration']:.1f} days",
+        }
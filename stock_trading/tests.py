@@ -1,3 +1,219 @@
-from django.test import TestCase
+import json
+import tempfile
+from pathlib import Path
 
-# Create your tests here.
+import numpy as np
+from django.test import Client, SimpleTestCase, override_settings
+
+from . import backtest, replay
+from .env import SubprocVectorTradingEnv, VectorTradingEnv
+
+
+class TradeAttributionTests(SimpleTestCase):
+    """A trade's return includes the overnight gap and exit cost of the bar that closes it"""
+
+    # Flat closes with a 1 % gap down at bar 3's open
+    close = np.array([[100.0, 100.0, 100.0, 100.0, 100.0]])
+    open_ = np.array([[100.0, 100.0, 100.0, 99.0, 100.0]])
+
+    def test_exit_gap_and_cost_go_to_the_closing_trade(self):
+        # Held long on bars 1-2, closed at bar 3's open
+        positions = np.array([[1.0, 1.0, 0.0, 0.0, 0.0]])
+        result = backtest.run_backtest(self.close, positions, self.open_, cost_bps=100)
+        (trade,) = result['trades']
+        self.assertEqual((trade['entry_bar'], trade['exit_bar']), (1, 3))
+        # 1 % entry cost, then the 1 % gap plus 1 % exit cost
+        self.assertAlmostEqual(trade['return'], 0.99 * 0.98 - 1)
+        self.assertAlmostEqual(np.prod(1 + result['ticker_returns']) - 1, trade['return'])
+        self.assertEqual(result['stats']['win_rate'], 0.0)
+
+    def test_reversal_splits_cost_between_trades(self):
+        positions = np.array([[1.0, 1.0, -1.0, -1.0, -1.0]])
+        result = backtest.run_backtest(self.close, positions, self.open_, cost_bps=100)
+        long_trade, short_trade = result['trades']
+        self.assertAlmostEqual(long_trade['return'], 0.99 * 0.98 - 1)
+        # The short pays only its half of the reversal cost and rides bar 3's session
+        self.assertAlmostEqual(short_trade['return'], -0.01 - (100 / 99 - 1))
+
+
+class ReplayStreamTests(SimpleTestCase):
+    """The SSE replay validates its pacing and holds an admission slot while streaming"""
+
+    def setUp(self):
+        ticks_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(ticks_dir.cleanup)
+        settings = override_settings(
+            STOCK_TICKS_DIR=ticks_dir.name,
+            STOCK_SYNTHETIC_TICK_SYMBOLS=2,
+            STOCK_SYNTHETIC_TICK_ROUNDS=3,
+            ADMISSION_CONTROL={
+                'rate': 100.0,
+                'burst': 100.0,
+                'endpoints': {'stock_trading:replay_stream': {'concurrency': 1, 'queue': 0, 'queue_timeout': 0.0}},
+            },
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = Client(HTTP_HOST='localhost')
+
+    def test_bad_speed_is_rejected(self):
+        for speed in ['abc', '0', '-5', '1001', 'nan']:
+            response = self.client.get('/stock-trading/dashboard/stream/', {'speed': speed})
+            self.assertEqual(response.status_code, 400, speed)
+
+    def test_open_stream_holds_its_slot(self):
+        first = self.client.get('/stock-trading/dashboard/stream/', {'speed': '1000'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.client.get('/stock-trading/dashboard/stream/').status_code, 503)
+
+        body = b''.join(first.streaming_content)
+        self.assertTrue(body.endswith(b'event: done\ndata: {}\n\n'))
+        self.assertEqual(self.client.get('/stock-trading/dashboard/stream/').status_code, 200)
+
+    def test_closed_stream_frees_its_slot(self):
+        self.client.get('/stock-trading/dashboard/stream/').close()
+        self.assertEqual(self.client.get('/stock-trading/dashboard/stream/').status_code, 200)
+
+
+class ReplayTickFileTests(SimpleTestCase):
+    """Malformed ticks in a replay file are skipped instead of ending the stream"""
+
+    ROWS = [
+        '1700000000,AAA,100.0',
+        '1700000001,AAA,0',
+        '1700000002,AAA,-5',
+        '1700000003,AAA,abc',
+        '1700000004,AAA,nan',
+        'yesterday,AAA,101.0',
+        '1700000006,AAA,102.0',
+    ]
+
+    def setUp(self):
+        ticks_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(ticks_dir.cleanup)
+        self.path = Path(ticks_dir.name) / 'ticks.csv'
+        self.path.write_text('timestamp,symbol,price\n' + '\n'.join(self.ROWS) + '\n')
+        self.ticks_dir = ticks_dir.name
+
+    def test_bad_rows_are_skipped_and_logged(self):
+        with self.assertLogs('stock_trading.replay', 'WARNING') as logs:
+            ticks = list(replay.read_ticks(self.path))
+        self.assertEqual(ticks, [(1700000000.0, 'AAA', 100.0), (1700000006.0, 'AAA', 102.0)])
+        self.assertIn('Skipped 5 malformed ticks', logs.output[0])
+
+    def test_engine_ignores_non_positive_prices(self):
+        engine = replay.IndicatorEngine()
+        for price in (100.0, 0.0, -1.0, float('inf'), 101.0):
+            engine.update('AAA', price)
+        self.assertEqual(engine.symbols['AAA'].ticks, 2)
+        self.assertEqual(engine.snapshot('AAA')['price'], 101.0)
+        self.assertEqual(engine.snapshot('AAA')['max_drawdown'], 0.0)
+
+    def test_stream_finishes_despite_bad_rows(self):
+        with override_settings(STOCK_TICKS_DIR=self.ticks_dir, ADMISSION_CONTROL={'enabled': False}), \
+                self.assertLogs('stock_trading.replay', 'WARNING'):
+            response = Client(HTTP_HOST='localhost').get('/stock-trading/dashboard/stream/', {'speed': '1000'})
+            body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.endswith('event: done\ndata: {}\n\n'))
+        updates = [json.loads(line[len('data: '):]) for line in body.splitlines()
+                   if line.startswith('data: {"AAA"')]
+        self.assertEqual(updates[-1]['AAA']['price'], 102.0)
+
+
+def reference_episode(log_returns, ticker, bar, actions, window, cost):
+    """Plain loop over one environment: observations and rewards for ``actions``"""
+    position, observations, rewards = 0.0, [], []
+    for action in actions:
+        action = min(max(float(action), -1.0), 1.0)
+        rewards.append(action * float(log_returns[ticker, bar]) - cost * abs(action - position))
+        position, bar = action, bar + 1
+        observations.append(np.append(log_returns[ticker, bar - window:bar], position))
+    return np.array(observations), np.array(rewards)
+
+
+class VectorTradingEnvTests(SimpleTestCase):
+    """Batched environments step like independent single environments"""
+
+    close = backtest.synthetic_ohlcv(5, 200, seed=0)['close']
+
+    def test_steps_match_single_env_reference(self):
+        env = VectorTradingEnv(self.close, 6, window=10, episode_length=50, cost_bps=20, seed=1)
+        first = env.reset(seed=7)
+        tickers, bars = env.ticker.copy(), env.bar.copy()
+        actions = np.random.default_rng(2).uniform(-1.5, 1.5, (20, 6))
+
+        observations, rewards = [], []
+        for step_actions in actions:
+            obs, reward, done, _ = env.step(step_actions)
+            self.assertFalse(done.any())
+            observations.append(obs)
+            rewards.append(reward)
+        for i in range(6):
+            np.testing.assert_allclose(first[i, :-1], env.log_returns[tickers[i], bars[i] - 10:bars[i]])
+            expected_obs, expected_rewards = reference_episode(
+                env.log_returns, tickers[i], bars[i], actions[:, i], 10, 20 / 1e4
+            )
+            np.testing.assert_allclose(np.array(observations)[:, i], expected_obs, rtol=1e-6)
+            np.testing.assert_allclose(np.array(rewards)[:, i], expected_rewards, rtol=1e-5, atol=1e-9)
+
+        # Same seed, same episodes
+        again = VectorTradingEnv(self.close, 6, window=10, episode_length=50, cost_bps=20)
+        np.testing.assert_array_equal(again.reset(seed=7), first)
+
+    def test_finished_episodes_reset_automatically(self):
+        env = VectorTradingEnv(self.close, 3, window=10, episode_length=5, seed=1)
+        env.reset()
+        total = np.zeros(3)
+        for _ in range(4):
+            _, reward, done, info = env.step(np.ones(3))
+            total += reward
+            self.assertFalse(done.any())
+            self.assertTrue(np.isnan(info['episode_return']).all())
+        obs, reward, done, info = env.step(np.ones(3))
+        self.assertTrue(done.all())
+        np.testing.assert_allclose(info['episode_return'], total + reward, rtol=1e-6)
+        # The new episodes start flat with a fresh window
+        self.assertTrue((obs[:, -1] == 0).all())
+        np.testing.assert_array_equal(env.steps, 0)
+        np.testing.assert_array_equal(env.episode_return, 0)
+        _, _, done, _ = env.step(np.ones(3))
+        self.assertFalse(done.any())
+
+    def test_short_history_is_rejected(self):
+        with self.assertRaises(ValueError):
+            VectorTradingEnv(self.close[:, :40], 2, window=30, episode_length=20)
+
+
+class SubprocVectorTradingEnvTests(SimpleTestCase):
+    """The multiprocess env matches its per-worker single-process shards and shuts its workers down"""
+
+    close = backtest.synthetic_ohlcv(5, 200, seed=0)['close']
+
+    def test_matches_single_process_shards_and_closes_workers(self):
+        kwargs = {'window': 10, 'episode_length': 8, 'cost_bps': 10}
+        actions = np.random.default_rng(3).integers(-1, 2, (12, 5)).astype(np.float32)
+        with SubprocVectorTradingEnv(self.close, 5, n_workers=2, seed=0, **kwargs) as env:
+            processes = list(env.processes)
+            self.assertTrue(all(process.is_alive() for process in processes))
+            obs = env.reset(seed=100)
+            results = [env.step(step_actions) for step_actions in actions]
+
+        self.assertEqual(env.processes, [])
+        for process in processes:
+            process.join(timeout=5)
+            self.assertFalse(process.is_alive())
+            self.assertEqual(process.exitcode, 0)
+
+        # Worker i is reset with seed + i over its slice of the environments
+        shards = [VectorTradingEnv(self.close, size, **kwargs) for size in (3, 2)]
+        expected_obs = np.concatenate([shard.reset(seed=100 + i) for i, shard in enumerate(shards)])
+        np.testing.assert_array_equal(obs, expected_obs)
+        for step_actions, (obs, rewards, dones, info) in zip(actions, results):
+            expected = [shard.step(step_actions[lo:lo + shard.n_envs])
+                        for shard, lo in zip(shards, (0, 3))]
+            np.testing.assert_array_equal(obs, np.concatenate([e[0] for e in expected]))
+            np.testing.assert_array_equal(rewards, np.concatenate([e[1] for e in expected]))
+            np.testing.assert_array_equal(dones, np.concatenate([e[2] for e in expected]))
+            np.testing.assert_array_equal(
+                info['episode_return'], np.concatenate([e[3]['episode_return'] for e in expected])
+            )
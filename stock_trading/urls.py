@@ -6,4 +6,5 @@ app_name = 'stock_trading'
 urlpatterns = [
     path('', views.index, name='index'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/stream/', views.replay_stream, name='replay_stream'),
 ]
@@ -1,3 +1,7 @@
+import json
+
+from django.conf import settings
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render
 
 def index(request):
@@ -6,13 +10,40 @@ def index(request):
 
 def dashboard(request):
     """Dashboard showing trading performance and metrics"""
-    # Sample data for demonstration
-    context = {
-        'total_trades': 1247,
-        'win_rate': 67.3,
-        'total_return': 34.2,
-        'sharpe_ratio': 1.85,
-        'max_drawdown': -12.4,
-        'avg_trade_duration': '2.3 days',
-    }
+    # Imported here so NumPy only loads once the dashboard is used
+    from .services import BacktestService
+
+    context = BacktestService().dashboard_metrics()
     return render(request, 'stock_trading/dashboard.html', context)
+
+def replay_stream(request):
+    """Server-sent events with incremental indicators from a historical tick replay"""
+    from . import replay
+
+    try:
+        speed = float(request.GET.get('speed', settings.STOCK_REPLAY_SPEED))
+    except ValueError:
+        return HttpResponseBadRequest('speed must be a number')
+    if not 0 < speed <= settings.STOCK_REPLAY_MAX_SPEED:
+        return HttpResponseBadRequest(f"speed must be in (0, {settings.STOCK_REPLAY_MAX_SPEED:g}]")
+    wanted = {s for s in request.GET.get('symbols', '').split(',') if s}
+
+    paths = replay.tick_files(settings.STOCK_TICKS_DIR)
+    if paths:
+        ticks = replay.merge_tick_files(paths)
+    else:
+        ticks = replay.synthetic_ticks(settings.STOCK_SYNTHETIC_TICK_SYMBOLS, settings.STOCK_SYNTHETIC_TICK_ROUNDS)
+    if wanted:
+        ticks = (tick for tick in ticks if tick[1] in wanted)
+    ticks = replay.paced(ticks, speed)
+
+    def events():
+        engine = replay.IndicatorEngine()
+        for updates in replay.batched_updates(ticks, engine, settings.STOCK_REPLAY_FLUSH_SECONDS):
+            yield f"event: indicators\ndata: {json.dumps(updates)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response